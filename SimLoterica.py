@@ -1,28 +1,44 @@
 import tkinter as tk
-from tkinter import messagebox, scrolledtext, ttk
+from tkinter import font as tkfont
+from tkinter import filedialog, messagebox, simpledialog, ttk
+import os
 import random
 import time
 import threading
+from array import array
 from itertools import combinations
 
-# Tabela de preços da Mega-Sena (valores atualizados 2024)
-PRECOS = {
-    6: 6.00,
-    7: 42.00,
-    8: 168.00,
-    9: 504.00,
-    10: 1260.00,
-    11: 2772.00,
-    12: 5544.00,
-    13: 10296.00,
-    14: 18018.00,
-    15: 30030.00,
-    16: 48048.00,
-    17: 74256.00,
-    18: 111384.00,
-    19: 162792.00,
-    20: 232560.00
-}
+from bilhetes import BilhetesMapeados, CarteiraCompacta, exportar_texto, gravar_binario, ler_bilhetes
+from catalogo import Catalogo
+from checkpoint import Checkpoint, retomar
+from estimativa import EstimativaSequencial
+from historico import HistoricoResumido
+from metricas import FASES, Metricas
+from motor import (MOTORES, NOMES_FAIXAS, CanalProgresso, CoberturaSena, calcular_probabilidade, contar_bits,
+                   criar_motor, combinar, criar_jogo, dezenas_da_mascara, mascara, nome_premio)
+from replicacao import ReplicacaoExperimentos
+from resultados_reais import carregar_resultados
+from sorteador import SORTEADORES, criar_gerador, sorteio_contador
+
+# Frequência (Hz) com que a interface consulta o progresso da simulação
+TAXA_ATUALIZACAO_HZ = 20
+
+# Diretório dos arquivos gravados pela interface (a variável SIMLOTERICA_DADOS muda o local)
+DIRETORIO_DADOS = os.environ.get("SIMLOTERICA_DADOS") or os.path.join(os.path.expanduser("~"), ".simloterica")
+
+# Arquivo de checkpoint das simulações ilimitadas
+CAMINHO_CHECKPOINT = os.path.join(DIRETORIO_DADOS, "simulacao_checkpoint.json")
+
+# Diretório do catálogo em que toda simulação encerrada é registrada
+CAMINHO_CATALOGO = os.path.join(DIRETORIO_DADOS, "catalogo_execucoes")
+
+
+def sorteio_manual(nome_sorteador):
+    """Dezenas do sorteio manual, na ordem (aleatória) em que são reveladas"""
+    numeros = SORTEADORES[nome_sorteador](criar_gerador(nome_sorteador))
+    random.shuffle(numeros)
+    return numeros
+
 
 class SeletorNumeros(tk.Toplevel):
     """Janela popup para seleção visual de números"""
@@ -100,26 +116,107 @@ class SeletorNumeros(tk.Toplevel):
         self.callback(sorted(list(self.numeros_selecionados)))
         self.destroy()
 
+class ListaVirtual(tk.Frame):
+    """Lista rolável que desenha apenas as linhas visíveis.
+
+    As linhas não ficam no widget: obter_total() informa quantas existem e
+    obter_linhas(inicio, fim) devolve os textos da janela visível, de modo
+    que o custo de cada atualização não depende do tamanho da lista.
+    """
+    def __init__(self, parent, obter_total, obter_linhas, acompanhar_fim=False,
+                 height=10, font=("Courier", 9), bg="#1a1a2a", fg="#00ff00", ao_clicar=None):
+        super().__init__(parent, bg=bg)
+        self.obter_total = obter_total
+        self.obter_linhas = obter_linhas
+        self.ao_clicar = ao_clicar
+        self.acompanhar_fim = acompanhar_fim
+        self.seguir_fim = acompanhar_fim
+        self.primeira = 0
+        self.altura_linha = tkfont.Font(font=font).metrics("linespace")
+        
+        self.barra = tk.Scrollbar(self, command=self.rolar)
+        self.barra.pack(side="right", fill="y")
+        
+        self.texto = tk.Text(self, font=font, bg=bg, fg=fg, wrap="none", height=height)
+        self.texto.pack(side="left", fill="both", expand=True)
+        self.texto.bind("<Configure>", lambda evento: self.atualizar())
+        self.texto.bind("<MouseWheel>", lambda evento: self.rolar("scroll", -evento.delta // 120, "units"))
+        self.texto.bind("<Button-4>", lambda evento: self.rolar("scroll", -3, "units"))
+        self.texto.bind("<Button-5>", lambda evento: self.rolar("scroll", 3, "units"))
+        if ao_clicar is not None:
+            self.texto.bind("<Double-Button-1>", self.clicar)
+    
+    def linhas_visiveis(self):
+        return max(1, self.texto.winfo_height() // self.altura_linha)
+    
+    def atualizar(self):
+        total = self.obter_total()
+        visiveis = self.linhas_visiveis()
+        if self.seguir_fim:
+            self.primeira = total - visiveis
+        self.primeira = max(0, min(self.primeira, total - visiveis))
+        fim = min(total, self.primeira + visiveis)
+        
+        self.texto.delete(1.0, tk.END)
+        self.texto.insert(tk.END, "\n".join(self.obter_linhas(self.primeira, fim)))
+        
+        if total:
+            self.barra.set(self.primeira / total, fim / total)
+        else:
+            self.barra.set(0, 1)
+    
+    def clicar(self, evento):
+        """Duplo clique: chama ao_clicar com o índice da linha na lista completa"""
+        linha = int(self.texto.index(f"@{evento.x},{evento.y}").split(".")[0]) - 1
+        indice = self.primeira + linha
+        if indice < self.obter_total():
+            self.ao_clicar(indice)
+        return "break"
+    
+    def rolar(self, acao, valor, unidade=None):
+        """Protocolo de rolagem do Scrollbar (moveto/scroll)"""
+        total = self.obter_total()
+        visiveis = self.linhas_visiveis()
+        if acao == "moveto":
+            self.primeira = int(float(valor) * total)
+        elif acao == "scroll":
+            passo = visiveis if unidade == "pages" else 1
+            self.primeira += int(valor) * passo
+        self.primeira = max(0, min(self.primeira, total - visiveis))
+        # Continua acompanhando as linhas novas enquanto o fim estiver visível
+        self.seguir_fim = self.acompanhar_fim and self.primeira + visiveis >= total
+        self.atualizar()
+        return "break"
+
 class MegaSenaSimulator:
-    def __init__(self, root):
+    def __init__(self, root, taxa_atualizacao=TAXA_ATUALIZACAO_HZ):
         self.root = root
+        self.intervalo_atualizacao_ms = max(1, int(1000 / taxa_atualizacao))
         self.root.title("Simulador Mega-Sena")
         self.root.geometry("1000x750")
         self.root.configure(bg="#1e1e2e")
         
         self.jogos = []
+        self.totais_jogos = {'preco': 0.0, 'cobertura': CoberturaSena()}
         self.numeros_sorteados = []
         self.sorteio_ativo = False
         self.thread_sorteio = None
         
         # Variáveis para simulação automática
         self.simulacao_ativa = False
-        self.historico_sorteios = []
+        self.historico_sorteios = HistoricoResumido(NOMES_FAIXAS)
+        # Carteira da simulação exibida no histórico (máscaras, para os acertos sob demanda)
+        self.mascaras_historico = array('Q')
         self.total_sorteios = 0
-        self.jogos_simulacao = []
+        self.jogos_simulacao = CarteiraCompacta()
+        self.motor = None
+        self.canal_progresso = None
+        self.thread_simulacao = None
         self.parar_em_quadra = tk.BooleanVar(value=False)
         self.parar_em_quina = tk.BooleanVar(value=False)
         self.parar_em_sena = tk.BooleanVar(value=True)
+        self.medir_desempenho = tk.BooleanVar(value=False)
+        self.parar_por_precisao = tk.BooleanVar(value=False)
         
         self.criar_interface()
         
@@ -178,9 +275,9 @@ class MegaSenaSimulator:
         tk.Label(frame_info, text="Seus Jogos:", bg="#2e2e3e", fg="white", 
                 font=("Arial", 12, "bold")).pack(anchor="w")
         
-        self.text_jogos = scrolledtext.ScrolledText(frame_info, height=10, 
-                                                     font=("Courier", 10), bg="#1a1a2a", fg="#00ff00")
-        self.text_jogos.pack(fill="both", expand=True, pady=5)
+        self.lista_jogos = ListaVirtual(frame_info, self.total_linhas_jogos, self.linhas_jogos,
+                                        font=("Courier", 10))
+        self.lista_jogos.pack(fill="both", expand=True, pady=5)
         
         # Frame de números sorteados
         frame_sorteio = tk.Frame(self.aba_manual, bg="#2e2e3e", padx=10, pady=15)
@@ -244,13 +341,19 @@ class MegaSenaSimulator:
         tk.Button(frame_btn_add, text="Jogo Aleatório", command=self.adicionar_jogo_simulacao_aleatorio,
                  bg="#ff4a9a", fg="white", font=("Arial", 9, "bold"), padx=10).pack(side="left", padx=3)
         
+        tk.Button(frame_btn_add, text="Importar Arquivo", command=self.importar_jogos_simulacao,
+                 bg="#4aff9a", fg="black", font=("Arial", 9, "bold"), padx=10).pack(side="left", padx=3)
+        
+        tk.Button(frame_btn_add, text="Exportar", command=self.exportar_jogos_simulacao,
+                 bg="#ffaa4a", fg="black", font=("Arial", 9, "bold"), padx=10).pack(side="left", padx=3)
+        
         tk.Button(frame_btn_add, text="Limpar Jogos", command=self.limpar_jogos_simulacao,
                  bg="#ff4a4a", fg="white", font=("Arial", 9, "bold"), padx=10).pack(side="left", padx=3)
         
         # Lista de jogos
-        self.text_jogos_sim = scrolledtext.ScrolledText(frame_jogos_sim, height=5, 
-                                                        font=("Courier", 9), bg="#1a1a2a", fg="#00ff00")
-        self.text_jogos_sim.pack(fill="both", expand=True, pady=5)
+        self.lista_jogos_sim = ListaVirtual(frame_jogos_sim, self.total_linhas_jogos_simulacao,
+                                            self.linhas_jogos_simulacao, height=5, font=("Courier", 9))
+        self.lista_jogos_sim.pack(fill="both", expand=True, pady=5)
         
         # Quantidade de sorteios
         frame_qtd = tk.Frame(frame_config, bg="#2e2e3e")
@@ -263,6 +366,23 @@ class MegaSenaSimulator:
         self.entry_qtd_sorteios.insert(0, "0")
         self.entry_qtd_sorteios.pack(side="left", padx=5)
         
+        tk.Label(frame_qtd, text="Motor:", 
+                bg="#2e2e3e", fg="white", font=("Arial", 11)).pack(side="left", padx=5)
+        
+        self.combo_motor = ttk.Combobox(frame_qtd, values=list(MOTORES), state="readonly", width=12)
+        self.combo_motor.set("serial")
+        self.combo_motor.pack(side="left", padx=5)
+        
+        tk.Label(frame_qtd, text="Sorteador:", 
+                bg="#2e2e3e", fg="white", font=("Arial", 11)).pack(side="left", padx=5)
+        
+        self.combo_sorteador = ttk.Combobox(frame_qtd, values=list(SORTEADORES), state="readonly", width=10)
+        self.combo_sorteador.set("amostra")
+        self.combo_sorteador.pack(side="left", padx=5)
+        
+        tk.Checkbutton(frame_qtd, text="Métricas", variable=self.medir_desempenho, bg="#2e2e3e", fg="white",
+                      selectcolor="#4a4a6a", font=("Arial", 10)).pack(side="left", padx=5)
+        
         # Condições de parada
         frame_parada = tk.LabelFrame(frame_config, text="Condições de Parada", 
                                      bg="#2e2e3e", fg="white", font=("Arial", 11, "bold"), padx=10, pady=10)
@@ -280,6 +400,21 @@ class MegaSenaSimulator:
                       variable=self.parar_em_sena, bg="#2e2e3e", fg="white", 
                       selectcolor="#4a4a6a", font=("Arial", 10)).pack(anchor="w")
         
+        # Estimativa sequencial: as faixas marcadas acima passam a ser as faixas estimadas
+        frame_precisao = tk.Frame(frame_parada, bg="#2e2e3e")
+        frame_precisao.pack(anchor="w")
+        
+        tk.Checkbutton(frame_precisao, text="Parar ao atingir precisão de ±", 
+                      variable=self.parar_por_precisao, bg="#2e2e3e", fg="white", 
+                      selectcolor="#4a4a6a", font=("Arial", 10)).pack(side="left")
+        
+        self.entry_precisao = tk.Entry(frame_precisao, width=5, font=("Arial", 10))
+        self.entry_precisao.insert(0, "5")
+        self.entry_precisao.pack(side="left")
+        
+        tk.Label(frame_precisao, text="% (nas faixas marcadas, com 95% de confiança)", 
+                bg="#2e2e3e", fg="white", font=("Arial", 10)).pack(side="left")
+        
         # Botões
         frame_botoes_sim = tk.Frame(frame_config, bg="#2e2e3e")
         frame_botoes_sim.pack(pady=10)
@@ -290,9 +425,18 @@ class MegaSenaSimulator:
         tk.Button(frame_botoes_sim, text="Parar Simulação", command=self.parar_simulacao,
                  bg="#ff4a4a", fg="white", font=("Arial", 11, "bold"), padx=30, pady=5).pack(side="left", padx=5)
         
+        tk.Button(frame_botoes_sim, text="Retomar", command=self.retomar_simulacao,
+                 bg="#4a9eff", fg="white", font=("Arial", 11, "bold"), padx=30, pady=5).pack(side="left", padx=5)
+        
         tk.Button(frame_botoes_sim, text="Limpar Histórico", command=self.limpar_historico,
                  bg="#ffaa4a", fg="black", font=("Arial", 11, "bold"), padx=30, pady=5).pack(side="left", padx=5)
         
+        tk.Button(frame_botoes_sim, text="Backtest Real", command=self.backtest_resultados_reais,
+                 bg="#9a4aff", fg="white", font=("Arial", 11, "bold"), padx=30, pady=5).pack(side="left", padx=5)
+        
+        tk.Button(frame_botoes_sim, text="Replicar", command=self.replicar_experimentos,
+                 bg="#4affd4", fg="black", font=("Arial", 11, "bold"), padx=30, pady=5).pack(side="left", padx=5)
+        
         # Frame de estatísticas da simulação
         frame_stats_sim = tk.Frame(self.aba_simulacao, bg="#2e2e3e", padx=10, pady=10)
         frame_stats_sim.pack(fill="x", padx=10, pady=5)
@@ -301,51 +445,44 @@ class MegaSenaSimulator:
                                         bg="#2e2e3e", fg="#ffff00", font=("Arial", 11, "bold"))
         self.label_stats_sim.pack()
         
+        self.label_metricas_sim = tk.Label(frame_stats_sim, text="", bg="#2e2e3e", fg="#aaaaaa",
+                                           font=("Courier", 9), justify="left")
+        self.label_metricas_sim.pack()
+        
+        self.label_estimativa_sim = tk.Label(frame_stats_sim, text="", bg="#2e2e3e", fg="#aaffaa",
+                                             font=("Courier", 9), justify="left")
+        self.label_estimativa_sim.pack()
+        
         # Frame de histórico
         frame_historico = tk.Frame(self.aba_simulacao, bg="#2e2e3e", padx=10, pady=10)
         frame_historico.pack(fill="both", expand=True, padx=10, pady=5)
         
-        tk.Label(frame_historico, text="Histórico de Sorteios:", bg="#2e2e3e", fg="white", 
-                font=("Arial", 12, "bold")).pack(anchor="w")
+        tk.Label(frame_historico, text="Histórico de Sorteios (duplo clique: acertos de cada jogo):",
+                 bg="#2e2e3e", fg="white", font=("Arial", 12, "bold")).pack(anchor="w")
         
-        self.text_historico = scrolledtext.ScrolledText(frame_historico, height=12, 
-                                                        font=("Courier", 8), bg="#1a1a2a", fg="#00ff00")
-        self.text_historico.pack(fill="both", expand=True, pady=5)
+        self.lista_historico = ListaVirtual(frame_historico, lambda: len(self.historico_sorteios),
+                                            self.linhas_historico, acompanhar_fim=True, height=12,
+                                            font=("Courier", 8), ao_clicar=self.detalhar_sorteio_historico)
+        self.lista_historico.pack(fill="both", expand=True, pady=5)
     
     def abrir_seletor_visual(self, callback):
         SeletorNumeros(self.root, callback)
     
     def calcular_probabilidade(self, qtd_dezenas):
         """Calcula a probabilidade de ganhar com X dezenas"""
-        combinacoes_possiveis = self.combinar(60, 6)
-        combinacoes_jogo = self.combinar(qtd_dezenas, 6)
-        probabilidade = (combinacoes_jogo / combinacoes_possiveis) * 100
-        return probabilidade
+        return calcular_probabilidade(qtd_dezenas)
     
     def combinar(self, n, k):
         """Calcula combinação C(n,k)"""
-        from math import factorial
-        return factorial(n) / (factorial(k) * factorial(n - k))
+        return combinar(n, k)
     
     def adicionar_jogo_direto(self, dezenas):
         """Adiciona jogo a partir da lista de dezenas"""
-        dezenas_ordenadas = sorted(dezenas)
-        preco = PRECOS[len(dezenas)]
-        probabilidade = self.calcular_probabilidade(len(dezenas))
-        
-        self.jogos.append({
-            'dezenas': dezenas_ordenadas,
-            'preco': preco,
-            'probabilidade': probabilidade
-        })
-        
-        print(f"\n{'='*60}")
-        print(f"JOGO ADICIONADO!")
-        print(f"Dezenas: {dezenas_ordenadas}")
-        print(f"Quantidade: {len(dezenas)} dezenas")
-        print(f"Preço: R$ {preco:.2f}")
-        print(f"Probabilidade: {probabilidade:.8f}%")
-        print(f"{'='*60}")
+        jogo = criar_jogo(dezenas)
+        
+        self.jogos.append(jogo)
+        self.totais_jogos['preco'] += jogo['preco']
+        self.totais_jogos['cobertura'].adicionar(jogo['dezenas'])
         
         self.atualizar_display_jogos()
     
@@ -385,33 +522,53 @@ class MegaSenaSimulator:
         messagebox.showinfo("Jogo Aleatório", f"Jogo com {qtd} dezenas criado!")
     
     def atualizar_display_jogos(self):
-        self.text_jogos.delete(1.0, tk.END)
-        
+        self.lista_jogos.atualizar()
+    
+    # Linhas do resumo: cabeçalho, 3 por jogo e rodapé
+    CABECALHO_JOGOS = 4
+    RODAPE_JOGOS = 5
+    
+    def total_linhas_jogos(self):
         if not self.jogos:
-            self.text_jogos.insert(tk.END, "Nenhum jogo adicionado ainda.\n")
-            return
-        
-        total_gasto = sum(j['preco'] for j in self.jogos)
-        prob_total = sum(j['probabilidade'] for j in self.jogos)
-        
-        self.text_jogos.insert(tk.END, f"{'='*80}\n")
-        self.text_jogos.insert(tk.END, f"RESUMO DOS JOGOS\n")
-        self.text_jogos.insert(tk.END, f"{'='*80}\n\n")
-        
-        for idx, jogo in enumerate(self.jogos, 1):
-            self.text_jogos.insert(tk.END, f"Jogo {idx}: {jogo['dezenas']}\n")
-            self.text_jogos.insert(tk.END, f"  └─ {len(jogo['dezenas'])} dezenas | ")
-            self.text_jogos.insert(tk.END, f"R$ {jogo['preco']:.2f} | ")
-            self.text_jogos.insert(tk.END, f"Chance: {jogo['probabilidade']:.8f}%\n\n")
-        
-        self.text_jogos.insert(tk.END, f"{'-'*80}\n")
-        self.text_jogos.insert(tk.END, f"TOTAL GASTO: R$ {total_gasto:.2f}\n")
-        self.text_jogos.insert(tk.END, f"PROBABILIDADE TOTAL: {prob_total:.8f}%\n")
-        self.text_jogos.insert(tk.END, f"Isso é 1 em {int(1/(prob_total/100)):,}\n")
-        self.text_jogos.insert(tk.END, f"{'='*80}\n")
+            return 1
+        return self.CABECALHO_JOGOS + 3 * len(self.jogos) + self.RODAPE_JOGOS
+    
+    def linhas_jogos(self, inicio, fim):
+        if not self.jogos:
+            return ["Nenhum jogo adicionado ainda."]
+        
+        total_gasto = self.totais_jogos['preco']
+        # Probabilidade exata: sorteios cobertos por mais de um jogo contam uma vez
+        prob_total = self.totais_jogos['cobertura'].probabilidade()
+        cabecalho = ['='*80, "RESUMO DOS JOGOS", '='*80, ""]
+        rodape = ['-'*80,
+                  f"TOTAL GASTO: R$ {total_gasto:.2f}",
+                  f"PROBABILIDADE TOTAL: {prob_total:.8f}%",
+                  f"Isso é 1 em {int(1/(prob_total/100)):,}",
+                  '='*80]
+        inicio_rodape = self.CABECALHO_JOGOS + 3 * len(self.jogos)
+        
+        linhas = []
+        for i in range(inicio, fim):
+            if i < self.CABECALHO_JOGOS:
+                linhas.append(cabecalho[i])
+            elif i >= inicio_rodape:
+                linhas.append(rodape[i - inicio_rodape])
+            else:
+                idx, parte = divmod(i - self.CABECALHO_JOGOS, 3)
+                jogo = self.jogos[idx]
+                if parte == 0:
+                    linhas.append(f"Jogo {idx + 1}: {jogo['dezenas']}")
+                elif parte == 1:
+                    linhas.append(f"  └─ {len(jogo['dezenas'])} dezenas | R$ {jogo['preco']:.2f} | "
+                                  f"Chance: {jogo['probabilidade']:.8f}%")
+                else:
+                    linhas.append("")
+        return linhas
     
     def limpar_jogos(self):
         self.jogos = []
+        self.totais_jogos = {'preco': 0.0, 'cobertura': CoberturaSena()}
         self.atualizar_display_jogos()
         print("\n" + "="*60)
         print("JOGOS LIMPOS!")
@@ -421,22 +578,7 @@ class MegaSenaSimulator:
     
     def adicionar_jogo_simulacao_direto(self, dezenas):
         """Adiciona jogo na simulação a partir da lista"""
-        dezenas_ordenadas = sorted(dezenas)
-        preco = PRECOS[len(dezenas)]
-        probabilidade = self.calcular_probabilidade(len(dezenas))
-        
-        self.jogos_simulacao.append({
-            'dezenas': dezenas_ordenadas,
-            'preco': preco,
-            'probabilidade': probabilidade
-        })
-        
-        print(f"\n{'='*60}")
-        print(f"JOGO ADICIONADO À SIMULAÇÃO!")
-        print(f"Dezenas: {dezenas_ordenadas}")
-        print(f"Preço: R$ {preco:.2f} | Chance: {probabilidade:.8f}%")
-        print(f"{'='*60}")
-        
+        self.jogos_simulacao.adicionar(dezenas)
         self.atualizar_display_jogos_simulacao()
     
     def adicionar_jogo_simulacao(self):
@@ -472,24 +614,89 @@ class MegaSenaSimulator:
         self.adicionar_jogo_simulacao_direto(dezenas)
         messagebox.showinfo("Jogo Aleatório", f"Jogo com {qtd} dezenas adicionado!")
     
-    def atualizar_display_jogos_simulacao(self):
-        self.text_jogos_sim.delete(1.0, tk.END)
+    def importar_jogos_simulacao(self):
+        caminho = filedialog.askopenfilename(
+            title="Importar jogos",
+            filetypes=[("Texto ou CSV", "*.txt *.csv"), ("Bilhetes binários", "*.msb"),
+                       ("Todos os arquivos", "*.*")])
+        if not caminho:
+            return
         
+        erros = []
+        try:
+            if caminho.lower().endswith(".msb"):
+                bilhetes = BilhetesMapeados(caminho)
+                try:
+                    # Valida o arquivo inteiro antes de incluir qualquer bilhete
+                    qtd = self.jogos_simulacao.adicionar_mascaras(bilhetes)
+                finally:
+                    bilhetes.fechar()
+            else:
+                with open(caminho, encoding="utf-8") as arquivo:
+                    qtd = self.jogos_simulacao.adicionar_mascaras(ler_bilhetes(arquivo, erros))
+        except (OSError, UnicodeDecodeError, ValueError) as e:
+            messagebox.showerror("Erro", f"Não foi possível importar o arquivo:\n{e}")
+            return
+        self.atualizar_display_jogos_simulacao()
+        
+        mensagem = f"{qtd} jogos importados."
+        if erros:
+            mensagem += f"\n\n{len(erros)} linhas inválidas:\n"
+            mensagem += "\n".join(f"Linha {numero}: {erro}" for numero, _, erro in erros[:5])
+            if len(erros) > 5:
+                mensagem += "\n..."
+        messagebox.showinfo("Importar Jogos", mensagem)
+    
+    def exportar_jogos_simulacao(self):
         if not self.jogos_simulacao:
-            self.text_jogos_sim.insert(tk.END, "Nenhum jogo adicionado.\n")
+            messagebox.showwarning("Aviso", "Adicione pelo menos um jogo!")
             return
         
-        total_gasto = sum(j['preco'] for j in self.jogos_simulacao)
+        caminho = filedialog.asksaveasfilename(
+            title="Exportar jogos", defaultextension=".txt",
+            filetypes=[("Texto", "*.txt"), ("Bilhetes binários", "*.msb")])
+        if not caminho:
+            return
         
-        for idx, jogo in enumerate(self.jogos_simulacao, 1):
-            self.text_jogos_sim.insert(tk.END, f"Jogo {idx}: {jogo['dezenas']} ")
-            self.text_jogos_sim.insert(tk.END, f"| R$ {jogo['preco']:.2f} ")
-            self.text_jogos_sim.insert(tk.END, f"| {jogo['probabilidade']:.8f}%\n")
+        mascaras = self.jogos_simulacao.mascaras
+        try:
+            if caminho.lower().endswith(".msb"):
+                gravar_binario(mascaras, caminho)
+            else:
+                exportar_texto(mascaras, caminho)
+        except OSError as e:
+            messagebox.showerror("Erro", f"Não foi possível exportar os jogos:\n{e}")
+            return
         
-        self.text_jogos_sim.insert(tk.END, f"\nTotal: {len(self.jogos_simulacao)} jogos | R$ {total_gasto:.2f}\n")
+        messagebox.showinfo("Exportar Jogos", f"{len(self.jogos_simulacao)} jogos exportados.")
+    
+    def atualizar_display_jogos_simulacao(self):
+        self.lista_jogos_sim.atualizar()
+    
+    def total_linhas_jogos_simulacao(self):
+        if not self.jogos_simulacao:
+            return 1
+        return len(self.jogos_simulacao) + 2
+    
+    def linhas_jogos_simulacao(self, inicio, fim):
+        if not self.jogos_simulacao:
+            return ["Nenhum jogo adicionado."]
+        
+        qtd = len(self.jogos_simulacao)
+        linhas = []
+        for i in range(inicio, fim):
+            if i < qtd:
+                jogo = self.jogos_simulacao[i]
+                linhas.append(f"Jogo {i + 1}: {jogo['dezenas']} | R$ {jogo['preco']:.2f} "
+                              f"| {jogo['probabilidade']:.8f}%")
+            elif i == qtd:
+                linhas.append("")
+            else:
+                linhas.append(f"Total: {qtd} jogos | R$ {self.jogos_simulacao.preco:.2f}")
+        return linhas
     
     def limpar_jogos_simulacao(self):
-        self.jogos_simulacao = []
+        self.jogos_simulacao = CarteiraCompacta()
         self.atualizar_display_jogos_simulacao()
         print("\n" + "="*60)
         print("JOGOS DA SIMULAÇÃO LIMPOS!")
@@ -503,6 +710,8 @@ class MegaSenaSimulator:
         if self.sorteio_ativo:
             return
         
+        # O sorteio é feito aqui, na thread da interface; a thread só revela as dezenas
+        numeros = sorteio_manual(self.combo_sorteador.get())
         self.sorteio_ativo = True
         self.numeros_sorteados = []
         
@@ -513,7 +722,7 @@ class MegaSenaSimulator:
         print("INICIANDO SORTEIO...")
         print("="*60)
         
-        self.thread_sorteio = threading.Thread(target=self.sortear_numeros, daemon=True)
+        self.thread_sorteio = threading.Thread(target=self.sortear_numeros, args=(numeros,), daemon=True)
         self.thread_sorteio.start()
     
     def parar_sorteio(self):
@@ -522,17 +731,13 @@ class MegaSenaSimulator:
         print("SORTEIO INTERROMPIDO!")
         print("="*60)
     
-    def sortear_numeros(self):
-        numeros_disponiveis = list(range(1, 61))
-        
-        for i in range(6):
+    def sortear_numeros(self, numeros):
+        for i, numero in enumerate(numeros):
             if not self.sorteio_ativo:
                 break
             
             time.sleep(5)
             
-            numero = random.choice(numeros_disponiveis)
-            numeros_disponiveis.remove(numero)
             self.numeros_sorteados.append(numero)
             
             print(f"\nNÚMERO #{i+1}: {numero:02d}")
@@ -617,10 +822,43 @@ class MegaSenaSimulator:
                 messagebox.showerror("Erro", "Quantidade inválida!")
                 return
             
-            self.qtd_max_sorteios = qtd_sorteios
-            self.simulacao_ativa = True
-            self.total_sorteios = 0
-            self.historico_sorteios = []
+            # As condições de parada são lidas aqui, na thread da interface
+            parar_em = []
+            if self.parar_em_quadra.get():
+                parar_em.append(4)
+            if self.parar_em_quina.get():
+                parar_em.append(5)
+            if self.parar_em_sena.get():
+                parar_em.append(6)
+            
+            estimativa = None
+            if self.parar_por_precisao.get():
+                precisao = float(self.entry_precisao.get().replace(",", "."))
+                if precisao <= 0:
+                    messagebox.showerror("Erro", "Precisão inválida!")
+                    return
+                # A execução termina pela precisão das faixas marcadas, não pelo primeiro prêmio
+                estimativa = EstimativaSequencial(precisao / 100, faixas=parar_em or [4])
+                parar_em = []
+            
+            nome_motor = self.combo_motor.get()
+            self.canal_progresso = CanalProgresso()
+            try:
+                self.motor = criar_motor(nome_motor, self.jogos_simulacao, qtd_sorteios, parar_em,
+                                         canal=self.canal_progresso, sorteador=self.combo_sorteador.get())
+            except ImportError as erro:
+                messagebox.showerror("Erro", f"Motor '{nome_motor}' indisponível: {erro}")
+                return
+            except ValueError as erro:
+                # Ex.: o motor 'raro' recusa carteiras cuja união de dezenas é larga demais
+                messagebox.showerror("Erro", f"O motor '{nome_motor}' recusou a carteira:\n{erro}")
+                return
+            self.motor.estimativa = estimativa
+            
+            if qtd_sorteios == 0:
+                # Simulações ilimitadas podem durar horas: o estado vai para o disco
+                os.makedirs(DIRETORIO_DADOS, exist_ok=True)
+                self.motor.checkpoint = Checkpoint(CAMINHO_CHECKPOINT)
             
             print("\n" + "="*80)
             print("INICIANDO SIMULAÇÃO")
@@ -628,93 +866,106 @@ class MegaSenaSimulator:
             print(f"Sorteios: {'Ilimitado' if qtd_sorteios == 0 else qtd_sorteios}")
             print("="*80)
             
-            thread_sim = threading.Thread(target=self.executar_simulacao, daemon=True)
-            thread_sim.start()
+            self.disparar_simulacao()
             
         except ValueError:
             messagebox.showerror("Erro", "Digite um número válido!")
     
+    def retomar_simulacao(self):
+        if self.simulacao_ativa:
+            messagebox.showinfo("Info", "Simulação já em andamento!")
+            return
+        
+        caminho = filedialog.askopenfilename(title="Retomar simulação", initialdir=DIRETORIO_DADOS,
+                                             initialfile=os.path.basename(CAMINHO_CHECKPOINT),
+                                             filetypes=[("Checkpoint", "*.json")])
+        if not caminho:
+            return
+        
+        self.canal_progresso = CanalProgresso()
+        try:
+            self.motor = retomar(caminho, self.jogos_simulacao, canal=self.canal_progresso)
+        except ImportError as erro:
+            messagebox.showerror("Erro", f"Motor indisponível: {erro}")
+            return
+        except (OSError, ValueError, KeyError) as erro:
+            messagebox.showerror("Erro", f"Não foi possível retomar a simulação:\n{erro}")
+            return
+        
+        print("\n" + "="*80)
+        print("RETOMANDO SIMULAÇÃO")
+        print(f"Jogos: {len(self.jogos_simulacao)}")
+        print(f"Sorteios já realizados: {self.motor.total_sorteios:,}")
+        print("="*80)
+        
+        self.disparar_simulacao()
+    
+    def disparar_simulacao(self):
+        """Executa self.motor em uma thread e começa a acompanhar o progresso"""
+        self.qtd_max_sorteios = self.motor.max_sorteios
+        self.simulacao_ativa = True
+        self.total_sorteios = self.motor.total_sorteios
+        self.historico_sorteios = HistoricoResumido(NOMES_FAIXAS)
+        self.mascaras_historico = array('Q', self.jogos_simulacao.mascaras)
+        
+        # Instrumentação opcional: sem ela o laço do motor não mede nada
+        if self.medir_desempenho.get():
+            self.motor.metricas = Metricas()
+        self.label_metricas_sim.config(text="")
+        self.label_estimativa_sim.config(text="")
+        
+        self.inicio_simulacao = time.perf_counter()
+        self.thread_simulacao = threading.Thread(target=self.executar_simulacao, daemon=True)
+        self.thread_simulacao.start()
+        self.root.after(self.intervalo_atualizacao_ms, self.consultar_progresso_simulacao)
+    
     def executar_simulacao(self):
-        melhor_resultado = 0
-        total_quadras = 0
-        total_quinas = 0
-        total_senas = 0
-        custo_por_sorteio = sum(j['preco'] for j in self.jogos_simulacao)
-        
-        while self.simulacao_ativa:
-            if self.qtd_max_sorteios > 0 and self.total_sorteios >= self.qtd_max_sorteios:
-                self.simulacao_ativa = False
-                break
-            
-            sorteio = sorted(random.sample(range(1, 61), 6))
-            self.total_sorteios += 1
-            
-            # Verifica acertos em cada jogo
-            resultados_jogos = []
-            melhor_acerto_sorteio = 0
-            parar = False
-            
-            for jogo in self.jogos_simulacao:
-                acertos = len(set(jogo['dezenas']) & set(sorteio))
-                resultados_jogos.append(acertos)
-                
-                if acertos > melhor_acerto_sorteio:
-                    melhor_acerto_sorteio = acertos
-                
-                if acertos == 4:
-                    total_quadras += 1
-                    if self.parar_em_quadra.get():
-                        parar = True
-                elif acertos == 5:
-                    total_quinas += 1
-                    if self.parar_em_quina.get():
-                        parar = True
-                elif acertos == 6:
-                    total_senas += 1
-                    if self.parar_em_sena.get():
-                        parar = True
-            
-            if melhor_acerto_sorteio > melhor_resultado:
-                melhor_resultado = melhor_acerto_sorteio
-            
-            premio = ""
-            if melhor_acerto_sorteio == 4:
-                premio = "QUADRA! 🎉"
-            elif melhor_acerto_sorteio == 5:
-                premio = "QUINA! 🎊"
-            elif melhor_acerto_sorteio == 6:
-                premio = "SENA! 🏆"
-            
-            info_sorteio = {
-                'numero': self.total_sorteios,
-                'sorteio': sorteio,
-                'resultados': resultados_jogos,
-                'melhor': melhor_acerto_sorteio,
-                'premio': premio
-            }
-            self.historico_sorteios.append(info_sorteio)
-            
-            self.root.after(0, self.atualizar_interface_simulacao, 
-                          melhor_resultado, total_quadras, total_quinas, total_senas, custo_por_sorteio)
-            
-            self.root.after(0, self.adicionar_linha_historico, info_sorteio)
-            
-            if self.total_sorteios % 100 == 0:
-                print(f"Sorteio #{self.total_sorteios}: Melhor={melhor_resultado} | Q={total_quadras} Qi={total_quinas} S={total_senas}")
-            
-            if parar:
-                print(f"\nCONDIÇÃO DE PARADA! {premio}")
-                self.simulacao_ativa = False
-                self.root.after(0, self.exibir_resultado_simulacao, 
-                              melhor_resultado, total_quadras, total_quinas, total_senas, custo_por_sorteio)
-                break
-            
-            time.sleep(0.001)
+        resultado = self.motor.executar()
+        self.total_sorteios = resultado['total_sorteios']
+        self.simulacao_ativa = False
         
-        if self.simulacao_ativa:
-            self.simulacao_ativa = False
-            self.root.after(0, self.exibir_resultado_simulacao, 
-                          melhor_resultado, total_quadras, total_quinas, total_senas, custo_por_sorteio)
+        # Interrompida ou não, a execução fica no catálogo
+        try:
+            Catalogo(CAMINHO_CATALOGO).registrar(self.motor, time.perf_counter() - self.inicio_simulacao)
+        except (OSError, ValueError) as erro:
+            print(f"Não foi possível registrar a simulação no catálogo: {erro}")
+        
+        if resultado['interrompido']:
+            return
+        
+        if resultado['sorteio_parada'] is not None:
+            print(f"\nCONDIÇÃO DE PARADA no sorteio #{resultado['sorteio_parada']:,}!")
+            if resultado['sorteador'] == 'contador':
+                # O sorteio da parada é regenerado a partir da semente, sem histórico
+                sorteio = sorteio_contador(resultado['semente'], resultado['sorteio_parada'])
+                print(f"Sorteio da parada: {sorteio} (semente {resultado['semente']})")
+        
+        self.root.after(0, self.exibir_resultado_simulacao, 
+                        resultado['melhor'], resultado['quadras'], resultado['quinas'],
+                        resultado['senas'], resultado['custo_por_sorteio'])
+    
+    def consultar_progresso_simulacao(self):
+        """Lê o canal de progresso e atualiza a interface (em ritmo fixo)"""
+        # Lê o estado antes de coletar: o motor publica o final antes de encerrar
+        ativa = self.thread_simulacao.is_alive()
+        instantaneo, novos_sorteios = self.canal_progresso.coletar()
+        
+        if instantaneo is not None:
+            self.total_sorteios = instantaneo['total_sorteios']
+            self.atualizar_interface_simulacao(instantaneo['melhor'], instantaneo['quadras'],
+                                               instantaneo['quinas'], instantaneo['senas'],
+                                               instantaneo['custo_por_sorteio'])
+        if novos_sorteios:
+            self.adicionar_linhas_historico(novos_sorteios)
+        
+        if self.motor.metricas is not None:
+            self.atualizar_metricas_simulacao(self.motor.metricas.instantaneo())
+        
+        if self.motor.estimativa is not None:
+            self.atualizar_estimativa_simulacao()
+        
+        if ativa:
+            self.root.after(self.intervalo_atualizacao_ms, self.consultar_progresso_simulacao)
     
     def atualizar_interface_simulacao(self, melhor, quadras, quinas, senas, custo):
         total_gasto = self.total_sorteios * custo
@@ -724,42 +975,189 @@ class MegaSenaSimulator:
         
         self.label_stats_sim.config(text=texto)
     
-    def adicionar_linha_historico(self, info):
-        if len(self.historico_sorteios) > 500:
-            self.text_historico.delete(1.0, tk.END)
-            for sorteio in self.historico_sorteios[-500:]:
-                self.escrever_linha_historico(sorteio)
-        else:
-            self.escrever_linha_historico(info)
-        
-        self.text_historico.see(tk.END)
+    def atualizar_metricas_simulacao(self, metricas):
+        if metricas is None:
+            return
+        texto = f"{metricas['media_movel']:,.0f} sorteios/s (média {metricas['sorteios_por_segundo']:,.0f})"
+        if metricas['fila'] is not None:
+            texto += f" | Fila: {metricas['fila']}"
+        if metricas['memoria'] is not None:
+            texto += f" | Memória: {metricas['memoria'] / 2**20:,.0f} MB"
+        if metricas['sorteios_medidos']:
+            texto += "\n" + " | ".join(
+                f"{fase}: {metricas['fases'][fase]['microssegundos_por_sorteio']:.2f} µs "
+                f"({metricas['fases'][fase]['fracao']:.0%})" for fase in FASES)
+        
+        self.label_metricas_sim.config(text=texto)
+    
+    def atualizar_estimativa_simulacao(self):
+        estimativa = self.motor.estimativa
+        intervalos = estimativa.intervalos(self.motor.custo_por_sorteio)
+        linhas = []
+        for faixa in estimativa.faixas:
+            intervalo = intervalos.get(faixa)
+            if intervalo is None or not intervalo['premios']:
+                linhas.append(f"{NOMES_FAIXAS[faixa]}: aguardando prêmios")
+                continue
+            linha = (f"{NOMES_FAIXAS[faixa]}: 1 a cada {intervalo['sorteios_por_premio']:,.0f} sorteios "
+                     f"(±{intervalo['erro_relativo']:.1%}, alvo ±{estimativa.precisao:.1%})")
+            if intervalo['custo_inferior'] is not None and intervalo['custo_superior'] is not None:
+                linha += f" | Custo: R$ {intervalo['custo_inferior']:,.2f} a R$ {intervalo['custo_superior']:,.2f}"
+            linhas.append(linha)
+        
+        self.label_estimativa_sim.config(text="\n".join(linhas))
     
-    def escrever_linha_historico(self, info):
-        # Calcula probabilidade total dos jogos
-        prob_total = sum(j['probabilidade'] for j in self.jogos_simulacao)
+    def adicionar_linhas_historico(self, infos):
+        for info in infos:
+            self.historico_sorteios.adicionar(info['numero'], info['sorteio'], info['resultados'], info['melhor'])
+        self.lista_historico.atualizar()
+    
+    def linhas_historico(self, inicio, fim):
+        return [self.formatar_linha_historico(*linha)
+                for linha in self.historico_sorteios.linhas(inicio, fim)]
+    
+    def formatar_linha_historico(self, numero, sorteio, melhor, premiados):
+        premio = nome_premio(melhor)
         
-        linha = f"#{info['numero']:6d} | {str(info['sorteio']):30s} | "
-        linha += f"Acertos: {info['resultados']} | Melhor: {info['melhor']}"
+        linha = f"#{numero:6d} | {str(sorteio):30s} | Melhor: {melhor} | "
+        linha += " | ".join(f"{NOMES_FAIXAS[faixa]}: {qtd}" for faixa, qtd in zip(NOMES_FAIXAS, premiados))
         
-        if info['premio']:
-            linha += f" | {info['premio']}"
+        if premio:
+            linha += f" | {premio}"
         
+        prob_total = self.jogos_simulacao.cobertura.probabilidade()
         linha += f" | Prob: {prob_total:.8f}%"
-        linha += "\n"
-        
-        self.text_historico.insert(tk.END, linha)
+        return linha
+    
+    def detalhar_sorteio_historico(self, indice):
+        """Janela com os acertos de cada jogo em um sorteio do histórico"""
+        numero, sorteio, _, _ = self.historico_sorteios.linha(indice)
+        mascara_sorteio = mascara(sorteio)
+        mascaras = self.mascaras_historico
+        
+        def linhas(inicio, fim):
+            # Acertos recalculados das dezenas sorteadas, só para as linhas visíveis
+            return [f"Jogo {i + 1}: {dezenas_da_mascara(mascaras[i])} | "
+                    f"{contar_bits(mascaras[i] & mascara_sorteio)} acertos" for i in range(inicio, fim)]
+        
+        janela = tk.Toplevel(self.root)
+        janela.title(f"Sorteio #{numero}: {sorteio}")
+        janela.geometry("650x400")
+        janela.configure(bg="#1e1e2e")
+        ListaVirtual(janela, lambda: len(mascaras), linhas, height=20).pack(fill="both", expand=True,
+                                                                              padx=10, pady=10)
     
     def parar_simulacao(self):
         self.simulacao_ativa = False
+        if self.motor is not None:
+            self.motor.parar()
         print("\nSIMULAÇÃO INTERROMPIDA!")
     
     def limpar_historico(self):
-        self.historico_sorteios = []
+        self.historico_sorteios.limpar()
         self.total_sorteios = 0
-        self.text_historico.delete(1.0, tk.END)
+        self.lista_historico.atualizar()
         self.label_stats_sim.config(text="Histórico limpo.")
         print("\nHISTÓRICO LIMPO!")
     
+    def backtest_resultados_reais(self):
+        if not self.jogos_simulacao:
+            messagebox.showwarning("Aviso", "Adicione pelo menos um jogo!")
+            return
+        
+        caminho = filedialog.askopenfilename(
+            title="Resultados reais da Mega-Sena",
+            filetypes=[("Planilha de resultados", "*.csv *.xlsx"), ("Resultados binários", "*.msr"),
+                       ("Todos os arquivos", "*.*")])
+        if not caminho:
+            return
+        
+        erros = []
+        try:
+            resultados = carregar_resultados(caminho, erros)
+            backtest = resultados.backtest(self.jogos_simulacao)
+        except ImportError as erro:
+            messagebox.showerror("Erro", f"Backtest indisponível: {erro}")
+            return
+        except (OSError, ValueError) as erro:
+            messagebox.showerror("Erro", f"Não foi possível ler os resultados:\n{erro}")
+            return
+        
+        if not len(resultados):
+            messagebox.showwarning("Aviso", "Nenhum concurso válido no arquivo!")
+            return
+        
+        primeiro, _, _ = resultados.sorteio(0)
+        ultimo, _, _ = resultados.sorteio(len(resultados) - 1)
+        texto = f"BACKTEST: concursos {primeiro} a {ultimo} ({backtest['total_sorteios']:,})\n\n"
+        texto += f"Custo por concurso: R$ {backtest['custo_por_sorteio']:.2f}\n"
+        texto += f"💰 TOTAL GASTO: R$ {backtest['total_gasto']:,.2f}\n\n"
+        texto += f"Melhor resultado: {backtest['melhor']} acertos\n\n"
+        texto += f"Prêmios obtidos:\n"
+        texto += f"  • Quadras: {backtest['quadras']}\n"
+        texto += f"  • Quinas: {backtest['quinas']}\n"
+        texto += f"  • Senas: {backtest['senas']}\n"
+        
+        # Os maiores acertos primeiro
+        destaques = sorted(backtest['premiados'], key=lambda p: (-p['acertos'], p['concurso']))[:5]
+        if destaques:
+            texto += "\nDestaques:\n"
+            # Jogos de 7+ dezenas levam vários prêmios, de mais de uma faixa
+            texto += "\n".join(f"  Concurso {p['concurso']} ({p['data']}): jogo {p['jogo'] + 1}, "
+                               f"{p['acertos']} acertos ("
+                               + ", ".join(f"{qtd} {nome}" for nome, qtd in p['premios'].items()) + ")"
+                               for p in destaques)
+        if erros:
+            texto += f"\n\n{len(erros)} linhas inválidas ignoradas."
+        
+        messagebox.showinfo("Backtest com Resultados Reais", texto)
+        print("\n" + "="*80)
+        print(texto)
+        print("="*80)
+    
+    def replicar_experimentos(self):
+        if not self.jogos_simulacao:
+            messagebox.showwarning("Aviso", "Adicione pelo menos um jogo!")
+            return
+        
+        replicas = simpledialog.askinteger("Replicar", "Experimentos por faixa:", initialvalue=10000,
+                                           minvalue=1, parent=self.root)
+        if not replicas:
+            return
+        
+        # Faixas marcadas nas condições de parada (todas, se nenhuma estiver marcada)
+        faixas = [faixa for faixa, marcada in ((4, self.parar_em_quadra), (5, self.parar_em_quina),
+                                               (6, self.parar_em_sena)) if marcada.get()] or [4, 5, 6]
+        replicacao = ReplicacaoExperimentos(list(self.jogos_simulacao), replicas, faixas)
+        self.label_stats_sim.config(text=f"Replicando {replicas:,} experimentos por faixa...")
+        
+        def executar():
+            try:
+                replicacao.executar()
+            except ImportError as erro:
+                self.root.after(0, messagebox.showerror, "Erro", f"Replicação indisponível: {erro}")
+                return
+            self.root.after(0, self.exibir_replicacao, replicacao.resultado())
+        
+        threading.Thread(target=executar, daemon=True).start()
+    
+    def exibir_replicacao(self, resultado):
+        texto = f"EXPERIMENTOS REPLICADOS (semente {resultado['semente']})\n"
+        texto += f"Custo por sorteio: R$ {resultado['custo_por_sorteio']:.2f}\n"
+        for nome, faixa in resultado['faixas'].items():
+            quantis = faixa['quantis']
+            gastos = faixa['gasto_quantis']
+            texto += f"\nAté a primeira {nome.upper()} ({faixa['replicas']:,} experimentos):\n"
+            texto += f"  Média: {faixa['media']:,.0f} sorteios (R$ {faixa['gasto_medio']:,.2f})\n"
+            for q in ("5%", "50%", "95%"):
+                texto += f"  {q:>3} terminam em até {quantis[q]:,} sorteios (R$ {gastos[q]:,.2f})\n"
+        
+        self.label_stats_sim.config(text="Replicação concluída.")
+        messagebox.showinfo("Experimentos Replicados", texto)
+        print("\n" + "="*80)
+        print(texto)
+        print("="*80)
+    
     def exibir_resultado_simulacao(self, melhor, quadras, quinas, senas, custo_sorteio):
         total_gasto = self.total_sorteios * custo_sorteio
         
@@ -777,7 +1175,8 @@ class MegaSenaSimulator:
             custo_para_sena = total_gasto / senas
             resultado += f"🏆 SENA em {senas} vez(es)!\n"
             resultado += f"Custo médio por SENA: R$ {custo_para_sena:,.2f}\n"
-            resultado += f"Sorteios até primeira SENA: ~{self.total_sorteios // max(1, senas):,}"
+            # Média desta execução; a distribuição até a primeira SENA vem do botão "Replicar"
+            resultado += f"Sorteios por SENA nesta simulação: {self.total_sorteios // senas:,}"
         elif quinas > 0:
             custo_para_quina = total_gasto / quinas
             resultado += f"🎊 QUINA em {quinas} vez(es)!\n"
@@ -789,6 +1188,20 @@ class MegaSenaSimulator:
         else:
             resultado += f"😢 Sem prêmios nesta simulação."
         
+        estimativa = self.motor.estimativa
+        if estimativa is not None:
+            self.atualizar_estimativa_simulacao()
+            confianca = f"{estimativa.confianca:.0%}"
+            resultado += "\n\nPrecisão atingida" if estimativa.atingida else "\n\nPrecisão NÃO atingida"
+            resultado += f" (intervalos de {confianca}):"
+            for faixa, intervalo in sorted(estimativa.intervalos(custo_sorteio).items()):
+                if intervalo['custo_inferior'] is None:
+                    continue
+                superior = (f"R$ {intervalo['custo_superior']:,.2f}" if intervalo['custo_superior'] is not None
+                            else "sem limite")
+                resultado += (f"\n  • Custo por {NOMES_FAIXAS[faixa]}: R$ {intervalo['custo_inferior']:,.2f}"
+                              f" a {superior}")
+        
         messagebox.showinfo("Resultado da Simulação", resultado)
         print("\n" + "="*80)
         print(resultado)
@@ -0,0 +1,195 @@
+"""Amostrador de eventos raros para simulações "até a SENA".
+
+Um sorteio só importa para os contadores quando algum jogo é premiado
+("evento"; na Mega-Sena, 4 ou mais acertos). Como os acertos dependem
+apenas da interseção do sorteio com a união U das dezenas da carteira,
+enumeram-se os subconjuntos S de U que premiam algum jogo (de 4 a 6
+dezenas, na Mega-Sena): cada um representa C(N - |U|, k - |S|) sorteios
+de k dezenas em N. Isso dá a probabilidade exata de cada faixa por
+sorteio e permite sortear diretamente:
+
+- o tempo de espera até o próximo evento (distribuição geométrica);
+- o próprio sorteio do evento, condicionado a ser um evento.
+
+O custo da compilação cresce com C(|U|, k); é imediato para carteiras
+da Mega-Sena cuja união tem até ~25 dezenas. Acima de LIMITE_PADROES
+subconjuntos (Lotofácil, Lotomania) o motor não se aplica.
+"""
+import random
+from bisect import bisect_right
+from itertools import accumulate, combinations
+from math import floor, log1p
+
+from loterias import MEGA_SENA
+from motor import MotorSimulacao, combinar, contar_bits, mascara
+
+# Maior quantidade de subconjuntos da união enumerados na compilação
+LIMITE_PADROES = 2_000_000
+
+
+class EventosCarteira:
+    """Padrões de interseção que geram prêmio, com seus pesos exatos.
+
+    Cada padrão guarda as dezenas sorteadas dentro de U, a quantidade de
+    sorteios que ele representa, os acertos de cada jogo e os prêmios por
+    faixa da carteira (da tabela da loteria).
+    """
+
+    def __init__(self, jogos, loteria=MEGA_SENA):
+        mascaras = [j.get('mascara') or mascara(j['dezenas']) for j in jogos]
+        tamanhos = [len(j['dezenas']) for j in jogos]
+        uniao = 0
+        for m in mascaras:
+            uniao |= m
+        self.uniao = uniao
+        self.loteria = loteria
+        self.fora_da_uniao = [d for d in loteria.numeros if not uniao >> (d - 1) & 1]
+        tamanho_uniao = loteria.universo - len(self.fora_da_uniao)
+
+        faixa_minima = loteria.acertos_minimo
+        tamanhos_padrao = range(faixa_minima, min(loteria.sorteados, tamanho_uniao) + 1)
+        if sum(combinar(tamanho_uniao, tamanho) for tamanho in tamanhos_padrao) > LIMITE_PADROES:
+            raise ValueError(f"{loteria.nome}: a união da carteira ({tamanho_uniao} dezenas) é grande demais "
+                             "para o amostrador de eventos raros")
+        self.padroes = []
+        self.pesos = []
+        self.acertos = []
+        self.premios = []
+        # Sorteios (do total de combinações da loteria) com pelo menos um prêmio da faixa
+        self.sorteios_por_faixa = {faixa: 0 for faixa in loteria.faixas}
+
+        dezenas_uniao = [d for d in loteria.numeros if uniao >> (d - 1) & 1]
+        for tamanho in tamanhos_padrao:
+            peso = combinar(loteria.universo - tamanho_uniao, loteria.sorteados - tamanho)
+            if not peso:
+                continue
+            for combinacao in combinations(dezenas_uniao, tamanho):
+                padrao = mascara(combinacao)
+                acertos = [contar_bits(m & padrao) for m in mascaras]
+                if max(acertos) < faixa_minima:
+                    continue
+                premios = {faixa: 0 for faixa in loteria.faixas}
+                for qtd, h in zip(tamanhos, acertos):
+                    for faixa, quantidade in loteria.tabela_premios[qtd, h].items():
+                        premios[faixa] += quantidade
+                if not any(premios.values()):
+                    continue
+                self.padroes.append(combinacao)
+                self.pesos.append(peso)
+                self.acertos.append(acertos)
+                self.premios.append(premios)
+                for faixa, quantidade in premios.items():
+                    if quantidade:
+                        self.sorteios_por_faixa[faixa] += peso
+
+        self.pesos_acumulados = list(accumulate(self.pesos))
+        self.sorteios_evento = self.pesos_acumulados[-1] if self.pesos else 0
+
+    def probabilidade_evento(self):
+        """Probabilidade exata de um sorteio gerar algum prêmio"""
+        return self.sorteios_evento / self.loteria.total_combinacoes
+
+    def probabilidades_por_faixa(self):
+        """Probabilidade exata, por faixa, de um sorteio gerar ao menos um prêmio dela"""
+        return {faixa: qtd / self.loteria.total_combinacoes for faixa, qtd in self.sorteios_por_faixa.items()}
+
+    def sortear_espera(self, rng):
+        """Número de sorteios até o próximo evento, inclusive (geométrica)"""
+        p = self.probabilidade_evento()
+        if p >= 1:
+            return 1
+        return 1 + floor(log1p(-rng.random()) / log1p(-p))
+
+    def sortear_evento(self, rng):
+        """Sorteia um evento condicionado.
+
+        Retorna (dezenas ordenadas, acertos por jogo, prêmios por faixa).
+        """
+        indice = bisect_right(self.pesos_acumulados, rng.randrange(self.sorteios_evento))
+        dentro = self.padroes[indice]
+        fora = rng.sample(self.fora_da_uniao, self.loteria.sorteados - len(dentro))
+        return sorted(dentro + tuple(fora)), self.acertos[indice], self.premios[indice]
+
+
+class MotorRaro(MotorSimulacao):
+    """Mesmas entradas e resultado do MotorSimulacao, saltando sorteios sem prêmio.
+
+    Só os sorteios premiados são gerados (e passados a ao_sortear, canal e
+    historico); os contadores e o custo têm a mesma distribuição da força
+    bruta. O melhor resultado considera apenas esses sorteios. Os sorteios
+    vêm dos padrões premiados: o parâmetro sorteador não se aplica, e as
+    estatísticas das dezenas (atributo estatisticas) não são acumuladas.
+    """
+
+    # Eventos entre duas publicações no canal de progresso
+    intervalo_publicacao = 64
+
+    def __init__(self, jogos, max_sorteios=0, parar_em=(6,), semente=None, ao_sortear=None,
+                 canal=None, historico=None, sorteador='amostra', eventos=None, loteria=None):
+        super().__init__(jogos, max_sorteios, parar_em, semente, ao_sortear, canal, historico, sorteador, loteria)
+        # Esperas e eventos vêm sempre de um random.Random
+        self.rng = random.Random(self.semente)
+        self.eventos = eventos or EventosCarteira(self.jogos, self.loteria)
+
+    def executar(self):
+        self.ativo = True
+        if self.metricas is not None:
+            # Só a vazão: não há um laço por sorteio a cronometrar
+            self.metricas.iniciar(self)
+        eventos = self.eventos
+        rng = self.rng
+        premios = self.premios
+        detalhar = self.ao_sortear is not None or self.canal is not None
+        recentes = []
+
+        while self.ativo and eventos.sorteios_evento:
+            proximo = self.total_sorteios + eventos.sortear_espera(rng)
+            if self.max_sorteios > 0 and proximo > self.max_sorteios:
+                self.total_sorteios = self.max_sorteios
+                break
+            self.total_sorteios = proximo
+
+            sorteio, resultados_jogos, premios_evento = eventos.sortear_evento(rng)
+            parar = False
+            for faixa, quantidade in premios_evento.items():
+                if quantidade:
+                    premios[faixa] += quantidade
+                    if faixa in self.parar_em:
+                        parar = True
+
+            melhor_acerto_sorteio = max(resultados_jogos)
+            if melhor_acerto_sorteio > self.melhor_resultado:
+                self.melhor_resultado = melhor_acerto_sorteio
+
+            if self.historico is not None:
+                self.historico.adicionar(self.total_sorteios, sorteio, resultados_jogos)
+
+            if detalhar:
+                info_sorteio = {
+                    'numero': self.total_sorteios,
+                    'sorteio': sorteio,
+                    'resultados': resultados_jogos,
+                    'melhor': melhor_acerto_sorteio,
+                    'premio': self.loteria.nome_premio(melhor_acerto_sorteio)
+                }
+                if self.ao_sortear is not None:
+                    self.ao_sortear(info_sorteio)
+                if self.canal is not None:
+                    recentes.append(info_sorteio)
+                    if len(recentes) >= self.intervalo_publicacao:
+                        self.publicar_progresso(recentes)
+                        recentes = []
+
+            if parar:
+                self.sorteio_parada = self.total_sorteios
+                break
+
+            if self.registrar_estimativa():
+                break
+            self.registrar_checkpoint()
+
+        self.registrar_estimativa()
+        self.ativo = False
+        self.publicar_progresso(recentes)
+        self.registrar_checkpoint(final=True)
+        return self.resultado()
@@ -0,0 +1,129 @@
+"""Avaliação exata de uma carteira contra todos os C(60,6) sorteios.
+
+Os 50.063.860 sorteios são enumerados em blocos: para cada par inicial
+(a, b), o bloco é formado pelas quadras (4 dezenas) maiores que b. Os
+acertos de cada grupo de jogos em todas as quadras são calculados uma
+vez; os de um bloco são esses acertos mais os de a e b. A memória fica
+limitada às quadras de um grupo de jogos e aos acumuladores de uma única
+dezena inicial a (no máximo C(59,5) sorteios), e os valores de a podem
+ser distribuídos entre processos. A enumeração é a dos sorteios de 6
+dezenas em 60: só a Mega-Sena é aceita. Requer numpy.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+
+import numpy as np
+
+from loterias import MEGA_SENA
+from motor import NOMES_FAIXAS, TABELA_PREMIOS, combinar
+
+TOTAL_COMBINACOES = combinar(60, 6)
+
+# Jogos pontuados de cada vez dentro de um bloco (limita a matriz de acertos)
+JOGOS_POR_GRUPO = 64
+
+
+def _quadras():
+    """Todas as C(60,4) quadras em ordem lexicográfica (uint8, 4 colunas)"""
+    return np.array(list(combinations(range(1, 61), 4)), dtype=np.uint8)
+
+
+def _avaliar_primeiras(dezenas_jogos, primeiras):
+    """Distribuições parciais para os sorteios cuja menor dezena está em `primeiras`"""
+    quadras = _quadras()
+    # inicio[b] = primeira quadra cuja menor dezena é maior que b
+    inicio = np.searchsorted(quadras[:, 0], np.arange(61) + 1)
+
+    pertinencia = np.zeros((len(dezenas_jogos), 61), dtype=np.uint8)
+    for idx, dezenas in enumerate(dezenas_jogos):
+        pertinencia[idx, dezenas] = 1
+    grupos = [slice(g, g + JOGOS_POR_GRUPO) for g in range(0, len(dezenas_jogos), JOGOS_POR_GRUPO)]
+
+    def acertos_nas_quadras(grupo):
+        p = pertinencia[grupo]
+        return p[:, quadras[:, 0]] + p[:, quadras[:, 1]] + p[:, quadras[:, 2]] + p[:, quadras[:, 3]]
+
+    # Com um único grupo, os acertos nas quadras são calculados uma só vez
+    unico = acertos_nas_quadras(grupos[0]) if len(grupos) == 1 else None
+
+    # Prêmios de cada jogo por (acertos, faixa), de TABELA_PREMIOS
+    premios_jogos = np.array([[list(TABELA_PREMIOS[len(dezenas), acertos].values()) for acertos in range(7)]
+                              for dezenas in dezenas_jogos], dtype=np.int32)
+    # Maior quantidade possível de prêmios de cada faixa em um sorteio
+    maximo = premios_jogos.max(axis=1).sum(axis=0)
+    faixa_minima = min(NOMES_FAIXAS)
+
+    melhor = np.zeros(7, dtype=np.int64)
+    faixas = {faixa: np.zeros(int(maximo[i]) + 1, dtype=np.int64) for i, faixa in enumerate(NOMES_FAIXAS)}
+
+    for a in primeiras:
+        # Acumuladores por sorteio, apenas dos sorteios com menor dezena `a`
+        qtd_sorteios = combinar(60 - a, 5)
+        melhor_a = np.zeros(qtd_sorteios, dtype=np.uint8)
+        premios_a = {faixa: np.zeros(qtd_sorteios, dtype=np.int32) for faixa in NOMES_FAIXAS}
+
+        for grupo in grupos:
+            acertos_quadras = unico if unico is not None else acertos_nas_quadras(grupo)
+            pertinencia_a = pertinencia[grupo, a]
+            deslocamento = 0
+            for b in range(a + 1, 57):
+                extras = (pertinencia_a + pertinencia[grupo, b])[:, None]
+                acertos = acertos_quadras[:, inicio[b]:] + extras
+                trecho = slice(deslocamento, deslocamento + acertos.shape[1])
+                np.maximum(melhor_a[trecho], acertos.max(axis=0), out=melhor_a[trecho])
+                for qtd_acertos in range(faixa_minima, 7):
+                    ocorrencias = acertos == qtd_acertos
+                    for i, faixa in enumerate(NOMES_FAIXAS):
+                        pesos = premios_jogos[grupo, qtd_acertos, i]
+                        if not pesos.any():
+                            continue
+                        if pesos.min() == pesos.max():
+                            # Jogos do mesmo tamanho: basta contar as ocorrências
+                            premios_a[faixa][trecho] += int(pesos[0]) * np.count_nonzero(ocorrencias, axis=0)
+                        else:
+                            premios_a[faixa][trecho] += pesos @ ocorrencias
+                deslocamento += acertos.shape[1]
+
+        melhor += np.bincount(melhor_a, minlength=7)
+        for faixa in NOMES_FAIXAS:
+            faixas[faixa] += np.bincount(premios_a[faixa], minlength=len(faixas[faixa]))
+
+    return melhor, faixas
+
+
+def avaliar_carteira(jogos, processos=1, loteria=MEGA_SENA):
+    """Distribuições exatas da carteira sobre todos os sorteios possíveis.
+
+    Retorna um dicionário com:
+    - 'melhor': {acertos: sorteios em que o melhor jogo fez esses acertos}
+    - 'faixas': {faixa: {qtd de prêmios: sorteios com essa quantidade}}, contando
+      os vários prêmios de jogos com mais de 6 dezenas (TABELA_PREMIOS)
+    - 'probabilidades': {faixa: probabilidade de ao menos um prêmio da faixa}
+    Nas outras loterias, use amostrador_raro.EventosCarteira.
+    """
+    if loteria is not MEGA_SENA:
+        raise ValueError(f"O avaliador exato só enumera os sorteios da Mega-Sena, não da {loteria.nome} "
+                         "(use amostrador_raro.EventosCarteira)")
+    dezenas_jogos = [j['dezenas'] for j in jogos]
+
+    if processos > 1:
+        # Menores dezenas possíveis (1 a 55) intercaladas entre os processos,
+        # equilibrando os blocos grandes (a pequeno) e os pequenos
+        lotes = [list(range(1 + i, 56, processos)) for i in range(processos)]
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            parciais = list(executor.map(_avaliar_primeiras, [dezenas_jogos] * processos, lotes))
+    else:
+        parciais = [_avaliar_primeiras(dezenas_jogos, range(1, 56))]
+
+    melhor = sum(p[0] for p in parciais)
+    faixas = {faixa: sum(p[1][faixa] for p in parciais) for faixa in NOMES_FAIXAS}
+
+    return {
+        'total_sorteios': TOTAL_COMBINACOES,
+        'melhor': {acertos: int(qtd) for acertos, qtd in enumerate(melhor)},
+        'faixas': {faixa: {qtd: int(n) for qtd, n in enumerate(dist) if n}
+                   for faixa, dist in faixas.items()},
+        'probabilidades': {faixa: (TOTAL_COMBINACOES - int(dist[0])) / TOTAL_COMBINACOES
+                           for faixa, dist in faixas.items()}
+    }
+
@@ -0,0 +1,215 @@
+"""Benchmark dos motores de simulação.
+
+Mede, para cada motor e cada carteira (quantidade de jogos x dezenas por
+jogo), a vazão em sorteios por segundo, o pico de memória alocada e,
+opcionalmente, o tempo até a primeira SENA. As carteiras e os sorteios
+são determinados pela semente e a quantidade de sorteios de cada caso é
+fixa: os contadores de uma mesma versão se repetem, e as medidas de
+versões diferentes podem ser comparadas. O motor 'legado' é o laço
+original da interface (interseção de conjuntos por jogo).
+
+Saída em JSON lines: uma linha de ambiente e uma linha por medida.
+
+Exemplo:
+    python benchmark.py --motores legado serial vetorizado --carteiras 1 10 1000 --saida bench.jsonl
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from motor import MOTORES, criar_jogo, criar_motor
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+TAMANHOS_CARTEIRA = (1, 10, 1000, 100000)
+TAMANHOS_JOGO = (6, 10, 15, 20)
+
+# Sorteios por caso, limitados a CELULAS_POR_CASO / jogos (sorteios x jogos)
+SORTEIOS_POR_CASO = 200_000
+CELULAS_POR_CASO = 20_000_000
+MIN_SORTEIOS = 100
+
+# Bloco fixo do motor paralelo: os sorteios não dependem da quantidade de processos
+BLOCO_PARALELO = 50_000
+
+
+def gerar_carteira(qtd_jogos, qtd_dezenas, semente):
+    """Carteira reproduzível de jogos aleatórios"""
+    rng = random.Random(f"{semente}:{qtd_jogos}:{qtd_dezenas}")
+    return [criar_jogo(rng.sample(range(1, 61), qtd_dezenas)) for _ in range(qtd_jogos)]
+
+
+def executar_legado(jogos, max_sorteios, parar_em=(6,), semente=None):
+    """Laço original de executar_simulacao, sem a interface (conjuntos por jogo)"""
+    rng = random.Random(semente)
+    premios = {4: 0, 5: 0, 6: 0}
+    melhor_resultado = 0
+    total_sorteios = 0
+    sorteio_parada = None
+
+    while max_sorteios == 0 or total_sorteios < max_sorteios:
+        sorteio = sorted(rng.sample(range(1, 61), 6))
+        total_sorteios += 1
+
+        resultados_jogos = []
+        melhor_acerto_sorteio = 0
+        parar = False
+
+        for jogo in jogos:
+            acertos = len(set(jogo['dezenas']) & set(sorteio))
+            resultados_jogos.append(acertos)
+            if acertos > melhor_acerto_sorteio:
+                melhor_acerto_sorteio = acertos
+            if acertos in premios:
+                premios[acertos] += 1
+                if acertos in parar_em:
+                    parar = True
+
+        if melhor_acerto_sorteio > melhor_resultado:
+            melhor_resultado = melhor_acerto_sorteio
+
+        if parar:
+            sorteio_parada = total_sorteios
+            break
+
+    return {
+        'total_sorteios': total_sorteios,
+        'melhor': melhor_resultado,
+        'quadras': premios[4],
+        'quinas': premios[5],
+        'senas': premios[6],
+        'sorteio_parada': sorteio_parada
+    }
+
+
+def executar(nome, jogos, max_sorteios, parar_em, semente, processos):
+    """Executa um motor (ou o legado) e retorna o resultado"""
+    if nome == 'legado':
+        return executar_legado(jogos, max_sorteios, parar_em, semente)
+    extras = {'processos': processos, 'tamanho_bloco': BLOCO_PARALELO} if nome == 'paralelo' else {}
+    return criar_motor(nome, jogos, max_sorteios, parar_em, semente, **extras).executar()
+
+
+def medir(nome, jogos, sorteios, semente, processos=None, memoria=True):
+    """Vazão (e pico de memória) de `sorteios` sorteios sem condição de parada"""
+    inicio = time.perf_counter()
+    resultado = executar(nome, jogos, sorteios, (), semente, processos)
+    segundos = time.perf_counter() - inicio
+
+    medida = {
+        'sorteios': resultado['total_sorteios'],
+        'segundos': round(segundos, 6),
+        'sorteios_por_segundo': round(resultado['total_sorteios'] / segundos, 1) if segundos else None,
+        'quadras': resultado['quadras'],
+        'quinas': resultado['quinas'],
+        'senas': resultado['senas'],
+        'melhor': resultado['melhor']
+    }
+
+    if memoria:
+        # Execução separada: o tracemalloc deixa as alocações mais lentas.
+        # No motor paralelo, só o processo principal é medido.
+        tracemalloc.start()
+        executar(nome, jogos, sorteios, (), semente, processos)
+        medida['pico_memoria_bytes'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return medida
+
+
+def medir_primeira_sena(nome, jogos, semente, limite, processos=None):
+    """Sorteios e tempo até a primeira SENA (no máximo `limite` sorteios)"""
+    inicio = time.perf_counter()
+    resultado = executar(nome, jogos, limite, (6,), semente, processos)
+    return {
+        'sorteios': resultado['total_sorteios'],
+        'segundos': round(time.perf_counter() - inicio, 6),
+        'atingiu': resultado['sorteio_parada'] is not None
+    }
+
+
+def ambiente():
+    try:
+        import numpy
+        versao_numpy = numpy.__version__
+    except ImportError:
+        versao_numpy = None
+    return {
+        'python': platform.python_version(),
+        'implementacao': platform.python_implementation(),
+        'plataforma': platform.platform(),
+        'processador': platform.processor() or platform.machine(),
+        'cpus': os.cpu_count(),
+        'numpy': versao_numpy
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark dos motores de simulação (saída em JSON lines).")
+    parser.add_argument("--motores", nargs="+", choices=['legado'] + list(MOTORES),
+                        default=['legado', 'serial', 'indexado', 'vetorizado', 'paralelo'])
+    parser.add_argument("--carteiras", nargs="+", type=int, default=list(TAMANHOS_CARTEIRA),
+                        help="quantidades de jogos por carteira")
+    parser.add_argument("--dezenas", nargs="+", type=int, default=list(TAMANHOS_JOGO),
+                        help="dezenas por jogo (6 a 20)")
+    parser.add_argument("--sorteios", type=int, default=SORTEIOS_POR_CASO, help="sorteios por caso")
+    parser.add_argument("--celulas", type=int, default=CELULAS_POR_CASO,
+                        help="limite de sorteios x jogos por caso (carteiras grandes usam menos sorteios)")
+    parser.add_argument("--semente", type=int, default=2024)
+    parser.add_argument("--processos", type=int, default=None, help="processos do motor paralelo")
+    parser.add_argument("--sem-memoria", action="store_true", help="não mede o pico de memória")
+    parser.add_argument("--sena", action="store_true", help="mede também o tempo até a primeira SENA")
+    parser.add_argument("--limite-sena", type=int, default=20_000_000,
+                        help="máximo de sorteios na medida até a primeira SENA")
+    parser.add_argument("--saida", default="-", help="arquivo de saída (padrão: saída padrão)")
+    args = parser.parse_args(argv)
+
+    saida = sys.stdout if args.saida == "-" else open(args.saida, "w", encoding="utf-8")
+
+    def emitir(tipo, **dados):
+        saida.write(json.dumps({'tipo': tipo, **dados}, ensure_ascii=False) + "\n")
+        saida.flush()
+
+    try:
+        emitir('ambiente', semente=args.semente, **ambiente())
+        for qtd_jogos in args.carteiras:
+            for qtd_dezenas in args.dezenas:
+                jogos = gerar_carteira(qtd_jogos, qtd_dezenas, args.semente)
+                sorteios = max(MIN_SORTEIOS, min(args.sorteios, args.celulas // qtd_jogos))
+                caso = {'motor': None, 'jogos': qtd_jogos, 'dezenas': qtd_dezenas}
+
+                for nome in args.motores:
+                    caso['motor'] = nome
+                    tipo = 'vazao'
+                    try:
+                        emitir(tipo, **caso, **medir(nome, jogos, sorteios, args.semente, args.processos,
+                                                     not args.sem_memoria))
+                        if args.sena:
+                            tipo = 'primeira_sena'
+                            emitir(tipo, **caso, **medir_primeira_sena(
+                                nome, jogos, args.semente, args.limite_sena, args.processos))
+                    except ImportError as erro:
+                        emitir(tipo, **caso, erro=f"motor indisponível: {erro}")
+                    except ValueError as erro:
+                        # Ex.: o motor 'raro' recusa carteiras largas demais
+                        emitir(tipo, **caso, erro=f"caso recusado pelo motor: {erro}")
+
+        if resource is not None:
+            # Pico de memória residente do processo (KiB no Linux, bytes no macOS)
+            emitir('processo', rss_maximo=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+        return 0
+    finally:
+        if saida is not sys.stdout:
+            saida.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+"""Importação e exportação de bilhetes em massa.
+
+Arquivos de texto/CSV (um bilhete por linha, dezenas separadas por
+vírgula, ponto e vírgula, espaço ou tabulação) são lidos em fluxo, com
+validação por linha. Os bilhetes válidos podem ser gravados em um
+arquivo binário compacto (uma máscara uint64 por bilhete), que execuções
+posteriores abrem por mapeamento de memória em vez de ler o texto de novo.
+A validação segue o volante da loteria informada (Mega-Sena por padrão);
+o formato binário comporta loterias de até 64 números.
+"""
+import mmap
+import re
+import struct
+import sys
+from array import array
+from collections import Counter
+
+from loterias import MEGA_SENA
+from motor import PRECOS, CoberturaSena, contar_bits, criar_jogo, dezenas_da_mascara
+
+# Cabeçalho do arquivo binário: identificador, 4 bytes reservados e a
+# quantidade de bilhetes; em seguida, uma máscara uint64 little-endian por bilhete
+ASSINATURA = b"MSB1"
+CABECALHO = struct.Struct("<4s4xQ")
+
+# Bilhetes acumulados em memória antes de cada escrita no arquivo binário
+BILHETES_POR_ESCRITA = 65536
+
+SEPARADORES = re.compile(r"[,;\s]+")
+
+
+def validar_linha(texto, loteria=MEGA_SENA):
+    """Converte uma linha em máscara; retorna (máscara, None) ou (None, erro)"""
+    partes = SEPARADORES.split(texto.strip())
+    try:
+        dezenas = [int(p) for p in partes if p]
+    except ValueError:
+        return None, "Digite apenas números separados por vírgula!"
+
+    if len(dezenas) not in loteria.precos:
+        return None, f"Escolha entre {loteria.aposta_simples} e {max(loteria.precos)} dezenas!"
+
+    if any(d < 1 or d > loteria.universo for d in dezenas):
+        return None, f"Dezenas devem estar entre 1 e {loteria.universo}!"
+
+    valor = 0
+    for d in dezenas:
+        valor |= 1 << (d - 1)
+    if contar_bits(valor) != len(dezenas):
+        return None, "Há dezenas repetidas!"
+
+    return valor, None
+
+
+def ler_bilhetes(linhas, erros=None, loteria=MEGA_SENA):
+    """Gera as máscaras dos bilhetes válidos de um iterável de linhas.
+
+    Linhas vazias e iniciadas por '#' são ignoradas. Se `erros` for uma
+    lista, recebe (número da linha, texto, mensagem) de cada linha inválida.
+    """
+    for numero, texto in enumerate(linhas, 1):
+        if not texto.strip() or texto.lstrip().startswith("#"):
+            continue
+        valor, erro = validar_linha(texto, loteria)
+        if erro is None:
+            yield valor
+        elif erros is not None:
+            erros.append((numero, texto.rstrip("\n"), erro))
+
+
+def gravar_binario(mascaras, caminho):
+    """Grava máscaras no formato binário; retorna a quantidade gravada"""
+    total = 0
+    with open(caminho, "wb") as arquivo:
+        arquivo.write(CABECALHO.pack(ASSINATURA, 0))
+        lote = array('Q')
+        for valor in mascaras:
+            lote.append(valor)
+            if len(lote) >= BILHETES_POR_ESCRITA:
+                total += _escrever_lote(arquivo, lote)
+                lote = array('Q')
+        total += _escrever_lote(arquivo, lote)
+
+        arquivo.seek(0)
+        arquivo.write(CABECALHO.pack(ASSINATURA, total))
+    return total
+
+
+def _escrever_lote(arquivo, lote):
+    if sys.byteorder == "big":
+        lote.byteswap()
+    arquivo.write(lote.tobytes())
+    return len(lote)
+
+
+def converter_texto(origem, destino, erros=None):
+    """Lê um arquivo de texto/CSV e grava os bilhetes válidos em binário"""
+    with open(origem, encoding="utf-8") as arquivo:
+        return gravar_binario(ler_bilhetes(arquivo, erros), destino)
+
+
+def exportar_texto(mascaras, caminho):
+    """Grava os bilhetes como texto, um por linha (dezenas separadas por vírgula)"""
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        for valor in mascaras:
+            arquivo.write(",".join(map(str, dezenas_da_mascara(valor))) + "\n")
+
+
+class BilhetesMapeados:
+    """Bilhetes de um arquivo binário, lidos por mapeamento de memória.
+
+    Nenhum bilhete é carregado na abertura; as máscaras são lidas do
+    arquivo sob demanda. Em plataformas big-endian são copiadas para a memória.
+    """
+
+    def __init__(self, caminho):
+        self._arquivo = open(caminho, "rb")
+        self._mapa = mmap.mmap(self._arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        self._mascaras = None
+        assinatura, total = CABECALHO.unpack_from(self._mapa)
+        if assinatura != ASSINATURA:
+            self.fechar()
+            raise ValueError(f"Arquivo de bilhetes inválido: {caminho}")
+        if sys.byteorder == "big":
+            self._mascaras = array('Q', self._mapa[CABECALHO.size:CABECALHO.size + 8 * total])
+            self._mascaras.byteswap()
+        else:
+            self._mascaras = memoryview(self._mapa)[CABECALHO.size:CABECALHO.size + 8 * total].cast('Q')
+
+    def __len__(self):
+        return len(self._mascaras)
+
+    def __getitem__(self, indice):
+        return self._mascaras[indice]
+
+    def __iter__(self):
+        return iter(self._mascaras)
+
+    def jogos(self, loteria=MEGA_SENA):
+        """Gera os dicionários de jogo (criar_jogo) de cada bilhete"""
+        for valor in self:
+            yield loteria.criar_jogo(loteria.dezenas_da_mascara(valor))
+
+    def fechar(self):
+        if isinstance(self._mascaras, memoryview):
+            self._mascaras.release()
+        self._mascaras = None
+        self._mapa.close()
+        self._arquivo.close()
+
+
+class CarteiraCompacta:
+    """Carteira da Mega-Sena guardada como máscaras uint64 (8 bytes por jogo).
+
+    Os dicionários de jogo (criar_jogo) só são montados quando um jogo é
+    lido. O preço total e a cobertura de SENA são atualizados em bloco a
+    cada inclusão, a partir das máscaras.
+    """
+
+    def __init__(self):
+        self.mascaras = array('Q')
+        self.preco = 0.0
+        self.cobertura = CoberturaSena()
+
+    def __len__(self):
+        return len(self.mascaras)
+
+    def __getitem__(self, indice):
+        return criar_jogo(dezenas_da_mascara(self.mascaras[indice]))
+
+    def __iter__(self):
+        for valor in self.mascaras:
+            yield criar_jogo(dezenas_da_mascara(valor))
+
+    def adicionar(self, dezenas):
+        """Inclui um jogo; retorna o seu dicionário"""
+        jogo = criar_jogo(dezenas)
+        self.adicionar_mascaras([jogo['mascara']])
+        return jogo
+
+    def adicionar_mascaras(self, mascaras):
+        """Inclui vários jogos; retorna a quantidade incluída.
+
+        Todas as máscaras são validadas antes da inclusão: com uma inválida,
+        levanta ValueError e a carteira fica como estava.
+        """
+        novas = array('Q', mascaras)
+        tamanhos = Counter(map(contar_bits, novas))
+        invalidos = [qtd for qtd in tamanhos if qtd not in PRECOS]
+        if invalidos or (novas and max(novas) >> 60):
+            posicao = next(i for i, valor in enumerate(novas) if contar_bits(valor) in invalidos or valor >> 60)
+            raise ValueError(f"Bilhete {posicao + 1} inválido: {novas[posicao]:#x}")
+
+        self.cobertura.adicionar_mascaras(novas)
+        self.mascaras.extend(novas)
+        self.preco += sum(PRECOS[qtd] * n for qtd, n in tamanhos.items())
+        return len(novas)
@@ -0,0 +1,551 @@
+"""Catálogo persistente das execuções, em colunas mapeadas em memória.
+
+Cada execução registrada vira uma linha: configuração (motor, loteria,
+sorteador, limites), hash da carteira, semente, prêmios por faixa, custo
+e tempos. O catálogo é um diretório com um arquivo binário por coluna
+(valores de largura fixa, little-endian) e um esquema JSON com o número
+de linhas confirmadas. Colunas de texto guardam um código (uint32); os
+valores distintos ficam em um arquivo à parte, um valor JSON por linha.
+Uma coluna nova (uma faixa que ainda não apareceu, por exemplo) nasce
+preenchida com o valor vazio nas linhas anteriores.
+
+O registro grava as colunas e só então o esquema, de forma atômica: uma
+gravação interrompida não aparece nas leituras e é descartada na
+seguinte. As consultas mapeiam apenas as colunas usadas e filtram e
+agregam sobre os arrays, sem criar um objeto por execução (com numpy,
+se instalado, de forma vetorizada).
+
+Exemplo:
+    python catalogo.py catalogo_execucoes --onde loteria=megasena --por motor --valores total_gasto premios_6
+"""
+import argparse
+import json
+import math
+import mmap
+import os
+import sys
+import time
+from array import array
+from contextlib import closing, contextmanager
+
+from checkpoint import gravar_atomico, hash_carteira, nome_do_motor
+from metricas import FASES
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+VERSAO = 1
+
+ESQUEMA = "catalogo.json"
+TRAVA = "catalogo.trava"
+
+# Tipo da coluna -> código de array (largura fixa)
+CODIGOS = {'inteiro': 'q', 'real': 'd', 'texto': 'I'}
+
+# Valor vazio (None) das colunas inteiras; nas reais é NaN
+NULO = -2 ** 63
+
+# Colunas de toda execução registrada, na ordem do esquema. As demais
+# (premios_<acertos>, segundos_<fase> e extras) são criadas sob demanda
+COLUNAS = {
+    'instante': 'real',
+    'rotulo': 'texto',
+    'motor': 'texto',
+    'loteria': 'texto',
+    'sorteador': 'texto',
+    'carteira': 'texto',
+    'jogos': 'inteiro',
+    'semente': 'texto',
+    'max_sorteios': 'inteiro',
+    'parar_em': 'texto',
+    'total_sorteios': 'inteiro',
+    'concursos': 'inteiro',
+    'melhor': 'inteiro',
+    'sorteio_parada': 'inteiro',
+    'interrompido': 'inteiro',
+    'custo_por_sorteio': 'real',
+    'total_gasto': 'real',
+    'segundos': 'real',
+    'sorteios_por_segundo': 'real'
+}
+
+
+def tipo_do_valor(valor):
+    """Tipo de coluna de um valor ainda sem coluna (texto para None e não numéricos)"""
+    if isinstance(valor, (bool, int)):
+        return 'inteiro'
+    if isinstance(valor, float):
+        return 'real'
+    return 'texto'
+
+
+class Catalogo:
+    """Execuções registradas em um diretório de colunas.
+
+    Consultas recebem condições por coluna: um valor (igualdade), uma
+    lista ou conjunto (qualquer um dos valores) ou, nas colunas
+    numéricas, uma tupla (mínimo, máximo) inclusiva, com None para
+    extremos abertos. Vários processos podem registrar no mesmo catálogo
+    (a gravação é serializada por uma trava de arquivo, onde houver fcntl).
+    """
+
+    def __init__(self, diretorio):
+        self.diretorio = diretorio
+        os.makedirs(diretorio, exist_ok=True)
+        # Por coluna de texto: (valores, valor -> código, bytes já lidos do arquivo)
+        self._dicionarios = {}
+        self.esquema = self._ler_esquema()
+
+    def __len__(self):
+        return self.esquema['linhas']
+
+    @property
+    def colunas(self):
+        """{coluna: tipo}, na ordem de criação"""
+        return {nome: coluna['tipo'] for nome, coluna in self.esquema['colunas'].items()}
+
+    def _caminho(self, nome):
+        return os.path.join(self.diretorio, nome)
+
+    def _ler_esquema(self):
+        try:
+            with open(self._caminho(ESQUEMA), encoding="utf-8") as arquivo:
+                esquema = json.load(arquivo)
+        except FileNotFoundError:
+            return {'versao': VERSAO, 'linhas': 0, 'colunas': {}}
+        if esquema.get('versao') != VERSAO:
+            raise ValueError(f"Catálogo incompatível: {self.diretorio}")
+        return esquema
+
+    def atualizar(self):
+        """Relê o esquema (execuções registradas por outros processos)"""
+        self.esquema = self._ler_esquema()
+        return len(self)
+
+    @contextmanager
+    def _travar(self):
+        with open(self._caminho(TRAVA), "a") as trava:
+            if fcntl is not None:
+                fcntl.flock(trava.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(trava.fileno(), fcntl.LOCK_UN)
+
+    def _dicionario(self, nome):
+        """Valores e códigos de uma coluna de texto, lendo só o que foi acrescentado"""
+        confirmados = self.esquema['colunas'][nome]['bytes']
+        valores, codigos, lidos = self._dicionarios.get(nome, ([], {}, 0))
+        if confirmados > lidos:
+            with open(self._caminho(f"{nome}.txt"), "rb") as arquivo:
+                arquivo.seek(lidos)
+                for linha in arquivo.read(confirmados - lidos).splitlines():
+                    valor = json.loads(linha)
+                    codigos[_chave(valor)] = len(valores)
+                    valores.append(valor)
+            self._dicionarios[nome] = (valores, codigos, confirmados)
+        return valores, codigos
+
+    # --- Registro ---
+
+    def registrar(self, motor, segundos=None, rotulo=None, **extras):
+        """Registra o resultado de um motor; retorna o índice da linha.
+
+        segundos é o tempo de parede da execução (com motor.metricas, o
+        medido por elas, se omitido); extras viram colunas adicionais.
+        """
+        resultado = motor.resultado()
+        metricas = motor.metricas.instantaneo() if motor.metricas is not None else None
+        if segundos is None and metricas is not None:
+            segundos = metricas['segundos']
+        linha = {
+            'instante': time.time(),
+            'rotulo': rotulo,
+            'motor': nome_do_motor(motor),
+            'loteria': motor.loteria.chave,
+            'sorteador': motor.sorteador,
+            'carteira': hash_carteira(motor.jogos),
+            'jogos': len(motor.jogos),
+            'semente': motor.semente,
+            'max_sorteios': motor.max_sorteios,
+            'parar_em': ",".join(str(faixa) for faixa in sorted(motor.parar_em)),
+            'total_sorteios': resultado['total_sorteios'],
+            'concursos': resultado['concursos'],
+            'melhor': resultado['melhor'],
+            'sorteio_parada': resultado['sorteio_parada'],
+            'interrompido': resultado['interrompido'],
+            'custo_por_sorteio': float(resultado['custo_por_sorteio']),
+            'total_gasto': float(resultado['total_gasto']),
+            'segundos': None if segundos is None else float(segundos),
+            'sorteios_por_segundo': metricas['sorteios_por_segundo'] if metricas is not None else None
+        }
+        # Prêmios pelos acertos da faixa, comuns a todas as loterias
+        for faixa, quantidade in motor.premios.items():
+            linha[f'premios_{faixa}'] = quantidade
+        if metricas is not None:
+            for fase in FASES:
+                linha[f'segundos_{fase}'] = metricas['fases'][fase]['segundos']
+        linha.update(extras)
+        return self.adicionar(linha)
+
+    def adicionar(self, linha):
+        """Acrescenta uma linha {coluna: valor}; retorna seu índice"""
+        with self._travar():
+            self.esquema = self._ler_esquema()
+            colunas = self.esquema['colunas']
+            indice = self.esquema['linhas']
+            try:
+                for nome, valor in linha.items():
+                    if nome not in colunas:
+                        self._criar_coluna(nome, COLUNAS.get(nome) or tipo_do_valor(valor), indice)
+
+                for nome, coluna in colunas.items():
+                    codigo = CODIGOS[coluna['tipo']]
+                    largura = array(codigo).itemsize
+                    valor = self._codificar(nome, coluna, linha.get(nome))
+                    with open(self._caminho(f"{nome}.col"), "r+b") as arquivo:
+                        # Descarta o que uma gravação interrompida tenha deixado após a última linha
+                        arquivo.truncate(indice * largura)
+                        arquivo.seek(indice * largura)
+                        arquivo.write(_bytes(array(codigo, [valor])))
+
+                self.esquema['linhas'] = indice + 1
+                gravar_atomico(self.esquema, self._caminho(ESQUEMA))
+            except BaseException:
+                # Valores de texto não confirmados não podem ficar no cache
+                self._dicionarios.clear()
+                self.esquema = self._ler_esquema()
+                raise
+        return indice
+
+    def _criar_coluna(self, nome, tipo, linhas):
+        coluna = {'tipo': tipo}
+        if tipo == 'texto':
+            coluna['bytes'] = 0
+            open(self._caminho(f"{nome}.txt"), "wb").close()
+        self.esquema['colunas'][nome] = coluna
+        # As linhas anteriores recebem o valor vazio
+        vazio = array(CODIGOS[tipo], [self._codificar(nome, coluna, None)])
+        with open(self._caminho(f"{nome}.col"), "wb") as arquivo:
+            arquivo.write(_bytes(vazio * linhas))
+
+    def _codificar(self, nome, coluna, valor):
+        tipo = coluna['tipo']
+        if tipo == 'inteiro':
+            return NULO if valor is None else int(valor)
+        if tipo == 'real':
+            return math.nan if valor is None else float(valor)
+
+        valores, codigos = self._dicionario(nome)
+        codigo = codigos.get(_chave(valor))
+        if codigo is None:
+            with open(self._caminho(f"{nome}.txt"), "r+b") as arquivo:
+                arquivo.truncate(coluna['bytes'])
+                arquivo.seek(coluna['bytes'])
+                arquivo.write(json.dumps(valor, ensure_ascii=False).encode("utf-8") + b"\n")
+                coluna['bytes'] = arquivo.tell()
+            valores, codigos = self._dicionario(nome)
+            codigo = codigos[_chave(valor)]
+        return codigo
+
+    # --- Consultas ---
+
+    @contextmanager
+    def _mapear(self, nomes, np=None):
+        """Colunas confirmadas {nome: array}, por mapeamento de memória (np.memmap com numpy)"""
+        linhas = len(self)
+        mapas = []
+        colunas = {}
+        try:
+            for nome in nomes:
+                if nome not in self.esquema['colunas']:
+                    raise ValueError(f"Coluna inexistente no catálogo: {nome}")
+                codigo = CODIGOS[self.esquema['colunas'][nome]['tipo']]
+                caminho = self._caminho(f"{nome}.col")
+                if np is not None:
+                    colunas[nome] = (np.memmap(caminho, dtype=f"<{codigo}", mode="r", shape=(linhas,))
+                                     if linhas else np.empty(0, dtype=f"<{codigo}"))
+                    continue
+                tamanho = linhas * array(codigo).itemsize
+                if not tamanho:
+                    colunas[nome] = array(codigo)
+                    continue
+                with open(caminho, "rb") as arquivo:
+                    mapa = mmap.mmap(arquivo.fileno(), tamanho, access=mmap.ACCESS_READ)
+                mapas.append(mapa)
+                if sys.byteorder == "big":
+                    valores = array(codigo, mapa[:tamanho])
+                    valores.byteswap()
+                    colunas[nome] = valores
+                else:
+                    colunas[nome] = memoryview(mapa).cast(codigo)
+            yield colunas
+        finally:
+            for valores in colunas.values():
+                if isinstance(valores, memoryview):
+                    valores.release()
+            colunas.clear()
+            for mapa in mapas:
+                mapa.close()
+
+    def _codigos_aceitos(self, nome, condicao):
+        """Códigos de uma coluna de texto que satisfazem a condição"""
+        if isinstance(condicao, tuple):
+            raise ValueError(f"A coluna de texto '{nome}' só aceita igualdade ou lista de valores")
+        _, codigos = self._dicionario(nome)
+        aceitos = condicao if isinstance(condicao, (list, set, frozenset)) else [condicao]
+        return {codigos[_chave(valor)] for valor in aceitos if _chave(valor) in codigos}
+
+    def selecionar(self, **condicoes):
+        """Índices das linhas que satisfazem todas as condições"""
+        np = _numpy()
+        with self._mapear(condicoes, np) as colunas:
+            if np is not None:
+                return np.flatnonzero(self._mascara(colunas, condicoes, np)).tolist()
+            return self._indices(colunas, condicoes)
+
+    def _mascara(self, colunas, condicoes, np):
+        selecao = np.ones(len(self), dtype=bool)
+        for nome, condicao in condicoes.items():
+            valores = colunas[nome]
+            tipo = self.esquema['colunas'][nome]['tipo']
+            if tipo == 'texto':
+                selecao &= np.isin(valores, list(self._codigos_aceitos(nome, condicao)))
+            elif isinstance(condicao, tuple):
+                minimo, maximo = condicao
+                if tipo == 'inteiro':
+                    selecao &= valores != NULO
+                if minimo is not None:
+                    selecao &= valores >= minimo
+                if maximo is not None:
+                    selecao &= valores <= maximo
+            elif isinstance(condicao, (list, set, frozenset)):
+                selecao &= np.isin(valores, list(condicao))
+            else:
+                selecao &= valores == condicao
+        return selecao
+
+    def _indices(self, colunas, condicoes):
+        indices = range(len(self))
+        for nome, condicao in condicoes.items():
+            valores = colunas[nome]
+            tipo = self.esquema['colunas'][nome]['tipo']
+            if tipo == 'texto':
+                aceitos = self._codigos_aceitos(nome, condicao)
+                indices = [i for i in indices if valores[i] in aceitos]
+            elif isinstance(condicao, tuple):
+                minimo = -math.inf if condicao[0] is None else condicao[0]
+                maximo = math.inf if condicao[1] is None else condicao[1]
+                indices = [i for i in indices if minimo <= valores[i] <= maximo
+                           and (tipo != 'inteiro' or valores[i] != NULO)]
+            elif isinstance(condicao, (list, set, frozenset)):
+                aceitos = set(condicao)
+                indices = [i for i in indices if valores[i] in aceitos]
+            else:
+                indices = [i for i in indices if valores[i] == condicao]
+        return list(indices)
+
+    def linha(self, indice):
+        """Linha decodificada {coluna: valor}"""
+        with closing(self.linhas([indice])) as linhas:
+            return next(linhas)
+
+    def linhas(self, indices=None, **condicoes):
+        """Gera as linhas decodificadas dos índices (ou das que satisfazem as condições)"""
+        if indices is None:
+            indices = self.selecionar(**condicoes)
+        nomes = list(self.esquema['colunas'])
+        with self._mapear(nomes) as colunas:
+            for indice in indices:
+                yield {nome: self._decodificar(nome, colunas[nome][indice]) for nome in nomes}
+
+    def _decodificar(self, nome, valor):
+        tipo = self.esquema['colunas'][nome]['tipo']
+        if tipo == 'texto':
+            return self._dicionario(nome)[0][valor]
+        if tipo == 'inteiro':
+            return None if valor == NULO else valor
+        return None if math.isnan(valor) else valor
+
+    def agregar(self, valores=(), por=(), **condicoes):
+        """Agrega colunas numéricas por grupo, nas linhas que satisfazem as condições.
+
+        Retorna uma lista (ordenada pelos grupos) de dicionários com as
+        colunas de `por`, 'execucoes' e, para cada coluna de `valores`,
+        {'soma', 'media', 'minimo', 'maximo', 'contagem'} sobre os valores
+        não vazios.
+        """
+        valores, por = list(valores), list(por)
+        for nome in valores:
+            if self.esquema['colunas'].get(nome, {}).get('tipo') == 'texto':
+                raise ValueError(f"A coluna de texto '{nome}' não pode ser agregada")
+        for nome in por:
+            if self.esquema['colunas'].get(nome, {}).get('tipo') == 'real':
+                raise ValueError(f"A coluna real '{nome}' não pode agrupar")
+        np = _numpy()
+        with self._mapear(set(valores) | set(por) | set(condicoes), np) as colunas:
+            if np is not None:
+                grupos = self._agregar_numpy(colunas, valores, por, condicoes, np)
+            else:
+                grupos = self._agregar_python(colunas, valores, por, condicoes)
+
+        resultado = []
+        for chave, (execucoes, estatisticas) in grupos.items():
+            item = {nome: self._decodificar(nome, codigo) for nome, codigo in zip(por, chave)}
+            item['execucoes'] = execucoes
+            for nome, (soma, minimo, maximo, contagem) in zip(valores, estatisticas):
+                item[nome] = {
+                    'soma': soma,
+                    'media': soma / contagem if contagem else None,
+                    'minimo': minimo if contagem else None,
+                    'maximo': maximo if contagem else None,
+                    'contagem': contagem
+                }
+            resultado.append(item)
+        return sorted(resultado, key=lambda item: [_chave_ordem(item[nome]) for nome in por])
+
+    def _agregar_numpy(self, colunas, valores, por, condicoes, np):
+        """{códigos do grupo: (execuções, [(soma, mínimo, máximo, contagem) por valor])}"""
+        selecao = np.flatnonzero(self._mascara(colunas, condicoes, np))
+        if por:
+            chaves, grupo = np.unique(np.stack([np.asarray(colunas[nome][selecao], dtype=np.int64)
+                                                for nome in por], axis=1), axis=0, return_inverse=True)
+            grupo = grupo.reshape(-1)
+        else:
+            chaves = np.zeros((1 if len(selecao) else 0, 0), dtype=np.int64)
+            grupo = np.zeros(len(selecao), dtype=np.intp)
+        quantidade = len(chaves)
+        execucoes = np.bincount(grupo, minlength=quantidade)
+
+        estatisticas = []
+        for nome in valores:
+            dados = np.asarray(colunas[nome][selecao])
+            if self.esquema['colunas'][nome]['tipo'] == 'inteiro':
+                validos = dados != NULO
+                soma = np.zeros(quantidade, dtype=np.int64)
+                minimo = np.full(quantidade, np.iinfo(np.int64).max)
+                maximo = np.full(quantidade, NULO, dtype=np.int64)
+            else:
+                validos = ~np.isnan(dados)
+                soma = np.zeros(quantidade)
+                minimo = np.full(quantidade, math.inf)
+                maximo = np.full(quantidade, -math.inf)
+            dados, grupos_validos = dados[validos], grupo[validos]
+            np.add.at(soma, grupos_validos, dados)
+            np.minimum.at(minimo, grupos_validos, dados)
+            np.maximum.at(maximo, grupos_validos, dados)
+            contagem = np.bincount(grupos_validos, minlength=quantidade)
+            estatisticas.append(list(zip(soma.tolist(), minimo.tolist(), maximo.tolist(), contagem.tolist())))
+
+        return {tuple(chave): (execucoes_grupo, [colunas_valor[i] for colunas_valor in estatisticas])
+                for i, (chave, execucoes_grupo) in enumerate(zip(chaves.tolist(), execucoes.tolist()))}
+
+    def _agregar_python(self, colunas, valores, por, condicoes):
+        grupos = {}
+        tipos = [self.esquema['colunas'][nome]['tipo'] for nome in valores]
+        for indice in self._indices(colunas, condicoes):
+            chave = tuple(colunas[nome][indice] for nome in por)
+            grupo = grupos.get(chave)
+            if grupo is None:
+                grupo = grupos[chave] = [0, [[0, None, None, 0] for _ in valores]]
+            grupo[0] += 1
+            for nome, tipo, estatistica in zip(valores, tipos, grupo[1]):
+                valor = colunas[nome][indice]
+                if (valor == NULO) if tipo == 'inteiro' else math.isnan(valor):
+                    continue
+                estatistica[0] += valor
+                estatistica[1] = valor if estatistica[1] is None else min(estatistica[1], valor)
+                estatistica[2] = valor if estatistica[2] is None else max(estatistica[2], valor)
+                estatistica[3] += 1
+        return {chave: (execucoes, [tuple(e) for e in estatisticas])
+                for chave, (execucoes, estatisticas) in grupos.items()}
+
+
+def _numpy():
+    """numpy, se instalado (importado só nas consultas)"""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _chave(valor):
+    """Chave de dicionário de um valor de texto (listas JSON viram tuplas)"""
+    return tuple(valor) if isinstance(valor, list) else valor
+
+
+def _chave_ordem(valor):
+    """Ordena grupos de tipos mistos (None primeiro, números antes de textos)"""
+    if valor is None:
+        return (0, 0, "")
+    if isinstance(valor, (int, float)):
+        return (1, valor, "")
+    return (2, 0, str(valor))
+
+
+def _bytes(valores):
+    if sys.byteorder == "big":
+        valores = array(valores.typecode, valores)
+        valores.byteswap()
+    return valores.tobytes()
+
+
+def _condicao_cli(catalogo, texto):
+    """'coluna=valor', 'coluna=a,b' ou 'coluna=minimo:maximo' -> (coluna, condição)"""
+    nome, separador, valor = texto.partition("=")
+    if not separador:
+        raise ValueError(f"Condição inválida: {texto} (use coluna=valor)")
+    tipo = catalogo.colunas.get(nome)
+    if tipo is None:
+        raise ValueError(f"Coluna inexistente no catálogo: {nome}")
+    if tipo == 'texto':
+        # O texto e, se for um número, também o número (sementes são guardadas como inteiros)
+        aceitos = []
+        for parte in valor.split(","):
+            aceitos.append(parte)
+            try:
+                aceitos.append(int(parte))
+            except ValueError:
+                pass
+        return nome, aceitos
+    converter = int if tipo == 'inteiro' else float
+    if ":" in valor:
+        minimo, maximo = valor.split(":", 1)
+        return nome, (converter(minimo) if minimo else None, converter(maximo) if maximo else None)
+    partes = [converter(parte) for parte in valor.split(",")]
+    return nome, partes if len(partes) > 1 else partes[0]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Consulta o catálogo de execuções.")
+    parser.add_argument("diretorio", help="diretório do catálogo")
+    parser.add_argument("--onde", nargs="*", default=[],
+                        help="condições coluna=valor, coluna=a,b ou coluna=minimo:maximo")
+    parser.add_argument("--por", nargs="*", default=[], help="colunas de agrupamento")
+    parser.add_argument("--valores", nargs="*", default=[], help="colunas numéricas agregadas")
+    parser.add_argument("--linhas", action="store_true", help="lista as execuções em vez de agregar")
+    parser.add_argument("--colunas", action="store_true", help="mostra as colunas e seus tipos")
+    args = parser.parse_args(argv)
+
+    catalogo = Catalogo(args.diretorio)
+    if args.colunas:
+        print(json.dumps({'linhas': len(catalogo), 'colunas': catalogo.colunas}, ensure_ascii=False, indent=2))
+        return 0
+    try:
+        condicoes = dict(_condicao_cli(catalogo, texto) for texto in args.onde)
+        if args.linhas:
+            for linha in catalogo.linhas(**condicoes):
+                print(json.dumps(linha, ensure_ascii=False))
+        else:
+            print(json.dumps(catalogo.agregar(args.valores, args.por, **condicoes), ensure_ascii=False, indent=2))
+    except ValueError as erro:
+        parser.error(str(erro))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""Checkpoint e retomada de simulações longas.
+
+O estado do motor (contadores, melhor resultado, estado do gerador
+aleatório) é gravado periodicamente em JSON, de forma atômica: o arquivo
+é escrito ao lado do destino e só então o substitui (os.replace). Uma
+execução retomada continua exatamente do ponto gravado e chega ao mesmo
+resultado de uma execução sem interrupção.
+"""
+import hashlib
+import json
+import os
+import time
+
+from loterias import LOTERIAS
+from motor import MOTORES, criar_motor, mascara
+
+VERSAO = 1
+
+# Segundos entre duas gravações periódicas
+INTERVALO_PADRAO = 30.0
+
+
+def hash_carteira(jogos):
+    """Identificador da carteira (jogos na ordem em que foram adicionados)"""
+    resumo = hashlib.sha256()
+    for jogo in jogos:
+        resumo.update(b"%x;" % (jogo.get('mascara') or mascara(jogo['dezenas'])))
+    return resumo.hexdigest()
+
+
+def nome_do_motor(motor):
+    """Nome em MOTORES da classe de um motor"""
+    for nome, (_, classe) in MOTORES.items():
+        if classe == type(motor).__name__:
+            return nome
+    raise ValueError(f"Motor não registrado: {type(motor).__name__}")
+
+
+def gravar_atomico(dados, caminho):
+    """Grava JSON em `caminho` sem nunca deixar um arquivo parcial no lugar"""
+    temporario = f"{caminho}.tmp"
+    with open(temporario, "w", encoding="utf-8") as arquivo:
+        json.dump(dados, arquivo)
+        arquivo.flush()
+        os.fsync(arquivo.fileno())
+    os.replace(temporario, caminho)
+
+
+def ler_checkpoint(caminho):
+    with open(caminho, encoding="utf-8") as arquivo:
+        dados = json.load(arquivo)
+    if dados.get('versao') != VERSAO:
+        raise ValueError(f"Checkpoint incompatível: {caminho}")
+    return dados
+
+
+class Checkpoint:
+    """Grava o estado de um motor a cada `intervalo` segundos e ao fim da execução.
+
+    Os motores chamam registrar apenas entre sorteios; a verificação do
+    tempo é feita poucas vezes por bloco de sorteios.
+    """
+
+    def __init__(self, caminho, intervalo=INTERVALO_PADRAO):
+        self.caminho = caminho
+        self.intervalo = intervalo
+        self._ultima = time.monotonic()
+        self._carteira = None
+
+    def registrar(self, motor, final=False):
+        agora = time.monotonic()
+        if final or agora - self._ultima >= self.intervalo:
+            self.salvar(motor)
+            self._ultima = agora
+
+    def salvar(self, motor):
+        if self._carteira is None:
+            self._carteira = hash_carteira(motor.jogos)
+        gravar_atomico({
+            'versao': VERSAO,
+            'motor': nome_do_motor(motor),
+            'carteira': self._carteira,
+            'max_sorteios': motor.max_sorteios,
+            'parar_em': sorted(motor.parar_em),
+            'semente': motor.semente,
+            'sorteador': motor.sorteador,
+            'loteria': motor.loteria.chave,
+            # Concluída = terminou sem interrupção; não há o que retomar
+            'concluida': not motor.ativo and not motor.interrompido,
+            'estado': motor.estado()
+        }, self.caminho)
+
+
+def retomar(caminho, jogos, intervalo=INTERVALO_PADRAO, **kwargs):
+    """Recria o motor gravado em `caminho`, pronto para continuar com executar().
+
+    Os jogos devem ser os mesmos da execução original (conferidos pelo
+    hash). Argumentos extras (ex.: canal) são repassados ao motor, que
+    continua gravando no mesmo checkpoint.
+    """
+    dados = ler_checkpoint(caminho)
+    if dados['carteira'] != hash_carteira(jogos):
+        raise ValueError("Os jogos não são os mesmos da execução gravada no checkpoint")
+    if dados['concluida']:
+        raise ValueError("A execução gravada no checkpoint já foi concluída")
+
+    motor = criar_motor(dados['motor'], jogos, dados['max_sorteios'], dados['parar_em'], dados['semente'],
+                        sorteador=dados['sorteador'], loteria=LOTERIAS[dados.get('loteria', 'megasena')],
+                        **kwargs)
+    motor.restaurar(dados['estado'])
+    motor.checkpoint = Checkpoint(caminho, intervalo)
+    return motor
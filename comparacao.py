@@ -0,0 +1,233 @@
+"""Comparação de estratégias (carteiras) sobre os mesmos sorteios.
+
+Cada bloco de sorteios é gerado uma única vez e pontuado contra os jogos
+de todas as estratégias juntos (uma só matriz de acertos, com as colunas
+de cada estratégia contíguas). Cada estratégia tem seus próprios
+contadores, custo (PRECOS) e o número do primeiro sorteio premiado em
+cada faixa; a comparação é justa porque todas enfrentam os mesmos
+sorteios. Com sorteador='contador', os contadores de cada estratégia são
+os de um motor executado só com ela, com a mesma semente. As faixas, os
+prêmios e os sorteios vêm da loteria (Mega-Sena por padrão). Requer numpy.
+
+Exemplo:
+    python comparacao.py conservador.csv agressivo.csv --sorteios 10000000 --semente 42
+    python comparacao.py quina_a.csv quina_b.csv --loteria quina --parar-em quadra
+"""
+import argparse
+import json
+import random
+import sys
+
+import numpy as np
+
+from loterias import LOTERIAS, MEGA_SENA
+from motor import CHAVES_FAIXAS
+from motor_vetorizado import (MAX_CELULAS_BLOCO, grupos_parada, linhas_parada, matriz_premios, pontuar_bloco,
+                              sorteador_bloco, tabela_pertinencia)
+from simular_lote import carregar_jogos, faixa_por_nome
+from sorteador import SORTEADORES, ContadorSorteios
+
+# Chaves do primeiro sorteio premiado nas faixas da Mega-Sena, em resultado()
+CHAVES_PRIMEIROS = {4: 'primeira_quadra', 5: 'primeira_quina', 6: 'primeira_sena'}
+
+
+class ComparacaoEstrategias:
+    """Pontua várias carteiras nomeadas contra um único fluxo de sorteios.
+
+    A execução termina em max_sorteios (0 = ilimitado) ou quando todas as
+    estratégias tiverem atingido alguma faixa de parar_em; os contadores
+    de todas cobrem os mesmos sorteios. ao_bloco, se informado, recebe a
+    comparação ao fim de cada bloco.
+    """
+
+    def __init__(self, max_sorteios=0, parar_em=(6,), semente=None, sorteador='amostra',
+                 tamanho_bloco=1_000_000, ao_bloco=None, loteria=None):
+        self.loteria = loteria or MEGA_SENA
+        for faixa in parar_em:
+            if faixa not in self.loteria.faixas:
+                raise ValueError(f"A {self.loteria.nome} não tem a faixa de {faixa} acertos")
+        self.max_sorteios = max_sorteios
+        self.parar_em = set(parar_em)
+        self.sorteador = sorteador
+        self.sortear = sorteador_bloco(self.loteria, sorteador)
+        if sorteador == 'contador':
+            if semente is None:
+                semente = random.getrandbits(64)
+            self.rng = ContadorSorteios(semente)
+        else:
+            self.rng = np.random.default_rng(semente)
+        self.semente = semente
+        self.tamanho_bloco = tamanho_bloco
+        self.ao_bloco = ao_bloco
+        self.estrategias = {}
+
+        self.ativo = False
+        self.interrompido = False
+        self.total_sorteios = 0
+
+    def adicionar(self, nome, jogos):
+        """Registra uma estratégia (lista de jogos de criar_jogo)"""
+        if self.total_sorteios:
+            raise ValueError("As estratégias devem ser registradas antes da execução")
+        if not jogos:
+            raise ValueError(f"A estratégia '{nome}' não tem jogos")
+        faixas = self.loteria.faixas
+        self.estrategias[nome] = {
+            'jogos': list(jogos),
+            # Cada concurso é pago uma vez, mesmo com vários sorteios (Dupla Sena)
+            'custo_por_concurso': sum(jogo['preco'] for jogo in jogos),
+            'melhor': 0,
+            'premios': {faixa: 0 for faixa in faixas},
+            # Número do primeiro sorteio premiado em cada faixa
+            'primeiros': {faixa: None for faixa in faixas},
+            'sorteio_parada': None
+        }
+
+    def parar(self):
+        """Solicita a interrupção (seguro entre threads)"""
+        if self.ativo:
+            self.interrompido = True
+        self.ativo = False
+
+    def executar(self):
+        if not self.estrategias:
+            raise ValueError("Nenhuma estratégia registrada")
+        self.ativo = True
+        loteria = self.loteria
+        estrategias = list(self.estrategias.values())
+        jogos = [jogo for estrategia in estrategias for jogo in estrategia['jogos']]
+        pertinencia = tabela_pertinencia(jogos, loteria.universo)
+        premios_jogos = matriz_premios(jogos, loteria)
+        sortear = self.sortear
+
+        # Colunas de cada estratégia na matriz de acertos e seus gatilhos por faixa
+        inicios = np.cumsum([0] + [len(e['jogos']) for e in estrategias[:-1]])
+        fatias = [slice(inicio, inicio + len(e['jogos'])) for inicio, e in zip(inicios.tolist(), estrategias)]
+        gatilhos = [{faixa: grupos_parada(e['jogos'], (faixa,), loteria) for faixa in loteria.faixas}
+                    for e in estrategias]
+
+        tamanho_bloco = max(1, min(self.tamanho_bloco, MAX_CELULAS_BLOCO // len(jogos)))
+        bloco = min(4096, tamanho_bloco)
+
+        while self.ativo:
+            quantidade = bloco
+            bloco = min(bloco * 2, tamanho_bloco)
+            if self.max_sorteios > 0:
+                quantidade = min(quantidade, self.max_sorteios - self.total_sorteios)
+                if quantidade <= 0:
+                    break
+
+            acertos = pontuar_bloco(sortear(self.rng, quantidade), pertinencia)
+
+            # Primeiros sorteios premiados, por estratégia e faixa, ainda não registrados
+            for estrategia, fatia, grupos_faixa in zip(estrategias, fatias, gatilhos):
+                for faixa, grupos in grupos_faixa.items():
+                    if estrategia['primeiros'][faixa] is None and grupos:
+                        linhas = linhas_parada(acertos[:, fatia], grupos)
+                        if linhas.any():
+                            estrategia['primeiros'][faixa] = self.total_sorteios + int(linhas.argmax()) + 1
+                paradas = [estrategia['primeiros'][faixa] for faixa in self.parar_em
+                           if estrategia['primeiros'][faixa] is not None]
+                if paradas:
+                    estrategia['sorteio_parada'] = min(paradas)
+
+            # Todas pararam: o bloco é cortado no sorteio da última parada
+            encerrar = bool(self.parar_em) and all(e['sorteio_parada'] is not None for e in estrategias)
+            if encerrar:
+                ultimo = max(e['sorteio_parada'] for e in estrategias)
+                acertos = acertos[:ultimo - self.total_sorteios]
+                for estrategia in estrategias:
+                    for faixa, primeiro in estrategia['primeiros'].items():
+                        if primeiro is not None and primeiro > ultimo:
+                            estrategia['primeiros'][faixa] = None
+
+            # Prêmios por jogo, somados por estratégia (colunas contíguas)
+            for qtd_acertos in range(loteria.acertos_minimo, loteria.sorteados + 1):
+                ocorrencias = np.count_nonzero(acertos == qtd_acertos, axis=0)
+                if not ocorrencias.any():
+                    continue
+                por_estrategia = np.add.reduceat(premios_jogos[qtd_acertos] * ocorrencias, inicios, axis=1)
+                for estrategia, premios in zip(estrategias, por_estrategia.T.tolist()):
+                    for faixa, quantidade_premios in zip(loteria.faixas, premios):
+                        estrategia['premios'][faixa] += quantidade_premios
+            melhores = np.maximum.reduceat(acertos.max(axis=0), inicios).tolist()
+            for estrategia, melhor in zip(estrategias, melhores):
+                estrategia['melhor'] = max(estrategia['melhor'], melhor)
+
+            self.total_sorteios += len(acertos)
+            if self.ao_bloco is not None:
+                self.ao_bloco(self)
+            if encerrar:
+                break
+
+        self.ativo = False
+        return self.resultado()
+
+    def resultado(self):
+        """Resultado de cada estratégia, no formato de MotorSimulacao.resultado"""
+        loteria = self.loteria
+        # Só concursos inteiros são pagos
+        concursos = -(-self.total_sorteios // loteria.sorteios_por_concurso)
+        resultados = {}
+        for nome, estrategia in self.estrategias.items():
+            custo = estrategia['custo_por_concurso']
+            parada = estrategia['sorteio_parada']
+            resultado = {
+                'jogos': len(estrategia['jogos']),
+                'custo_por_sorteio': custo / loteria.sorteios_por_concurso,
+                'total_gasto': concursos * custo,
+                'melhor': estrategia['melhor']
+            }
+            # Contadores da Mega-Sena (também nas loterias com faixas de mesmo número de acertos)
+            for faixa, chave in CHAVES_FAIXAS.items():
+                if faixa in estrategia['premios']:
+                    resultado[chave] = estrategia['premios'][faixa]
+            for faixa, chave in CHAVES_PRIMEIROS.items():
+                if faixa in estrategia['primeiros']:
+                    resultado[chave] = estrategia['primeiros'][faixa]
+            resultado.update({
+                'sorteio_parada': parada,
+                'gasto_ate_parada': -(-parada // loteria.sorteios_por_concurso) * custo if parada is not None else None,
+                'premios': {loteria.faixas[faixa].lower(): qtd for faixa, qtd in estrategia['premios'].items()},
+                'primeiros': {loteria.faixas[faixa].lower(): primeiro
+                              for faixa, primeiro in estrategia['primeiros'].items()}
+            })
+            resultados[nome] = resultado
+        return {
+            'total_sorteios': self.total_sorteios,
+            'interrompido': self.interrompido,
+            'semente': self.semente,
+            'sorteador': self.sorteador,
+            'loteria': loteria.chave,
+            'concursos': concursos,
+            'estrategias': resultados
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara carteiras (arquivos de bilhetes) nos mesmos sorteios.")
+    parser.add_argument("bilhetes", nargs="+", help="um arquivo de jogos por estratégia (texto/CSV ou .msb)")
+    parser.add_argument("--loteria", choices=list(LOTERIAS), default="megasena")
+    parser.add_argument("--sorteios", type=int, default=1_000_000, help="quantidade de sorteios (0 = ilimitado)")
+    parser.add_argument("--parar-em", nargs="*", default=[],
+                        help="faixas (nome ou acertos) que encerram quando todas as estratégias as atingirem")
+    parser.add_argument("--semente", type=int, default=None)
+    parser.add_argument("--sorteador", choices=list(SORTEADORES), default=None,
+                        help="padrão: 'contador' na Mega-Sena, 'amostra' nas demais")
+    args = parser.parse_args(argv)
+    loteria = LOTERIAS[args.loteria]
+    if args.sorteador is None:
+        args.sorteador = "contador" if loteria is MEGA_SENA else "amostra"
+    try:
+        parar_em = [faixa_por_nome(loteria, nome) for nome in args.parar_em]
+        comparacao = ComparacaoEstrategias(args.sorteios, parar_em, args.semente, args.sorteador, loteria=loteria)
+    except ValueError as erro:
+        parser.error(str(erro))
+
+    for caminho in args.bilhetes:
+        comparacao.adicionar(caminho, carregar_jogos(caminho, loteria=loteria))
+    print(json.dumps(comparacao.executar(), ensure_ascii=False, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
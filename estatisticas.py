@@ -0,0 +1,173 @@
+"""Estatísticas dos números sorteados, acumuladas em fluxo.
+
+Frequência de cada dezena, coocorrência de pares (matriz N x N) e
+intervalos entre aparições (atraso atual, maior intervalo e intervalo
+médio), com memória constante: nenhum sorteio é guardado. Acumuladores
+de trechos consecutivos de uma execução (blocos de processos diferentes,
+por exemplo) são combinados com mesclar, na ordem dos trechos.
+"""
+
+
+class EstatisticasSorteios:
+    """Acumuladores por dezena (1 a universo); as listas são indexadas pela dezena (posição 0 sem uso).
+
+    primeiro e ultimo guardam o número do sorteio (1, 2, ...) da primeira
+    e da última aparição de cada dezena, 0 se ela ainda não saiu. pares[a][b],
+    com a < b, conta os sorteios que contêm as duas dezenas.
+    """
+
+    def __init__(self, universo=60):
+        self.universo = universo
+        self.total = 0
+        self.frequencias = [0] * (universo + 1)
+        self.primeiro = [0] * (universo + 1)
+        self.ultimo = [0] * (universo + 1)
+        self.maior_intervalo = [0] * (universo + 1)
+        self.pares = [[0] * (universo + 1) for _ in range(universo + 1)]
+
+    def adicionar(self, sorteio):
+        """Acumula um sorteio (6 dezenas em ordem crescente)"""
+        self.total += 1
+        numero = self.total
+        frequencias, ultimo, pares = self.frequencias, self.ultimo, self.pares
+        for i, dezena in enumerate(sorteio):
+            frequencias[dezena] += 1
+            if ultimo[dezena]:
+                intervalo = numero - ultimo[dezena]
+                if intervalo > self.maior_intervalo[dezena]:
+                    self.maior_intervalo[dezena] = intervalo
+            else:
+                self.primeiro[dezena] = numero
+            ultimo[dezena] = numero
+            linha = pares[dezena]
+            for outra in sorteio[i + 1:]:
+                linha[outra] += 1
+
+    def adicionar_bloco(self, sorteios):
+        """Acumula um bloco numpy (sorteados x quantidade, colunas em qualquer ordem)"""
+        # Só os motores numpy entregam blocos; o módulo não depende de numpy
+        import numpy as np
+
+        sorteados, quantidade = sorteios.shape
+        if quantidade == 0:
+            return
+        linhas = self.universo + 1
+        bloco = EstatisticasSorteios(self.universo)
+        bloco.total = quantidade
+
+        # Aparições agrupadas por dezena, em ordem de sorteio (ordenação estável)
+        dezenas = np.ascontiguousarray(sorteios.T).ravel()
+        ordem = np.argsort(dezenas, kind="stable")
+        numeros = ordem // sorteados + 1
+        contagem = np.bincount(dezenas, minlength=linhas)
+        fins = np.cumsum(contagem)
+        inicios = fins - contagem
+        presentes = np.flatnonzero(contagem)
+
+        intervalos = np.diff(numeros)
+        # Diferenças entre a última aparição de uma dezena e a primeira da seguinte não contam
+        limites = fins[presentes]
+        intervalos[limites[limites < len(numeros)] - 1] = 0
+        maiores = np.zeros(linhas, dtype=np.int64)
+        com_intervalo = presentes[contagem[presentes] > 1]
+        if len(com_intervalo):
+            maiores[com_intervalo] = np.maximum.reduceat(intervalos, inicios[com_intervalo])
+
+        bloco.frequencias = contagem.tolist()
+        primeiro = np.zeros(linhas, dtype=np.int64)
+        ultimo = np.zeros(linhas, dtype=np.int64)
+        primeiro[presentes] = numeros[inicios[presentes]]
+        ultimo[presentes] = numeros[fins[presentes] - 1]
+        bloco.primeiro = primeiro.tolist()
+        bloco.ultimo = ultimo.tolist()
+        bloco.maior_intervalo = maiores.tolist()
+
+        # Pares: código a*linhas+b de cada combinação de posições, contados e simetrizados
+        codigos = np.zeros(linhas * linhas, dtype=np.int64)
+        for i in range(sorteados - 1):
+            for j in range(i + 1, sorteados):
+                codigos += np.bincount(sorteios[i].astype(np.int64) * linhas + sorteios[j],
+                                       minlength=linhas * linhas)
+        matriz = codigos.reshape(linhas, linhas)
+        bloco.pares = np.triu(matriz + matriz.T, 1).tolist()
+
+        self.mesclar(bloco)
+
+    def mesclar(self, outra):
+        """Acrescenta as estatísticas de `outra`, cujos sorteios vêm depois destes"""
+        deslocamento = self.total
+        for dezena in range(1, self.universo + 1):
+            if not outra.frequencias[dezena]:
+                continue
+            if self.frequencias[dezena]:
+                # Intervalo entre a última aparição aqui e a primeira em `outra`
+                intervalo = deslocamento + outra.primeiro[dezena] - self.ultimo[dezena]
+                self.maior_intervalo[dezena] = max(self.maior_intervalo[dezena], outra.maior_intervalo[dezena],
+                                                   intervalo)
+            else:
+                self.primeiro[dezena] = deslocamento + outra.primeiro[dezena]
+                self.maior_intervalo[dezena] = outra.maior_intervalo[dezena]
+            self.ultimo[dezena] = deslocamento + outra.ultimo[dezena]
+            self.frequencias[dezena] += outra.frequencias[dezena]
+
+        for linha, linha_outra in zip(self.pares, outra.pares):
+            for b, quantidade in enumerate(linha_outra):
+                if quantidade:
+                    linha[b] += quantidade
+        self.total += outra.total
+
+    def par(self, a, b):
+        """Sorteios em que as dezenas a e b saíram juntas"""
+        return self.pares[min(a, b)][max(a, b)]
+
+    def atraso(self, dezena):
+        """Sorteios desde a última aparição (todos, se a dezena nunca saiu)"""
+        return self.total - self.ultimo[dezena]
+
+    def intervalo_medio(self, dezena):
+        """Média dos intervalos entre aparições consecutivas (None com menos de duas)"""
+        if self.frequencias[dezena] < 2:
+            return None
+        return (self.ultimo[dezena] - self.primeiro[dezena]) / (self.frequencias[dezena] - 1)
+
+    def mais_sorteadas(self, quantidade=10):
+        """[(dezena, frequência)] em ordem decrescente de frequência"""
+        return sorted(((d, self.frequencias[d]) for d in range(1, self.universo + 1)),
+                      key=lambda item: -item[1])[:quantidade]
+
+    def pares_mais_frequentes(self, quantidade=10):
+        """[((a, b), sorteios juntos)] em ordem decrescente"""
+        limite = self.universo + 1
+        pares = [((a, b), self.pares[a][b]) for a in range(1, limite) for b in range(a + 1, limite)]
+        return sorted(pares, key=lambda item: -item[1])[:quantidade]
+
+    def resumo(self, quantidade=10):
+        """Dicionário serializável em JSON com os destaques e os valores por dezena"""
+        return {
+            'total_sorteios': self.total,
+            'mais_sorteadas': self.mais_sorteadas(quantidade),
+            'menos_sorteadas': self.mais_sorteadas(self.universo)[:-quantidade - 1:-1],
+            'pares_mais_frequentes': self.pares_mais_frequentes(quantidade),
+            'frequencias': self.frequencias[1:],
+            'atrasos': [self.atraso(d) for d in range(1, self.universo + 1)],
+            'maiores_intervalos': self.maior_intervalo[1:]
+        }
+
+    def estado(self):
+        """Acumuladores serializáveis em JSON (para checkpoints)"""
+        return {
+            'universo': self.universo,
+            'total': self.total,
+            'frequencias': self.frequencias,
+            'primeiro': self.primeiro,
+            'ultimo': self.ultimo,
+            'maior_intervalo': self.maior_intervalo,
+            'pares': self.pares
+        }
+
+    @classmethod
+    def de_estado(cls, dados):
+        estatisticas = cls(dados.get('universo', 60))
+        for nome, valor in dados.items():
+            setattr(estatisticas, nome, valor)
+        return estatisticas
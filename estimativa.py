@@ -0,0 +1,191 @@
+"""Estimativa sequencial das taxas de prêmio, com intervalos de confiança.
+
+Com `motor.estimativa = EstimativaSequencial(precisao=0.05)`, o motor
+entrega seus contadores à estimativa entre sorteios (a cada
+intervalo_publicacao sorteios, bloco ou evento). Cada entrega fecha um
+lote (sorteios, prêmios por faixa) e os lotes são independentes: a taxa
+de cada faixa (prêmios por sorteio) é a razão dos totais e sua variância
+vem da dispersão dos lotes (estimador de razão), o que vale também para
+jogos de 7+ dezenas, que rendem vários prêmios no mesmo sorteio. A
+variância supõe lotes de tamanhos parecidos: os motores por blocos, cujos
+blocos crescem, entregam cada bloco em lotes de SORTEIOS_POR_LOTE
+sorteios (registrar_lotes). A memória é constante (somas por faixa). Quando o intervalo de todas as
+faixas alvo fica dentro da precisão relativa pedida, o motor encerra a
+execução sozinho.
+"""
+import math
+import threading
+
+# Mínimos antes de confiar na variância estimada: prêmios por faixa alvo e lotes
+MINIMO_PREMIOS = 30
+MINIMO_LOTES = 30
+
+# Sorteios por lote nos motores que pontuam blocos de tamanho variável
+SORTEIOS_POR_LOTE = 4096
+
+
+def quantil_normal(p):
+    """Quantil da normal padrão (inverso da acumulada), por bisseção sobre math.erf.
+
+    statistics.NormalDist só existe a partir do Python 3.8.
+    """
+    inferior, superior = -40.0, 40.0
+    for _ in range(100):
+        meio = (inferior + superior) / 2
+        if (1 + math.erf(meio / math.sqrt(2))) / 2 < p:
+            inferior = meio
+        else:
+            superior = meio
+    return (inferior + superior) / 2
+
+
+class EstimativaSequencial:
+    """Taxas por faixa com intervalo de confiança e critério de parada.
+
+    precisao é a meia largura relativa do intervalo (0,05 = ±5%); faixas
+    são as faixas que precisam atingi-la. registrar(motor) retorna True
+    quando a precisão foi atingida.
+    """
+
+    def __init__(self, precisao=0.05, confianca=0.95, faixas=(4,), minimo_premios=MINIMO_PREMIOS):
+        self.precisao = precisao
+        self.confianca = confianca
+        self.faixas = tuple(faixas)
+        self.minimo_premios = minimo_premios
+        self.z = quantil_normal((1 + confianca) / 2)
+        self.atingida = False
+        self._trava = threading.Lock()
+
+        self.lotes = 0
+        self.sorteios = 0
+        self.soma_quadrados_sorteios = 0
+        # Por faixa: prêmios, soma dos quadrados dos prêmios por lote e dos produtos lote x sorteios
+        self.premios = {}
+        self.soma_quadrados = {}
+        self.soma_produtos = {}
+        # Contadores do motor no fim do último lote
+        self.anterior = (0, {})
+
+    def registrar(self, motor):
+        """Fecha um lote com os sorteios e prêmios desde a última chamada"""
+        with self._trava:
+            total_anterior, premios_anteriores = self.anterior
+            sorteios = motor.total_sorteios - total_anterior
+            if sorteios <= 0:
+                return self.atingida
+            self._acumular(sorteios, {faixa: quantidade - premios_anteriores.get(faixa, 0)
+                                      for faixa, quantidade in motor.premios.items()})
+            return self._fechar(motor)
+
+    def registrar_lotes(self, motor, lotes):
+        """Fecha vários lotes (sorteios, {faixa: prêmios}) que somam o avanço do motor desde a última chamada"""
+        with self._trava:
+            for sorteios, premios in lotes:
+                if sorteios > 0:
+                    self._acumular(sorteios, premios)
+            return self._fechar(motor)
+
+    def _acumular(self, sorteios, premios):
+        self.lotes += 1
+        self.sorteios += sorteios
+        self.soma_quadrados_sorteios += sorteios * sorteios
+        for faixa, quantidade in premios.items():
+            self.premios[faixa] = self.premios.get(faixa, 0) + quantidade
+            self.soma_quadrados[faixa] = self.soma_quadrados.get(faixa, 0) + quantidade * quantidade
+            self.soma_produtos[faixa] = self.soma_produtos.get(faixa, 0) + quantidade * sorteios
+
+    def _fechar(self, motor):
+        self.anterior = (motor.total_sorteios, dict(motor.premios))
+        self.atingida = self.lotes >= MINIMO_LOTES and all(
+            self.premios.get(faixa, 0) >= self.minimo_premios
+            and self._intervalo(faixa)['erro_relativo'] <= self.precisao for faixa in self.faixas)
+        return self.atingida
+
+    def sorteios_restantes(self):
+        """Sorteios que ainda faltam para a precisão, pelo erro atual (None sem prêmios suficientes)"""
+        with self._trava:
+            if self.atingida:
+                return 0
+            faltam = 0
+            for faixa in self.faixas:
+                intervalo = self._intervalo(faixa)
+                if intervalo['premios'] < self.minimo_premios:
+                    return None
+                # O erro relativo cai com a raiz do número de sorteios
+                necessarios = self.sorteios * (intervalo['erro_relativo'] / self.precisao) ** 2
+                faltam = max(faltam, math.ceil(necessarios - self.sorteios))
+            return faltam
+
+    def _intervalo(self, faixa):
+        n = self.sorteios
+        premios = self.premios.get(faixa, 0)
+        if n == 0:
+            return {'taxa': 0.0, 'inferior': 0.0, 'superior': None, 'erro_relativo': math.inf, 'premios': 0}
+        taxa = premios / n
+        if premios == 0:
+            # Nenhum prêmio: limite superior exato de Poisson (regra de três para 95%)
+            return {'taxa': 0.0, 'inferior': 0.0, 'superior': -math.log(1 - self.confianca) / n,
+                    'erro_relativo': math.inf, 'premios': 0}
+
+        # Variância do estimador de razão: dispersão de (prêmios - taxa x sorteios) entre os lotes
+        k = self.lotes
+        residuos = (self.soma_quadrados[faixa] - 2 * taxa * self.soma_produtos[faixa]
+                    + taxa * taxa * self.soma_quadrados_sorteios)
+        if k > 1:
+            variancia = max(residuos, 0.0) / (k - 1) * k / (n * n)
+        else:
+            # Um só lote: aproximação de Poisson
+            variancia = premios / (n * n)
+        meia_largura = self.z * math.sqrt(variancia)
+        return {
+            'taxa': taxa,
+            'inferior': max(taxa - meia_largura, 0.0),
+            'superior': taxa + meia_largura,
+            'erro_relativo': meia_largura / taxa,
+            'premios': premios
+        }
+
+    def intervalos(self, custo_por_sorteio=None):
+        """{faixa: taxa, limites do intervalo, erro relativo e, com o custo, o custo por prêmio}"""
+        with self._trava:
+            resultado = {faixa: self._intervalo(faixa) for faixa in self.premios}
+        for intervalo in resultado.values():
+            intervalo['sorteios_por_premio'] = 1 / intervalo['taxa'] if intervalo['taxa'] else None
+            if custo_por_sorteio is not None:
+                # Custo por prêmio = custo por sorteio / taxa: os limites se invertem
+                intervalo['custo_por_premio'] = (custo_por_sorteio / intervalo['taxa']
+                                                 if intervalo['taxa'] else None)
+                intervalo['custo_inferior'] = (custo_por_sorteio / intervalo['superior']
+                                               if intervalo['superior'] else None)
+                intervalo['custo_superior'] = (custo_por_sorteio / intervalo['inferior']
+                                               if intervalo['inferior'] else None)
+        return resultado
+
+    def estado(self):
+        """Somas e configuração serializáveis em JSON (para checkpoints)"""
+        with self._trava:
+            return {
+                'precisao': self.precisao,
+                'confianca': self.confianca,
+                'faixas': list(self.faixas),
+                'minimo_premios': self.minimo_premios,
+                'lotes': self.lotes,
+                'sorteios': self.sorteios,
+                'soma_quadrados_sorteios': self.soma_quadrados_sorteios,
+                'premios': {str(f): v for f, v in self.premios.items()},
+                'soma_quadrados': {str(f): v for f, v in self.soma_quadrados.items()},
+                'soma_produtos': {str(f): v for f, v in self.soma_produtos.items()},
+                'anterior': [self.anterior[0], {str(f): v for f, v in self.anterior[1].items()}]
+            }
+
+    @classmethod
+    def de_estado(cls, dados):
+        estimativa = cls(dados['precisao'], dados['confianca'], dados['faixas'], dados['minimo_premios'])
+        estimativa.lotes = dados['lotes']
+        estimativa.sorteios = dados['sorteios']
+        estimativa.soma_quadrados_sorteios = dados['soma_quadrados_sorteios']
+        for nome in ('premios', 'soma_quadrados', 'soma_produtos'):
+            setattr(estimativa, nome, {int(f): v for f, v in dados[nome].items()})
+        total, premios = dados['anterior']
+        estimativa.anterior = (total, {int(f): v for f, v in premios.items()})
+        return estimativa
@@ -0,0 +1,157 @@
+"""Histórico compacto de sorteios com memória constante.
+
+Cada sorteio ocupa uma linha de bytes: o número do sorteio (uint64), as
+dezenas sorteadas (6 na Mega-Sena) e os acertos de cada jogo (uint8). As linhas ficam em um buffer circular
+de capacidade fixa; opcionalmente, o histórico completo é gravado em um
+arquivo comprimido (gzip) para consulta posterior com ler_historico.
+
+Para exibição, HistoricoResumido guarda só um resumo de tamanho fixo por
+sorteio, qualquer que seja a quantidade de jogos.
+"""
+import gzip
+import struct
+from collections import deque
+from itertools import islice
+
+# Cabeçalho do arquivo: identificador + largura da linha (uint32); no
+# formato 2, também as dezenas por sorteio (uint32), se não forem 6
+ASSINATURA = b"MSH1"
+ASSINATURA_SORTEADOS = b"MSH2"
+
+# Bytes do número do sorteio no início de cada linha
+BYTES_NUMERO = 8
+
+
+class HistoricoCompacto:
+    """Buffer circular das últimas `capacidade` linhas de sorteio"""
+
+    def __init__(self, qtd_jogos, capacidade=500, arquivo=None, sorteados=6):
+        self.sorteados = sorteados
+        self.largura = BYTES_NUMERO + sorteados + qtd_jogos
+        self.capacidade = capacidade
+        self.total = 0
+        self._dados = bytearray(capacidade * self.largura)
+        self._arquivo = None
+        if arquivo is not None:
+            self._arquivo = gzip.open(arquivo, "wb")
+            if sorteados == 6:
+                self._arquivo.write(ASSINATURA + struct.pack("<I", self.largura))
+            else:
+                self._arquivo.write(ASSINATURA_SORTEADOS + struct.pack("<II", self.largura, sorteados))
+
+    def __len__(self):
+        return min(self.total, self.capacidade)
+
+    def adicionar(self, numero, sorteio, resultados):
+        """Registra um sorteio (número, dezenas) e os acertos de cada jogo"""
+        self.adicionar_linhas(numero.to_bytes(BYTES_NUMERO, "little") + bytes(sorteio) + bytes(resultados))
+
+    def adicionar_linhas(self, dados):
+        """Registra várias linhas já codificadas (múltiplo de `largura` bytes)"""
+        if self._arquivo is not None:
+            self._arquivo.write(dados)
+
+        qtd = len(dados) // self.largura
+        if qtd > self.capacidade:
+            # Só as últimas linhas cabem no buffer
+            descartadas = qtd - self.capacidade
+            self.total += descartadas
+            dados = dados[descartadas * self.largura:]
+            qtd = self.capacidade
+
+        inicio = (self.total % self.capacidade) * self.largura
+        ate_o_fim = min(len(dados), len(self._dados) - inicio)
+        self._dados[inicio:inicio + ate_o_fim] = dados[:ate_o_fim]
+        self._dados[:len(dados) - ate_o_fim] = dados[ate_o_fim:]
+        self.total += qtd
+
+    def linha(self, indice):
+        """Retorna (número do sorteio, dezenas, acertos) da linha retida `indice`.
+
+        O índice 0 é a linha mais antiga ainda no buffer.
+        """
+        if not 0 <= indice < len(self):
+            raise IndexError(indice)
+        posicao = self.total - len(self) + indice
+        inicio = (posicao % self.capacidade) * self.largura
+        return _decodificar(self._dados[inicio:inicio + self.largura], self.sorteados)
+
+    def linhas(self, inicio=0, fim=None):
+        """Linhas retidas no intervalo [inicio, fim)"""
+        fim = len(self) if fim is None else min(fim, len(self))
+        return [self.linha(i) for i in range(inicio, fim)]
+
+    def ultimas(self, quantidade):
+        """As `quantidade` linhas mais recentes, da mais antiga para a mais nova"""
+        return self.linhas(max(0, len(self) - quantidade))
+
+    def limpar(self):
+        self.total = 0
+
+    def fechar(self):
+        if self._arquivo is not None:
+            self._arquivo.close()
+            self._arquivo = None
+
+
+class HistoricoResumido:
+    """Últimas `capacidade` linhas de sorteio, cada uma com um resumo de tamanho fixo.
+
+    Em vez dos acertos de cada jogo, a linha guarda (número do sorteio,
+    dezenas, melhor acerto, jogos premiados em cada faixa): a memória e o
+    custo de exibição não dependem do tamanho da carteira. Os acertos de
+    cada jogo podem ser recalculados a partir das dezenas sorteadas.
+    """
+
+    def __init__(self, faixas, capacidade=500):
+        self.faixas = tuple(faixas)
+        self.total = 0
+        self._linhas = deque(maxlen=capacidade)
+
+    def __len__(self):
+        return len(self._linhas)
+
+    def adicionar(self, numero, sorteio, resultados, melhor=None):
+        """Registra um sorteio a partir dos acertos de cada jogo (lista, sem cópia)"""
+        if melhor is None:
+            melhor = max(resultados, default=0)
+        contagens = tuple(resultados.count(faixa) for faixa in self.faixas)
+        self._linhas.append((numero, list(sorteio), melhor, contagens))
+        self.total += 1
+
+    def linha(self, indice):
+        """Retorna (número do sorteio, dezenas, melhor acerto, premiados por faixa)"""
+        return self._linhas[indice]
+
+    def linhas(self, inicio=0, fim=None):
+        """Linhas retidas no intervalo [inicio, fim)"""
+        return list(islice(self._linhas, inicio, fim))
+
+    def limpar(self):
+        self.total = 0
+        self._linhas.clear()
+
+
+def _decodificar(bruto, sorteados=6):
+    numero = int.from_bytes(bruto[:BYTES_NUMERO], "little")
+    dezenas = bruto[BYTES_NUMERO:BYTES_NUMERO + sorteados]
+    return numero, list(dezenas), list(bruto[BYTES_NUMERO + sorteados:])
+
+
+def ler_historico(caminho):
+    """Percorre um histórico gravado, gerando (número, dezenas, acertos)"""
+    with gzip.open(caminho, "rb") as arquivo:
+        cabecalho = arquivo.read(len(ASSINATURA) + 4)
+        assinatura = cabecalho[:len(ASSINATURA)]
+        if assinatura not in (ASSINATURA, ASSINATURA_SORTEADOS):
+            raise ValueError(f"Arquivo de histórico inválido: {caminho}")
+        largura = struct.unpack("<I", cabecalho[len(ASSINATURA):])[0]
+        sorteados = 6
+        if assinatura == ASSINATURA_SORTEADOS:
+            sorteados = struct.unpack("<I", arquivo.read(4))[0]
+
+        while True:
+            bruto = arquivo.read(largura)
+            if len(bruto) < largura:
+                break
+            yield _decodificar(bruto, sorteados)
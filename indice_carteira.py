@@ -0,0 +1,181 @@
+"""Índice invertido dezena -> jogos, para carteiras muito grandes (bolões).
+
+Para cada dezena do volante guarda-se um array compacto (uint32) com os
+ids dos jogos que a contêm. Um sorteio percorre apenas os jogos das
+dezenas sorteadas, acumulando os acertos em um contador reutilizável; o
+custo por sorteio depende dos jogos tocados, não do tamanho da carteira.
+Requer numpy.
+"""
+import numpy as np
+
+from metricas import FASES, HISTORICO, PARADA, PONTUACAO, PUBLICACAO, SORTEIO
+from motor import MotorSimulacao
+from motor_vetorizado import matriz_premios
+
+
+class IndiceCarteira:
+    """Índice compilado de uma carteira (lista de jogos de criar_jogo)"""
+
+    def __init__(self, jogos, universo=60):
+        self.qtd_jogos = len(jogos)
+        ids_por_dezena = [[] for _ in range(universo + 1)]
+        for idx, jogo in enumerate(jogos):
+            for dezena in jogo['dezenas']:
+                ids_por_dezena[dezena].append(idx)
+        self.jogos_por_dezena = [np.array(ids, dtype=np.uint32) for ids in ids_por_dezena]
+        # Acertos por jogo; só as posições tocadas deixam de ser zero, e
+        # são zeradas de novo ao fim de cada pontuação
+        self.contadores = np.zeros(self.qtd_jogos, dtype=np.uint8)
+
+    def pontuar(self, sorteio):
+        """Pontua um sorteio tocando apenas os jogos das dezenas sorteadas.
+
+        Retorna (ids, acertos): um jogo com h acertos aparece h vezes em
+        ids, sempre com o valor h em acertos.
+        """
+        contadores = self.contadores
+        listas = [self.jogos_por_dezena[dezena] for dezena in sorteio]
+        # Dentro de uma mesma dezena os ids são únicos: o incremento é seguro
+        for ids in listas:
+            contadores[ids] += 1
+        ids = np.concatenate(listas)
+        acertos = contadores[ids]
+        contadores[ids] = 0
+        return ids, acertos
+
+
+class MotorIndexado(MotorSimulacao):
+    """Mesmas entradas e resultado do MotorSimulacao, pontuando pelo índice.
+
+    Quando há ao_sortear, canal ou historico, a lista completa de acertos
+    por jogo é montada a cada sorteio, o que volta a custar O(jogos).
+    """
+
+    def __init__(self, jogos, max_sorteios=0, parar_em=(6,), semente=None, ao_sortear=None,
+                 canal=None, historico=None, sorteador='amostra', indice=None, loteria=None):
+        super().__init__(jogos, max_sorteios, parar_em, semente, ao_sortear, canal, historico, sorteador, loteria)
+        self.indice = indice or IndiceCarteira(self.jogos, self.loteria.universo)
+        # Prêmios por (acertos, faixa, jogo) e faixas de parada como colunas da matriz
+        self.premios_jogos = matriz_premios(self.jogos, self.loteria)
+        self.colunas_parada = [i for i, faixa in enumerate(self.loteria.faixas) if faixa in self.parar_em]
+
+    def executar(self):
+        self.ativo = True
+        pontuar = self.indice.pontuar
+        premios_jogos = self.premios_jogos
+        colunas_parada = self.colunas_parada
+        loteria = self.loteria
+        faixa_minima = loteria.acertos_minimo
+        # Jogos sem acertos não são tocados pelo índice: os prêmios de zero acertos
+        # (Lotomania) são os da carteira inteira menos os dos jogos tocados
+        premios_zero = premios_jogos[0].sum(axis=1) if faixa_minima == 0 else None
+        qtd_jogos = self.indice.qtd_jogos
+        premios = self.premios
+        historico = self.historico
+        sortear = loteria.sorteador(self.sorteador)
+        checkpoint = self.checkpoint
+        estatisticas = self.estatisticas
+        detalhar = self.ao_sortear is not None or self.canal is not None or historico is not None
+        recentes = []
+
+        metricas = self.metricas
+        medir = metricas is not None
+        if medir:
+            relogio = metricas.relogio
+            tempos = [0.0] * len(FASES)
+            metricas.iniciar(self)
+            marca = relogio()
+
+        while self.ativo:
+            if self.max_sorteios > 0 and self.total_sorteios >= self.max_sorteios:
+                break
+
+            if medir:
+                agora = relogio()
+                tempos[PARADA] += agora - marca
+                marca = agora
+
+            sorteio = sortear(self.rng)
+            self.total_sorteios += 1
+            if estatisticas is not None:
+                estatisticas.adicionar(sorteio)
+
+            if medir:
+                agora = relogio()
+                tempos[SORTEIO] += agora - marca
+                marca = agora
+
+            ids, acertos = pontuar(sorteio)
+            melhor_acerto_sorteio = int(acertos.max()) if len(acertos) else 0
+            parar = False
+
+            if melhor_acerto_sorteio >= faixa_minima:
+                # Um jogo com h acertos aparece h vezes: considera-se só a primeira
+                premiados = acertos >= faixa_minima
+                ids_premiados, primeiras = np.unique(ids[premiados], return_index=True)
+                premios_sorteio = premios_jogos[acertos[premiados][primeiras], :, ids_premiados].sum(axis=0)
+                if premios_zero is not None:
+                    premios_sorteio += premios_zero - premios_jogos[0, :, ids_premiados].sum(axis=0)
+                for faixa, quantidade in zip(loteria.faixas, premios_sorteio.tolist()):
+                    premios[faixa] += quantidade
+                parar = bool(premios_sorteio[colunas_parada].any())
+
+            if melhor_acerto_sorteio > self.melhor_resultado:
+                self.melhor_resultado = melhor_acerto_sorteio
+
+            if medir:
+                agora = relogio()
+                tempos[PONTUACAO] += agora - marca
+                marca = agora
+
+            if detalhar:
+                resultados_jogos = np.zeros(qtd_jogos, dtype=np.uint8)
+                resultados_jogos[ids] = acertos
+                if historico is not None:
+                    historico.adicionar(self.total_sorteios, sorteio, resultados_jogos.tobytes())
+                    if medir:
+                        agora = relogio()
+                        tempos[HISTORICO] += agora - marca
+                        marca = agora
+                if self.ao_sortear is not None or self.canal is not None:
+                    info_sorteio = {
+                        'numero': self.total_sorteios,
+                        'sorteio': sorteio,
+                        'resultados': resultados_jogos.tolist(),
+                        'melhor': melhor_acerto_sorteio,
+                        'premio': loteria.nome_premio(melhor_acerto_sorteio)
+                    }
+                    if self.ao_sortear is not None:
+                        self.ao_sortear(info_sorteio)
+                    if self.canal is not None:
+                        recentes.append(info_sorteio)
+                        if len(recentes) >= self.intervalo_publicacao:
+                            self.publicar_progresso(recentes)
+                            recentes = []
+                    if medir:
+                        agora = relogio()
+                        tempos[PUBLICACAO] += agora - marca
+                        marca = agora
+
+            if parar:
+                self.sorteio_parada = self.total_sorteios
+                break
+
+            if self.total_sorteios % self.intervalo_publicacao == 0:
+                if medir:
+                    metricas.acumular(self.total_sorteios, tempos)
+                    tempos = [0.0] * len(FASES)
+                # A estimativa fecha o lote antes: o checkpoint grava os dois no mesmo ponto
+                if self.registrar_estimativa():
+                    break
+                if checkpoint is not None:
+                    checkpoint.registrar(self)
+
+        self.registrar_estimativa()
+        if medir:
+            tempos[PARADA] += relogio() - marca
+            metricas.acumular(self.total_sorteios, tempos)
+        self.ativo = False
+        self.publicar_progresso(recentes)
+        self.registrar_checkpoint(final=True)
+        return self.resultado()
@@ -0,0 +1,181 @@
+"""Especificação das loterias da Caixa (Mega-Sena, Quina, Lotofácil...).
+
+Uma Loteria descreve o volante (números de 1 a `universo`, `sorteados`
+números por sorteio, tamanhos de aposta e seus preços), as faixas de
+premiação (acertos -> nome) e quantos sorteios cada concurso tem (2 na
+Dupla Sena). Na criação, a especificação é compilada nas tabelas que os
+motores usam no laço de pontuação: prêmios por (tamanho do jogo,
+acertos), os mesmos já filtrados por tamanho e o menor número de acertos
+premiado. Os números de um jogo são guardados na mesma máscara de bits
+da Mega-Sena (número n -> bit n-1), sem limite de 60 bits.
+
+Os motores contam sorteios; o custo de cada sorteio é o da carteira
+dividido pelos sorteios do concurso, e o gasto total é o dos concursos
+iniciados.
+"""
+from math import factorial
+
+from sorteador import SORTEADORES
+
+
+def combinar(n, k):
+    """Calcula combinação C(n,k)"""
+    if k < 0 or k > n:
+        return 0
+    return factorial(n) // (factorial(k) * factorial(n - k))
+
+
+def mascara(dezenas):
+    """Representa números (1 a N) como inteiro de N bits (número n -> bit n-1)"""
+    valor = 0
+    for d in dezenas:
+        valor |= 1 << (d - 1)
+    return valor
+
+
+def precos_proporcionais(preco_simples, aposta_simples, maior_aposta):
+    """Preços por tamanho de jogo: um jogo de k números vale C(k, aposta_simples) apostas simples"""
+    return {qtd: round(preco_simples * combinar(qtd, aposta_simples), 2)
+            for qtd in range(aposta_simples, maior_aposta + 1)}
+
+
+class Loteria:
+    """Especificação de uma loteria, compilada em tabelas de prêmios.
+
+    precos mapeia o tamanho do jogo ao preço; a aposta simples é o menor
+    tamanho. faixas mapeia os acertos ao nome da faixa, em ordem crescente.
+    Um jogo de k números equivale às C(k, aposta simples) apostas simples
+    que contém, cada uma premiada pelos seus próprios acertos.
+    """
+
+    def __init__(self, chave, nome, universo, sorteados, precos, faixas, emojis=None, sorteios_por_concurso=1):
+        self.chave = chave
+        self.nome = nome
+        self.universo = universo
+        self.sorteados = sorteados
+        self.precos = dict(sorted(precos.items()))
+        self.aposta_simples = min(self.precos)
+        self.faixas = dict(sorted(faixas.items()))
+        self.emojis = dict(emojis or {})
+        self.sorteios_por_concurso = sorteios_por_concurso
+        self.numeros = range(1, universo + 1)
+        self.total_combinacoes = combinar(universo, sorteados)
+
+        # Tabela (números do jogo, acertos) -> {faixa: prêmios}, para todo tamanho de jogo
+        self.tabela_premios = {(qtd, acertos): self.premios_por_acertos(qtd, acertos)
+                               for qtd in self.precos for acertos in range(sorteados + 1)}
+        # Por tamanho: prêmios indexados pelos acertos, só com as faixas premiadas
+        self._premios_jogo = {qtd: [tuple((faixa, n) for faixa, n in self.tabela_premios[qtd, acertos].items() if n)
+                                    for acertos in range(sorteados + 1)] for qtd in self.precos}
+        # Menor número de acertos que rende algum prêmio (0 na Lotomania)
+        self.acertos_minimo = min(acertos for premios in self._premios_jogo.values()
+                                  for acertos, faixas in enumerate(premios) if faixas)
+
+    def __repr__(self):
+        return f"Loteria({self.chave!r})"
+
+    def premios_por_acertos(self, qtd_dezenas, acertos):
+        """Prêmios {faixa: quantidade} de um jogo de qtd_dezenas com `acertos` acertos.
+
+        Com h acertos, C(h,f)·C(k-h, s-f) das apostas simples (de s números)
+        contidas no jogo acertam exatamente f números.
+        """
+        return {faixa: combinar(acertos, faixa) * combinar(qtd_dezenas - acertos, self.aposta_simples - faixa)
+                for faixa in self.faixas}
+
+    def premios_do_jogo(self, qtd_dezenas):
+        """Prêmios de um jogo indexados pelos acertos: tuplas de (faixa, quantidade) premiadas"""
+        return self._premios_jogo[qtd_dezenas]
+
+    def calcular_probabilidade(self, qtd_dezenas):
+        """Probabilidade (%) de acertar todos os números sorteados com um jogo de qtd_dezenas"""
+        return combinar(qtd_dezenas, self.sorteados) / self.total_combinacoes * 100
+
+    def dezenas_da_mascara(self, valor):
+        """Lista ordenada dos números contidos em uma máscara"""
+        return [i + 1 for i in range(self.universo) if valor >> i & 1]
+
+    def criar_jogo(self, dezenas):
+        """Cria o dicionário de um jogo (como motor.criar_jogo), validando o volante"""
+        dezenas_ordenadas = sorted(dezenas)
+        if len(dezenas_ordenadas) not in self.precos:
+            raise ValueError(f"{self.nome}: jogos devem ter de {self.aposta_simples} a "
+                             f"{max(self.precos)} números!")
+        if len(set(dezenas_ordenadas)) != len(dezenas_ordenadas) or not all(
+                1 <= d <= self.universo for d in dezenas_ordenadas):
+            raise ValueError(f"{self.nome}: números devem ser distintos, de 1 a {self.universo}!")
+        return {
+            'dezenas': dezenas_ordenadas,
+            'mascara': mascara(dezenas_ordenadas),
+            'preco': self.precos[len(dezenas_ordenadas)],
+            'probabilidade': self.calcular_probabilidade(len(dezenas_ordenadas))
+        }
+
+    def nome_premio(self, acertos):
+        """Texto do prêmio para um número de acertos (vazio se não premiado)"""
+        if acertos in self.faixas:
+            emoji = self.emojis.get(acertos)
+            return f"{self.faixas[acertos]}! {emoji}" if emoji else f"{self.faixas[acertos]}!"
+        return ""
+
+    def sortear(self, rng):
+        """Um sorteio: amostra sem reposição de um random.Random, ordenada"""
+        return sorted(rng.sample(self.numeros, self.sorteados))
+
+    def sorteador(self, nome):
+        """Função(gerador) -> números ordenados, para um nome de sorteador.SORTEADORES"""
+        # Os sorteadores por índice e por contador decodificam combinações de 6 em 60
+        if (self.universo, self.sorteados) == (60, 6):
+            return SORTEADORES[nome]
+        if nome != 'amostra':
+            raise ValueError(f"O sorteador '{nome}' só está disponível para a Mega-Sena")
+        return self.sortear
+
+
+MEGA_SENA = Loteria(
+    'megasena', "Mega-Sena", 60, 6,
+    # Tabela de preços da Mega-Sena (valores atualizados 2024)
+    {
+        6: 6.00,
+        7: 42.00,
+        8: 168.00,
+        9: 504.00,
+        10: 1260.00,
+        11: 2772.00,
+        12: 5544.00,
+        13: 10296.00,
+        14: 18018.00,
+        15: 30030.00,
+        16: 48048.00,
+        17: 74256.00,
+        18: 111384.00,
+        19: 162792.00,
+        20: 232560.00
+    },
+    {4: "QUADRA", 5: "QUINA", 6: "SENA"},
+    {4: "🎉", 5: "🎊", 6: "🏆"})
+
+QUINA = Loteria(
+    'quina', "Quina", 80, 5, precos_proporcionais(2.50, 5, 15),
+    {2: "DUQUE", 3: "TERNO", 4: "QUADRA", 5: "QUINA"},
+    {2: "🙂", 3: "🎉", 4: "🎊", 5: "🏆"})
+
+LOTOFACIL = Loteria(
+    'lotofacil', "Lotofácil", 25, 15, precos_proporcionais(3.00, 15, 20),
+    {acertos: f"{acertos} ACERTOS" for acertos in range(11, 16)},
+    {11: "🙂", 12: "🎉", 13: "🎉", 14: "🎊", 15: "🏆"})
+
+DUPLA_SENA = Loteria(
+    'duplasena', "Dupla Sena", 50, 6, precos_proporcionais(2.50, 6, 15),
+    {3: "TERNO", 4: "QUADRA", 5: "QUINA", 6: "SENA"},
+    {3: "🙂", 4: "🎉", 5: "🎊", 6: "🏆"},
+    sorteios_por_concurso=2)
+
+# Na Lotomania o "00" é o número 100; zero acertos também é premiado
+LOTOMANIA = Loteria(
+    'lotomania', "Lotomania", 100, 20, {50: 3.00},
+    {0: "0 ACERTOS", **{acertos: f"{acertos} ACERTOS" for acertos in range(15, 21)}},
+    {0: "🎉", 15: "🙂", 16: "🙂", 17: "🎉", 18: "🎉", 19: "🎊", 20: "🏆"})
+
+# Loterias disponíveis, pela chave usada na linha de comando e nos checkpoints
+LOTERIAS = {loteria.chave: loteria for loteria in (MEGA_SENA, QUINA, LOTOFACIL, DUPLA_SENA, LOTOMANIA)}
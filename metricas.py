@@ -0,0 +1,114 @@
+"""Instrumentação opcional dos motores de simulação.
+
+Com `motor.metricas = Metricas()`, os motores serial, indexado e
+vetorizado cronometram cada fase do laço de sorteios (geração,
+pontuação, verificação de parada, histórico e publicação) e entregam os
+tempos acumulados a cada intervalo_publicacao sorteios. A vazão (total e
+média móvel), a fila do canal de progresso e a memória são lidas do
+próprio motor a cada instantâneo, o que vale também para os demais
+motores. Sem métricas (padrão), o laço só testa uma variável local por fase.
+"""
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Fases do laço de sorteios, na ordem dos índices abaixo
+FASES = ('sorteio', 'pontuacao', 'parada', 'historico', 'publicacao')
+SORTEIO, PONTUACAO, PARADA, HISTORICO, PUBLICACAO = range(len(FASES))
+
+# Segundos cobertos pela média móvel de sorteios por segundo
+JANELA_PADRAO = 5.0
+
+
+def memoria_residente():
+    """Memória residente do processo em bytes (pico, se a atual não estiver disponível)"""
+    try:
+        with open("/proc/self/statm") as arquivo:
+            return int(arquivo.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is not None:
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # KiB no Linux, bytes no macOS
+        return pico if sys.platform == "darwin" else pico * 1024
+    return None
+
+
+class Metricas:
+    """Tempos por fase e vazão de um motor; instantaneo() pode ser chamado de outra thread"""
+
+    relogio = staticmethod(time.perf_counter)
+
+    def __init__(self, janela=JANELA_PADRAO):
+        self.janela = janela
+        self._trava = threading.Lock()
+        self._motor = None
+        self._inicio = None
+        self._sorteios_iniciais = 0
+        self._ultimo_total = 0
+        self._amostras = deque()
+        self.tempos = [0.0] * len(FASES)
+        self.sorteios_medidos = 0
+
+    def iniciar(self, motor):
+        """Chamado pelo motor no início de executar()"""
+        with self._trava:
+            self._motor = motor
+            self._inicio = self.relogio()
+            self._sorteios_iniciais = self._ultimo_total = motor.total_sorteios
+            self._amostras.clear()
+            self._amostras.append((self._inicio, motor.total_sorteios))
+
+    def acumular(self, total_sorteios, tempos):
+        """Soma os tempos por fase medidos até o sorteio `total_sorteios`"""
+        with self._trava:
+            for fase, segundos in enumerate(tempos):
+                self.tempos[fase] += segundos
+            self.sorteios_medidos += total_sorteios - self._ultimo_total
+            self._ultimo_total = total_sorteios
+
+    def _media_movel(self, agora, total):
+        amostras = self._amostras
+        amostras.append((agora, total))
+        # Descarta amostras antigas, mantendo ao menos uma anterior à janela
+        while len(amostras) > 2 and amostras[1][0] <= agora - self.janela:
+            amostras.popleft()
+        instante, anterior = amostras[0]
+        return (total - anterior) / (agora - instante) if agora > instante else 0.0
+
+    def instantaneo(self):
+        """Dicionário com vazão, tempos por fase, fila do canal e memória"""
+        with self._trava:
+            motor = self._motor
+            if motor is None:
+                return None
+            agora = self.relogio()
+            total = motor.total_sorteios
+            segundos = agora - self._inicio
+            tempos = dict(zip(FASES, self.tempos))
+            medidos = self.sorteios_medidos
+            media_movel = self._media_movel(agora, total)
+
+        soma = sum(tempos.values())
+        return {
+            'ativo': motor.ativo,
+            'sorteios': total,
+            'segundos': segundos,
+            'sorteios_por_segundo': (total - self._sorteios_iniciais) / segundos if segundos > 0 else 0.0,
+            'media_movel': media_movel,
+            'sorteios_medidos': medidos,
+            'fases': {fase: {
+                'segundos': t,
+                'fracao': t / soma if soma else 0.0,
+                'microssegundos_por_sorteio': t * 1e6 / medidos if medidos else 0.0
+            } for fase, t in tempos.items()},
+            'fila': motor.canal.pendentes() if motor.canal is not None else None,
+            'memoria': memoria_residente()
+        }
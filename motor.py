@@ -0,0 +1,494 @@
+"""Motor de simulação das loterias (Mega-Sena por padrão), independente da interface gráfica.
+
+Este módulo não importa tkinter: pode ser usado em jobs em lote, em
+servidores sem display, ou dirigido pela interface em SimLoterica.py.
+"""
+import importlib
+import threading
+from collections import deque
+from itertools import combinations
+
+from estatisticas import EstatisticasSorteios
+from estimativa import EstimativaSequencial
+from loterias import MEGA_SENA, combinar, mascara
+from metricas import FASES, HISTORICO, PARADA, PONTUACAO, PUBLICACAO, SORTEIO
+from sorteador import BINOMIAIS, TOTAL_COMBINACOES, ContadorSorteios, criar_gerador, indice_da_combinacao
+
+# Tabelas da Mega-Sena, a loteria padrão (as demais ficam em loterias.LOTERIAS)
+PRECOS = MEGA_SENA.precos
+
+# Faixas de premiação (quantidade de acertos -> nome)
+NOMES_FAIXAS = MEGA_SENA.faixas
+EMOJIS_FAIXAS = MEGA_SENA.emojis
+
+# Faixa -> chave do contador em MotorSimulacao.resultado
+CHAVES_FAIXAS = {4: 'quadras', 5: 'quinas', 6: 'senas'}
+
+
+# Motores disponíveis: nome -> (módulo, classe). São importados sob demanda
+# para não carregar dependências opcionais (numpy) sem necessidade.
+MOTORES = {
+    'serial': ('motor', 'MotorSimulacao'),
+    'vetorizado': ('motor_vetorizado', 'MotorVetorizado'),
+    'paralelo': ('motor_paralelo', 'MotorParalelo'),
+    'raro': ('amostrador_raro', 'MotorRaro'),
+    'indexado': ('indice_carteira', 'MotorIndexado'),
+}
+
+
+# Contagem de bits (popcount); int.bit_count só existe a partir do Python 3.10
+if hasattr(int, 'bit_count'):
+    contar_bits = int.bit_count
+else:
+    def contar_bits(valor):
+        return bin(valor).count("1")
+
+
+def dezenas_da_mascara(valor):
+    """Lista ordenada das dezenas contidas em uma máscara"""
+    return [i + 1 for i in range(60) if valor >> i & 1]
+
+
+def calcular_probabilidade(qtd_dezenas):
+    """Calcula a probabilidade (%) de acertar a SENA com X dezenas"""
+    combinacoes_possiveis = combinar(60, 6)
+    combinacoes_jogo = combinar(qtd_dezenas, 6)
+    return (combinacoes_jogo / combinacoes_possiveis) * 100
+
+
+def _numpy():
+    """numpy, se instalado (CoberturaSena funciona sem ele, mais devagar)"""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+class CoberturaSena:
+    """Sorteios que dariam SENA a algum jogo da carteira, para a probabilidade exata.
+
+    Cada um dos C(60,6) sorteios ocupa um bit na posição de
+    sorteador.indice_da_combinacao: a memória é fixa (cerca de 6,3 MB,
+    alocados no primeiro jogo), qualquer que seja a carteira, e sorteios
+    cobertos por mais de um jogo contam uma vez.
+    """
+
+    # Índices calculados por vez no caminho numpy (limita a memória temporária)
+    INDICES_POR_VEZ = 1 << 20
+
+    def __init__(self):
+        self.bits = None
+        self.cobertos = 0
+        self._posicoes = {}
+
+    def probabilidade(self):
+        """Probabilidade (%) de SENA da carteira"""
+        return self.cobertos / TOTAL_COMBINACOES * 100
+
+    def adicionar(self, dezenas):
+        """Marca os C(k,6) sorteios que dão SENA a um jogo de k dezenas"""
+        self.adicionar_mascaras([mascara(dezenas)])
+
+    def adicionar_mascaras(self, mascaras):
+        """Marca os sorteios de vários jogos, dados pelas máscaras (lista ou array uint64)"""
+        np = _numpy()
+        if np is None:
+            if self.bits is None:
+                self.bits = bytearray((TOTAL_COMBINACOES + 7) // 8)
+            for valor in mascaras:
+                self._marcar_python(dezenas_da_mascara(int(valor)))
+            return
+        if self.bits is None:
+            self.bits = np.zeros((TOTAL_COMBINACOES + 7) // 8, dtype=np.uint8)
+        mascaras = np.asarray(mascaras, dtype=np.uint64)
+        deslocamentos = np.arange(60, dtype=np.uint64)
+        for inicio in range(0, len(mascaras), 65536):
+            presentes = (mascaras[inicio:inicio + 65536, None] >> deslocamentos) & np.uint64(1)
+            presentes = presentes.astype(bool)
+            tamanhos = presentes.sum(axis=1)
+            for k in np.unique(tamanhos):
+                if k < 6:
+                    continue
+                grupo = presentes[tamanhos == k]
+                # Posições (0 a 59) das dezenas de cada jogo, em ordem crescente
+                dezenas = np.nonzero(grupo)[1].reshape(len(grupo), int(k))
+                self._marcar_numpy(np, dezenas)
+
+    def _marcar_python(self, dezenas):
+        bits = self.bits
+        for combinacao in combinations(dezenas, 6):
+            indice = indice_da_combinacao(combinacao)
+            bit = 1 << (indice & 7)
+            if not bits[indice >> 3] & bit:
+                bits[indice >> 3] |= bit
+                self.cobertos += 1
+
+    def _marcar_numpy(self, np, dezenas):
+        k = dezenas.shape[1]
+        if k not in self._posicoes:
+            self._posicoes[k] = np.array(list(combinations(range(k), 6)), dtype=np.intp).T
+        posicoes = self._posicoes[k]
+        # tabela[i][c] = C(c, i+1): índice do sorteio = soma das 6 parcelas
+        tabela = np.array(BINOMIAIS[1:7], dtype=np.int64)
+        jogos_por_vez = max(1, self.INDICES_POR_VEZ // posicoes.shape[1])
+        for inicio in range(0, len(dezenas), jogos_por_vez):
+            bloco = dezenas[inicio:inicio + jogos_por_vez]
+            indices = tabela[0][bloco[:, posicoes[0]]]
+            for i in range(1, 6):
+                indices += tabela[i][bloco[:, posicoes[i]]]
+            # Ordena para juntar os bits de cada byte (jogos do bloco podem se sobrepor)
+            indices = np.sort(indices, axis=None)
+            bytes_ = indices >> 3
+            bits = np.left_shift(1, indices & 7).astype(np.uint8)
+            inicios = np.flatnonzero(np.r_[True, bytes_[1:] != bytes_[:-1]])
+            bytes_ = bytes_[inicios]
+            bits = np.bitwise_or.reduceat(bits, inicios)
+            novos = bits & ~self.bits[bytes_]
+            self.cobertos += int(np.unpackbits(novos).sum())
+            self.bits[bytes_] |= bits
+
+
+premios_por_acertos = MEGA_SENA.premios_por_acertos
+
+# Tabela (dezenas do jogo, acertos) -> {faixa: prêmios}, para todo tamanho de PRECOS
+TABELA_PREMIOS = MEGA_SENA.tabela_premios
+
+
+def premios_do_jogo(qtd_dezenas):
+    """Prêmios de um jogo indexados pelos acertos (0 a 6).
+
+    Cada posição é uma tupla de pares (faixa, quantidade), só com as faixas
+    premiadas, pronta para o laço de pontuação.
+    """
+    return MEGA_SENA.premios_do_jogo(qtd_dezenas)
+
+
+def criar_jogo(dezenas):
+    """Cria o dicionário de um jogo a partir da lista de dezenas"""
+    dezenas_ordenadas = sorted(dezenas)
+    return {
+        'dezenas': dezenas_ordenadas,
+        'mascara': mascara(dezenas_ordenadas),
+        'preco': PRECOS[len(dezenas)],
+        'probabilidade': calcular_probabilidade(len(dezenas))
+    }
+
+
+def nome_premio(acertos):
+    """Texto do prêmio para um número de acertos (vazio se não premiado)"""
+    if acertos in NOMES_FAIXAS:
+        return f"{NOMES_FAIXAS[acertos]}! {EMOJIS_FAIXAS[acertos]}"
+    return ""
+
+
+class CanalProgresso:
+    """Canal entre a thread do motor (produtor) e a interface (consumidor).
+
+    O motor publica periodicamente um instantâneo dos contadores e os
+    sorteios recentes; a interface consulta o canal no seu próprio ritmo.
+    Os sorteios não coletados ficam limitados a max_recentes.
+    """
+
+    def __init__(self, max_recentes=500):
+        self._trava = threading.Lock()
+        self._instantaneo = None
+        self._recentes = deque(maxlen=max_recentes)
+
+    def publicar(self, instantaneo, recentes=()):
+        with self._trava:
+            self._instantaneo = instantaneo
+            self._recentes.extend(recentes)
+
+    def coletar(self):
+        """Retorna (último instantâneo, sorteios publicados desde a última coleta)"""
+        with self._trava:
+            recentes = list(self._recentes)
+            self._recentes.clear()
+            return self._instantaneo, recentes
+
+    def pendentes(self):
+        """Sorteios publicados e ainda não coletados"""
+        with self._trava:
+            return len(self._recentes)
+
+
+class MotorSimulacao:
+    """Executa sorteios sucessivos contra uma lista de jogos.
+
+    Entradas: jogos (dicionários de criar_jogo), quantidade máxima de
+    sorteios (0 = ilimitado), faixas que interrompem a simulação e semente.
+    O callback opcional ao_sortear recebe um dicionário por sorteio; o
+    canal opcional (CanalProgresso) recebe o progresso a cada
+    intervalo_publicacao sorteios; o historico opcional (HistoricoCompacto)
+    recebe todos os sorteios. O sorteador é um nome de sorteador.SORTEADORES.
+    Com o atributo checkpoint (checkpoint.Checkpoint), o estado é gravado
+    periodicamente e a execução pode ser retomada com checkpoint.retomar.
+    Com o atributo metricas (metricas.Metricas), o tempo de cada fase do
+    laço é medido; com estatisticas (estatisticas.EstatisticasSorteios),
+    cada sorteio é acumulado nas estatísticas das dezenas; com estimativa
+    (estimativa.EstimativaSequencial), a execução termina quando as taxas
+    de prêmio atingem a precisão pedida. A loteria (loterias.Loteria) é a
+    Mega-Sena, se não informada; os jogos devem ser do seu volante.
+    """
+
+    # Sorteios entre duas publicações no canal de progresso
+    intervalo_publicacao = 256
+
+    def __init__(self, jogos, max_sorteios=0, parar_em=(6,), semente=None, ao_sortear=None,
+                 canal=None, historico=None, sorteador='amostra', loteria=None):
+        self.loteria = loteria or MEGA_SENA
+        # Valida o sorteador para a loteria antes de qualquer execução
+        self.loteria.sorteador(sorteador)
+        self.jogos = list(jogos)
+        self.max_sorteios = max_sorteios
+        self.parar_em = set(parar_em)
+        self.sorteador = sorteador
+        self.rng = criar_gerador(sorteador, semente)
+        # No 'contador' sem semente, a semente sorteada fica registrada no gerador
+        self.semente = self.rng.semente if sorteador == 'contador' else semente
+        self.ao_sortear = ao_sortear
+        self.canal = canal
+        self.historico = historico
+        self.checkpoint = None
+        self.metricas = None
+        self.estatisticas = None
+        self.estimativa = None
+
+        self.ativo = False
+        self.interrompido = False
+        self.total_sorteios = 0
+        self.melhor_resultado = 0
+        self.premios = {faixa: 0 for faixa in self.loteria.faixas}
+        self.sorteio_parada = None
+        # Cada concurso é pago uma vez, mesmo com vários sorteios (Dupla Sena)
+        self.custo_por_concurso = sum(j['preco'] for j in self.jogos)
+        self.custo_por_sorteio = self.custo_por_concurso / self.loteria.sorteios_por_concurso
+
+    def parar(self):
+        """Solicita a interrupção da simulação (seguro entre threads)"""
+        if self.ativo:
+            self.interrompido = True
+        self.ativo = False
+
+    def executar(self):
+        self.ativo = True
+        mascaras = [j.get('mascara') or mascara(j['dezenas']) for j in self.jogos]
+        loteria = self.loteria
+        premios_jogos = [loteria.premios_do_jogo(len(j['dezenas'])) for j in self.jogos]
+        faixa_minima = loteria.acertos_minimo
+        premios = self.premios
+        parar_em = self.parar_em
+        sortear = loteria.sorteador(self.sorteador)
+        historico = self.historico
+        checkpoint = self.checkpoint
+        estatisticas = self.estatisticas
+        detalhar = self.ao_sortear is not None or self.canal is not None
+        recentes = []
+
+        metricas = self.metricas
+        medir = metricas is not None
+        if medir:
+            relogio = metricas.relogio
+            tempos = [0.0] * len(FASES)
+            metricas.iniciar(self)
+            marca = relogio()
+
+        while self.ativo:
+            if self.max_sorteios > 0 and self.total_sorteios >= self.max_sorteios:
+                break
+
+            if medir:
+                agora = relogio()
+                tempos[PARADA] += agora - marca
+                marca = agora
+
+            sorteio = sortear(self.rng)
+            self.total_sorteios += 1
+            if estatisticas is not None:
+                estatisticas.adicionar(sorteio)
+
+            if medir:
+                agora = relogio()
+                tempos[SORTEIO] += agora - marca
+                marca = agora
+
+            resultados_jogos = []
+            melhor_acerto_sorteio = 0
+            parar = False
+
+            mascara_sorteio = mascara(sorteio)
+
+            for mascara_jogo, premios_jogo in zip(mascaras, premios_jogos):
+                acertos = contar_bits(mascara_jogo & mascara_sorteio)
+                resultados_jogos.append(acertos)
+
+                if acertos > melhor_acerto_sorteio:
+                    melhor_acerto_sorteio = acertos
+
+                if acertos >= faixa_minima:
+                    # Um jogo de 7+ dezenas pode render vários prêmios de várias faixas
+                    for faixa, qtd in premios_jogo[acertos]:
+                        premios[faixa] += qtd
+                        if faixa in parar_em:
+                            parar = True
+
+            if melhor_acerto_sorteio > self.melhor_resultado:
+                self.melhor_resultado = melhor_acerto_sorteio
+
+            if medir:
+                agora = relogio()
+                tempos[PONTUACAO] += agora - marca
+                marca = agora
+
+            if historico is not None:
+                historico.adicionar(self.total_sorteios, sorteio, resultados_jogos)
+                if medir:
+                    agora = relogio()
+                    tempos[HISTORICO] += agora - marca
+                    marca = agora
+
+            if detalhar:
+                info_sorteio = {
+                    'numero': self.total_sorteios,
+                    'sorteio': sorteio,
+                    'resultados': resultados_jogos,
+                    'melhor': melhor_acerto_sorteio,
+                    'premio': loteria.nome_premio(melhor_acerto_sorteio)
+                }
+                if self.ao_sortear is not None:
+                    self.ao_sortear(info_sorteio)
+                if self.canal is not None:
+                    recentes.append(info_sorteio)
+                    if len(recentes) >= self.intervalo_publicacao:
+                        self.publicar_progresso(recentes)
+                        recentes = []
+                if medir:
+                    agora = relogio()
+                    tempos[PUBLICACAO] += agora - marca
+                    marca = agora
+
+            if parar:
+                self.sorteio_parada = self.total_sorteios
+                break
+
+            if self.total_sorteios % self.intervalo_publicacao == 0:
+                if medir:
+                    metricas.acumular(self.total_sorteios, tempos)
+                    tempos = [0.0] * len(FASES)
+                # A estimativa fecha o lote antes: o checkpoint grava os dois no mesmo ponto
+                if self.registrar_estimativa():
+                    break
+                if checkpoint is not None:
+                    checkpoint.registrar(self)
+
+        self.registrar_estimativa()
+        if medir:
+            tempos[PARADA] += relogio() - marca
+            metricas.acumular(self.total_sorteios, tempos)
+        self.ativo = False
+        self.publicar_progresso(recentes)
+        self.registrar_checkpoint(final=True)
+        return self.resultado()
+
+    def publicar_progresso(self, recentes=()):
+        """Publica no canal (se houver) o instantâneo atual e os sorteios recentes"""
+        if self.canal is not None:
+            self.canal.publicar(self.resultado(), recentes)
+
+    def registrar_checkpoint(self, final=False):
+        """Entrega o estado ao checkpoint (se houver); deve ser chamado entre sorteios"""
+        if self.checkpoint is not None:
+            self.checkpoint.registrar(self, final)
+
+    def registrar_estimativa(self, lotes=None):
+        """Entrega os contadores (ou os lotes do último bloco) à estimativa; True se a precisão foi atingida"""
+        if self.estimativa is None:
+            return False
+        if lotes is not None:
+            return self.estimativa.registrar_lotes(self, lotes)
+        return self.estimativa.registrar(self)
+
+    def estado(self):
+        """Contadores e estado do gerador, serializáveis em JSON"""
+        return {
+            'total_sorteios': self.total_sorteios,
+            'melhor': self.melhor_resultado,
+            'premios': {str(faixa): qtd for faixa, qtd in self.premios.items()},
+            'sorteio_parada': self.sorteio_parada,
+            'gerador': self.estado_gerador(),
+            'estatisticas': self.estatisticas.estado() if self.estatisticas is not None else None,
+            'estimativa': self.estimativa.estado() if self.estimativa is not None else None
+        }
+
+    def restaurar(self, estado):
+        """Retoma os contadores e o gerador de um estado()"""
+        self.total_sorteios = estado['total_sorteios']
+        self.melhor_resultado = estado['melhor']
+        self.premios = {int(faixa): qtd for faixa, qtd in estado['premios'].items()}
+        self.sorteio_parada = estado['sorteio_parada']
+        self.restaurar_gerador(estado['gerador'])
+        if estado.get('estatisticas') is not None:
+            self.estatisticas = EstatisticasSorteios.de_estado(estado['estatisticas'])
+        if estado.get('estimativa') is not None:
+            self.estimativa = EstimativaSequencial.de_estado(estado['estimativa'])
+
+    def estado_gerador(self):
+        if isinstance(self.rng, ContadorSorteios):
+            return {'contador': self.rng.numero}
+        versao, interno, gauss = self.rng.getstate()
+        return {'random': [versao, list(interno), gauss]}
+
+    def restaurar_gerador(self, dados):
+        if 'contador' in dados:
+            self.rng.numero = dados['contador']
+        else:
+            versao, interno, gauss = dados['random']
+            self.rng.setstate((versao, tuple(interno), gauss))
+
+    def resultado(self):
+        """Resumo da simulação (contadores, melhor resultado e custo)"""
+        loteria = self.loteria
+        # Só concursos inteiros são pagos
+        concursos = -(-self.total_sorteios // loteria.sorteios_por_concurso)
+        resultado = {
+            'total_sorteios': self.total_sorteios,
+            'custo_por_sorteio': self.custo_por_sorteio,
+            'total_gasto': concursos * self.custo_por_concurso,
+            'melhor': self.melhor_resultado
+        }
+        # Contadores da Mega-Sena (também nas loterias com faixas de mesmo número de acertos)
+        for faixa, chave in CHAVES_FAIXAS.items():
+            if faixa in self.premios:
+                resultado[chave] = self.premios[faixa]
+        resultado.update({
+            'sorteio_parada': self.sorteio_parada,
+            'interrompido': self.interrompido,
+            'semente': self.semente,
+            'sorteador': self.sorteador,
+            'loteria': loteria.chave,
+            'concursos': concursos,
+            'premios': {loteria.faixas[faixa].lower(): qtd for faixa, qtd in self.premios.items()}
+        })
+        return resultado
+
+
+def repontuar(jogos, semente, inicio=1, fim=None, parar_em=()):
+    """Pontua uma carteira nos sorteios inicio..fim de uma execução com sorteador 'contador'.
+
+    Os sorteios são regenerados a partir da semente, sem histórico. Os
+    contadores se referem ao trecho; sorteio_parada usa a numeração original.
+    """
+    max_sorteios = 0 if fim is None else fim - inicio + 1
+    motor = MotorSimulacao(jogos, max_sorteios, parar_em, semente, sorteador='contador')
+    motor.rng.numero = inicio - 1
+    resultado = motor.executar()
+    if resultado['sorteio_parada'] is not None:
+        resultado['sorteio_parada'] += inicio - 1
+    return resultado
+
+
+def criar_motor(nome, *args, **kwargs):
+    """Instancia um motor de MOTORES pelo nome (ImportError se faltar numpy)"""
+    modulo, classe = MOTORES[nome]
+    return getattr(importlib.import_module(modulo), classe)(*args, **kwargs)
@@ -0,0 +1,203 @@
+"""Motor paralelo: distribui blocos de sorteios entre processos.
+
+Os sorteios são divididos em blocos de tamanho fixo; o bloco b usa um
+fluxo aleatório próprio, derivado de (semente, b) por SeedSequence, de
+modo que os fluxos não se sobrepõem e o resultado é reproduzível. Os
+blocos são mesclados em ordem, e a parada mais cedo encontrada por
+qualquer processo é compartilhada para que os demais não processem
+blocos posteriores a ela. Requer numpy.
+"""
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from estatisticas import EstatisticasSorteios
+from motor import MotorSimulacao
+from sorteador import ContadorSorteios
+from motor_vetorizado import (contar_premios, grupos_parada, linhas_parada, matriz_premios, pontuar_bloco,
+                              premios_por_lote, sorteador_bloco, tabela_pertinencia)
+
+# Valor de "sem limite" para o índice global de parada
+SEM_LIMITE = 2 ** 62
+
+# Estado de cada processo trabalhador (definido por _inicializar_trabalhador)
+_estado = {}
+
+
+def _inicializar_trabalhador(loteria, sorteador, pertinencia, premios_jogos, grupos, limite, estatisticas,
+                             estimativa):
+    _estado['loteria'] = loteria
+    _estado['sorteador'] = sorteador
+    _estado['sortear'] = sorteador_bloco(loteria, sorteador)
+    _estado['pertinencia'] = pertinencia
+    _estado['premios_jogos'] = premios_jogos
+    _estado['grupos'] = grupos
+    _estado['limite'] = limite
+    _estado['estatisticas'] = estatisticas
+    _estado['estimativa'] = estimativa
+
+
+def _processar_bloco(semente, bloco, inicio, quantidade):
+    """Sorteia e pontua um bloco; retorna contadores e a posição de parada"""
+    limite = _estado['limite']
+    if inicio >= limite.value:
+        # Alguma parada anterior a este bloco já foi encontrada
+        return None
+
+    if _estado['sorteador'] == 'contador':
+        # Os sorteios dependem só do número: os mesmos dos motores serial e vetorizado
+        rng = ContadorSorteios(semente, inicio)
+    else:
+        rng = np.random.default_rng(np.random.SeedSequence(semente, spawn_key=(bloco,)))
+    sorteios = _estado['sortear'](rng, quantidade)
+    acertos = pontuar_bloco(sorteios, _estado['pertinencia'])
+
+    posicao_parada = None
+    grupos = _estado['grupos']
+    if grupos:
+        parada = linhas_parada(acertos, grupos)
+        if parada.any():
+            posicao_parada = int(parada.argmax())
+            acertos = acertos[:posicao_parada + 1]
+            with limite.get_lock():
+                if inicio + posicao_parada + 1 < limite.value:
+                    limite.value = inicio + posicao_parada + 1
+
+    estatisticas = None
+    if _estado['estatisticas']:
+        # Estatísticas só deste bloco; o processo principal as mescla em ordem
+        estatisticas = EstatisticasSorteios(_estado['loteria'].universo)
+        estatisticas.adicionar_bloco(sorteios[:, :len(acertos)])
+
+    lotes = None
+    if _estado['estimativa']:
+        # A estimativa sequencial recebe o bloco em lotes de tamanho fixo
+        lotes = premios_por_lote(acertos, _estado['premios_jogos'], _estado['loteria'])
+        premios = {faixa: sum(premios_lote[faixa] for _, premios_lote in lotes) for faixa in _estado['loteria'].faixas}
+    else:
+        premios = contar_premios(acertos, _estado['premios_jogos'], _estado['loteria'])
+
+    return {
+        'sorteios': len(acertos),
+        'premios': premios,
+        'lotes': lotes,
+        'melhor': int(acertos.max()),
+        'posicao_parada': posicao_parada,
+        'estatisticas': estatisticas
+    }
+
+
+class MotorParalelo(MotorSimulacao):
+    """Mesmas entradas e resultado do MotorSimulacao, usando vários processos.
+
+    O resultado depende apenas da semente e do tamanho do bloco. Sem
+    semente, uma é gerada e fica registrada no resultado. Os sorteios
+    ficam nos processos trabalhadores: ao_sortear e historico não são usados.
+    """
+
+    def __init__(self, jogos, max_sorteios=0, parar_em=(6,), semente=None, ao_sortear=None,
+                 canal=None, historico=None, sorteador='amostra', processos=None, tamanho_bloco=1_000_000,
+                 ao_bloco=None, loteria=None):
+        if semente is None:
+            semente = np.random.SeedSequence().entropy
+        super().__init__(jogos, max_sorteios, parar_em, semente, ao_sortear, canal, historico, sorteador, loteria)
+        self.processos = processos or os.cpu_count() or 1
+        self.tamanho_bloco = tamanho_bloco
+        self.ao_bloco = ao_bloco
+        self.limite = None
+
+    def parar(self):
+        super().parar()
+        if self.limite is not None:
+            # Nenhum processo inicia novos blocos
+            self.limite.value = 0
+
+    def executar(self):
+        self.ativo = True
+        if self.metricas is not None:
+            # Só a vazão: sorteio e pontuação acontecem nos processos de trabalho
+            self.metricas.iniciar(self)
+        contexto = multiprocessing.get_context("spawn")
+        maximo = self.max_sorteios if self.max_sorteios > 0 else SEM_LIMITE
+        self.limite = contexto.Value('q', maximo)
+
+        pendentes = {}
+        concluidos = {}
+        # Uma execução retomada de checkpoint continua do primeiro bloco não mesclado
+        proximo_bloco = proximo_mescla = self.total_sorteios // self.tamanho_bloco
+        encerrado = False
+
+        with ProcessPoolExecutor(max_workers=self.processos, mp_context=contexto,
+                                 initializer=_inicializar_trabalhador,
+                                 initargs=(self.loteria, self.sorteador,
+                                           tabela_pertinencia(self.jogos, self.loteria.universo),
+                                           matriz_premios(self.jogos, self.loteria),
+                                           grupos_parada(self.jogos, self.parar_em, self.loteria),
+                                           self.limite, self.estatisticas is not None,
+                                           self.estimativa is not None)) as executor:
+            while not encerrado:
+                # Mantém no máximo dois blocos em espera por processo
+                while (self.ativo and len(pendentes) < 2 * self.processos
+                       and proximo_bloco * self.tamanho_bloco < self.limite.value):
+                    inicio = proximo_bloco * self.tamanho_bloco
+                    quantidade = min(self.tamanho_bloco, maximo - inicio)
+                    futuro = executor.submit(_processar_bloco, self.semente, proximo_bloco,
+                                             inicio, quantidade)
+                    pendentes[futuro] = proximo_bloco
+                    proximo_bloco += 1
+
+                if not pendentes:
+                    break
+
+                prontos, _ = wait(pendentes, return_when=FIRST_COMPLETED)
+                for futuro in prontos:
+                    concluidos[pendentes.pop(futuro)] = futuro.result()
+
+                # Mescla apenas a sequência contígua de blocos concluídos
+                lotes = []
+                while proximo_mescla in concluidos:
+                    parcial = concluidos.pop(proximo_mescla)
+                    proximo_mescla += 1
+                    if parcial is None:
+                        encerrado = True
+                        break
+                    self._mesclar(parcial)
+                    lotes.extend(parcial['lotes'] or ())
+                    if parcial['posicao_parada'] is not None:
+                        self.sorteio_parada = self.total_sorteios
+                        encerrado = True
+                        break
+
+                if self.ao_bloco is not None:
+                    self.ao_bloco(self)
+                self.publicar_progresso()
+                if lotes and self.registrar_estimativa(lotes):
+                    encerrado = True
+                if not encerrado:
+                    self.registrar_checkpoint()
+
+            for futuro in pendentes:
+                futuro.cancel()
+
+        self.registrar_estimativa()
+        self.ativo = False
+        self.publicar_progresso()
+        self.registrar_checkpoint(final=True)
+        return self.resultado()
+
+    def estado_gerador(self):
+        # Cada bloco tem seu próprio fluxo: basta saber onde os blocos começam
+        return {'tamanho_bloco': self.tamanho_bloco}
+
+    def restaurar_gerador(self, dados):
+        self.tamanho_bloco = dados['tamanho_bloco']
+
+    def _mesclar(self, parcial):
+        self.total_sorteios += parcial['sorteios']
+        for faixa, quantidade in parcial['premios'].items():
+            self.premios[faixa] += quantidade
+        self.melhor_resultado = max(self.melhor_resultado, parcial['melhor'])
+        if parcial['estatisticas'] is not None:
+            self.estatisticas.mesclar(parcial['estatisticas'])
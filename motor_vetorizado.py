@@ -0,0 +1,347 @@
+"""Motor vetorizado (NumPy): sorteia e pontua blocos inteiros de sorteios.
+
+Em vez de um sorteio por iteração, gera um bloco (ex.: 1.000.000 x 6) de
+uma vez e calcula a matriz de acertos (sorteios x jogos) com operações
+de matriz. Contadores e condição de parada são reduções sobre o bloco.
+As funções de pontuação recebem a loteria (Mega-Sena, se omitida).
+Requer numpy.
+"""
+import numpy as np
+
+from estimativa import SORTEIOS_POR_LOTE
+from metricas import FASES, HISTORICO, PARADA, PONTUACAO, PUBLICACAO, SORTEIO
+from loterias import MEGA_SENA
+from motor import MotorSimulacao
+from sorteador import BINOMIAIS, GAMA, TOTAL_COMBINACOES, chave_contador
+
+# Limite de células (sorteios x jogos) da matriz de acertos de um bloco
+MAX_CELULAS_BLOCO = 8_000_000
+# Tamanho do primeiro bloco (e menor bloco com estimativa sequencial)
+BLOCO_MINIMO = 4096
+
+
+def _colunas_repetidas(sorteios):
+    """Máscara dos sorteios (colunas) que contêm alguma dezena repetida"""
+    repetida = np.zeros(sorteios.shape[1], dtype=bool)
+    for i in range(len(sorteios) - 1):
+        for j in range(i + 1, len(sorteios)):
+            repetida |= sorteios[i] == sorteios[j]
+    return repetida
+
+
+def sortear_bloco(rng, quantidade, universo=60, sorteados=6):
+    """Gera `quantidade` sorteios de `sorteados` dezenas distintas de 1 a `universo`.
+
+    Retorna uma matriz uint8 (sorteados x quantidade): cada coluna é um
+    sorteio, sem ordenação. O layout por colunas deixa cada posição contígua.
+    """
+    if sorteados * sorteados > universo:
+        # Repetições seriam a regra (Lotofácil, Lotomania): cada sorteio são as
+        # posições das `sorteados` menores chaves aleatórias, em fatias de memória limitada
+        sorteios = np.empty((sorteados, quantidade), dtype=np.uint8)
+        passo = max(1, MAX_CELULAS_BLOCO // universo)
+        for inicio in range(0, quantidade, passo):
+            chaves = rng.random((min(passo, quantidade - inicio), universo), dtype=np.float32)
+            menores = np.argpartition(chaves, sorteados - 1, axis=1)[:, :sorteados]
+            sorteios[:, inicio:inicio + len(chaves)] = menores.T + 1
+        return sorteios
+
+    sorteios = rng.integers(1, universo + 1, size=(sorteados, quantidade), dtype=np.uint8)
+    repetidos = np.flatnonzero(_colunas_repetidas(sorteios))
+
+    # Rejeição: sorteios com dezena repetida são refeitos (~23% na 1ª rodada da Mega-Sena)
+    while repetidos.size:
+        novos = rng.integers(1, universo + 1, size=(sorteados, repetidos.size), dtype=np.uint8)
+        sorteios[:, repetidos] = novos
+        repetidos = repetidos[_colunas_repetidas(novos)]
+
+    return sorteios
+
+
+def combinacoes_dos_indices(indices):
+    """Versão em bloco de sorteador.combinacao_do_indice: matriz (6 x índices).
+
+    Não há rejeição; cada coluna sai em ordem crescente.
+    """
+    binomiais = np.array(BINOMIAIS, dtype=np.int64)
+    indices = indices.astype(np.int64)
+    sorteios = np.empty((6, len(indices)), dtype=np.uint8)
+    for k in range(6, 0, -1):
+        c = np.searchsorted(binomiais[k], indices, side="right") - 1
+        indices -= binomiais[k, c]
+        sorteios[k - 1] = c + 1
+    return sorteios
+
+
+def sortear_bloco_por_indice(rng, quantidade):
+    """Como sortear_bloco, decodificando índices uniformes em [0, C(60,6))"""
+    return combinacoes_dos_indices(rng.integers(0, TOTAL_COMBINACOES, size=quantidade, dtype=np.int64))
+
+
+def _misturar(x):
+    """sorteador.misturar sobre um array uint64 (a aritmética é módulo 2**64)"""
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def sortear_bloco_contador(contador, quantidade):
+    """Próximos `quantidade` sorteios de um ContadorSorteios (mesmos do sorteador escalar)"""
+    numeros = np.arange(contador.numero + 1, contador.numero + quantidade + 1, dtype=np.uint64)
+    contador.numero += quantidade
+    x = _misturar(np.uint64(chave_contador(contador.semente)) + numeros * np.uint64(GAMA))
+    # Parte alta de x * C(60,6) em duas metades de 32 bits, sem estourar 64 bits
+    total = np.uint64(TOTAL_COMBINACOES)
+    baixo = (x & np.uint64(0xFFFFFFFF)) * total >> np.uint64(32)
+    indices = ((x >> np.uint64(32)) * total + baixo) >> np.uint64(32)
+    return combinacoes_dos_indices(indices)
+
+
+# Versões em bloco dos sorteadores de sorteador.SORTEADORES
+SORTEADORES_BLOCO = {
+    'amostra': sortear_bloco,
+    'indice': sortear_bloco_por_indice,
+    'contador': sortear_bloco_contador,
+}
+
+
+def sorteador_bloco(loteria, nome):
+    """Versão em bloco de loteria.sorteador(nome): função(gerador, quantidade)"""
+    loteria.sorteador(nome)
+    if (loteria.universo, loteria.sorteados) == (60, 6):
+        return SORTEADORES_BLOCO[nome]
+
+    def sortear(rng, quantidade):
+        return sortear_bloco(rng, quantidade, loteria.universo, loteria.sorteados)
+    return sortear
+
+
+def tabela_pertinencia(jogos, universo=60):
+    """Matriz (universo+1 x jogos) com 1 onde a dezena pertence ao jogo"""
+    tabela = np.zeros((universo + 1, len(jogos)), dtype=np.uint8)
+    for idx, jogo in enumerate(jogos):
+        tabela[jogo['dezenas'], idx] = 1
+    return tabela
+
+
+def pontuar_bloco(sorteios, pertinencia):
+    """Matriz de acertos (sorteios x jogos) de um bloco (sorteados x sorteios)"""
+    acertos = pertinencia[sorteios[0]]
+    for posicao in range(1, len(sorteios)):
+        acertos += pertinencia[sorteios[posicao]]
+    return acertos
+
+
+def matriz_premios(jogos, loteria=MEGA_SENA):
+    """Prêmios por (acertos, faixa, jogo), da tabela da loteria: matriz (sorteados+1 x faixas x jogos)"""
+    matriz = np.zeros((loteria.sorteados + 1, len(loteria.faixas), len(jogos)), dtype=np.int64)
+    for idx, jogo in enumerate(jogos):
+        for acertos in range(loteria.sorteados + 1):
+            matriz[acertos, :, idx] = list(loteria.tabela_premios[len(jogo['dezenas']), acertos].values())
+    return matriz
+
+
+def contar_premios(acertos, premios_jogos, loteria=MEGA_SENA):
+    """Prêmios {faixa: quantidade} de uma matriz de acertos (sorteios x jogos)"""
+    total = np.zeros(len(loteria.faixas), dtype=np.int64)
+    for qtd_acertos in range(loteria.acertos_minimo, loteria.sorteados + 1):
+        ocorrencias = np.count_nonzero(acertos == qtd_acertos, axis=0)
+        total += premios_jogos[qtd_acertos] @ ocorrencias
+    return dict(zip(loteria.faixas, total.tolist()))
+
+
+def premios_por_lote(acertos, premios_jogos, loteria=MEGA_SENA, tamanho_lote=SORTEIOS_POR_LOTE):
+    """Lotes (sorteios, {faixa: prêmios}) de tamanho_lote linhas consecutivas de uma matriz de acertos.
+
+    Para a estimativa sequencial, que supõe lotes de tamanhos parecidos;
+    só as células premiadas são visitadas.
+    """
+    quantidade = -(-len(acertos) // tamanho_lote)
+    totais = np.zeros((len(loteria.faixas), quantidade), dtype=np.int64)
+    for qtd_acertos in range(loteria.acertos_minimo, loteria.sorteados + 1):
+        linhas, colunas = np.nonzero(acertos == qtd_acertos)
+        if not len(linhas):
+            continue
+        lote = linhas // tamanho_lote
+        for indice, premios in enumerate(premios_jogos[qtd_acertos]):
+            totais[indice] += np.bincount(lote, weights=premios[colunas], minlength=quantidade).astype(np.int64)
+    tamanhos = [min(tamanho_lote, len(acertos) - inicio) for inicio in range(0, len(acertos), tamanho_lote)]
+    return [(tamanho, dict(zip(loteria.faixas, premios))) for tamanho, premios in zip(tamanhos, totais.T.tolist())]
+
+
+def grupos_parada(jogos, parar_em, loteria=MEGA_SENA):
+    """Agrupa os jogos pelos acertos que rendem prêmio de alguma faixa de parada.
+
+    Retorna uma lista de (acertos, colunas); colunas é None quando o grupo
+    contém todos os jogos (o caso comum: jogos de mesmo tamanho).
+    """
+    grupos = {}
+    for idx, jogo in enumerate(jogos):
+        gatilhos = tuple(acertos for acertos in range(loteria.sorteados + 1)
+                         if any(loteria.tabela_premios[len(jogo['dezenas']), acertos][faixa] for faixa in parar_em))
+        if gatilhos:
+            grupos.setdefault(gatilhos, []).append(idx)
+    if len(grupos) == 1 and len(next(iter(grupos.values()))) == len(jogos):
+        return [(np.array(next(iter(grupos)), dtype=np.uint8), None)]
+    return [(np.array(gatilhos, dtype=np.uint8), np.array(colunas))
+            for gatilhos, colunas in grupos.items()]
+
+
+def linhas_parada(acertos, grupos):
+    """Vetor booleano dos sorteios (linhas) em que alguma faixa de parada é premiada"""
+    parada = np.zeros(len(acertos), dtype=bool)
+    for gatilhos, colunas in grupos:
+        parte = acertos if colunas is None else acertos[:, colunas]
+        parada |= np.isin(parte, gatilhos).any(axis=1)
+    return parada
+
+
+class MotorVetorizado(MotorSimulacao):
+    """Mesmas entradas e resultado do MotorSimulacao, processando por blocos.
+
+    O callback ao_sortear não é chamado por sorteio; ao_bloco, se
+    informado, recebe o próprio motor ao fim de cada bloco. O historico
+    recebe as linhas de cada bloco de uma vez. O sorteador é um nome de
+    SORTEADORES_BLOCO (só 'amostra' fora da Mega-Sena).
+    """
+
+    def __init__(self, jogos, max_sorteios=0, parar_em=(6,), semente=None, ao_sortear=None,
+                 canal=None, historico=None, sorteador='amostra', tamanho_bloco=1_000_000, ao_bloco=None,
+                 loteria=None):
+        super().__init__(jogos, max_sorteios, parar_em, semente, ao_sortear, canal, historico, sorteador, loteria)
+        if sorteador != 'contador':
+            self.rng = np.random.default_rng(semente)
+        self.ao_bloco = ao_bloco
+        # Mantém a matriz de acertos de cada bloco com tamanho limitado
+        self.tamanho_bloco = max(1, min(tamanho_bloco, MAX_CELULAS_BLOCO // max(1, len(self.jogos))))
+        # Blocos começam pequenos e dobram: paradas precoces não pagam um bloco cheio
+        self.bloco_atual = min(BLOCO_MINIMO, self.tamanho_bloco)
+
+    def executar(self):
+        self.ativo = True
+        loteria = self.loteria
+        pertinencia = tabela_pertinencia(self.jogos, loteria.universo)
+        premios_jogos = matriz_premios(self.jogos, loteria)
+        grupos = grupos_parada(self.jogos, self.parar_em, loteria)
+        sortear = sorteador_bloco(loteria, self.sorteador)
+
+        # Os tempos por fase são medidos por bloco, não por sorteio
+        metricas = self.metricas
+        medir = metricas is not None
+        if medir:
+            relogio = metricas.relogio
+            metricas.iniciar(self)
+
+        while self.ativo:
+            quantidade = self.bloco_atual
+            self.bloco_atual = min(self.bloco_atual * 2, self.tamanho_bloco)
+            if self.estimativa is not None:
+                # Não sorteia muito além do que a precisão pedida ainda exige
+                restantes = self.estimativa.sorteios_restantes()
+                if restantes is not None:
+                    # Arredondado para lotes inteiros da estimativa
+                    restantes = -(-max(restantes, BLOCO_MINIMO) // SORTEIOS_POR_LOTE) * SORTEIOS_POR_LOTE
+                    quantidade = min(quantidade, restantes)
+            if self.max_sorteios > 0:
+                quantidade = min(quantidade, self.max_sorteios - self.total_sorteios)
+                if quantidade <= 0:
+                    break
+
+            if medir:
+                tempos = [0.0] * len(FASES)
+                marca = relogio()
+
+            sorteios = sortear(self.rng, quantidade)
+            if medir:
+                agora = relogio()
+                tempos[SORTEIO] += agora - marca
+                marca = agora
+
+            acertos = pontuar_bloco(sorteios, pertinencia)
+            if medir:
+                agora = relogio()
+                tempos[PONTUACAO] += agora - marca
+                marca = agora
+
+            # Primeira linha do bloco que atinge alguma faixa de parada
+            posicao_parada = None
+            if grupos:
+                parada = linhas_parada(acertos, grupos)
+                if parada.any():
+                    posicao_parada = int(parada.argmax())
+                    acertos = acertos[:posicao_parada + 1]
+            if self.estatisticas is not None:
+                self.estatisticas.adicionar_bloco(sorteios[:, :len(acertos)])
+            if medir:
+                agora = relogio()
+                tempos[PARADA] += agora - marca
+                marca = agora
+
+            if self.historico is not None:
+                numeros = np.arange(self.total_sorteios + 1, self.total_sorteios + len(acertos) + 1,
+                                    dtype="<u8").view(np.uint8).reshape(-1, 8)
+                linhas = np.concatenate([numeros, np.sort(sorteios[:, :len(acertos)].T, axis=1), acertos],
+                                        axis=1)
+                self.historico.adicionar_linhas(linhas.tobytes())
+                if medir:
+                    agora = relogio()
+                    tempos[HISTORICO] += agora - marca
+                    marca = agora
+
+            lotes = None
+            if self.estimativa is not None:
+                # A estimativa recebe o bloco em lotes de tamanho fixo; os contadores, a soma deles
+                lotes = premios_por_lote(acertos, premios_jogos, loteria)
+                for _, premios in lotes:
+                    for faixa, premiados in premios.items():
+                        self.premios[faixa] += premiados
+            else:
+                for faixa, premiados in contar_premios(acertos, premios_jogos, loteria).items():
+                    self.premios[faixa] += premiados
+            self.melhor_resultado = max(self.melhor_resultado, int(acertos.max()))
+
+            if posicao_parada is not None:
+                self.sorteio_parada = self.total_sorteios + posicao_parada + 1
+                self.total_sorteios = self.sorteio_parada
+            else:
+                self.total_sorteios += quantidade
+            if medir:
+                agora = relogio()
+                tempos[PONTUACAO] += agora - marca
+                marca = agora
+
+            if self.ao_bloco is not None:
+                self.ao_bloco(self)
+            self.publicar_progresso()
+            if medir:
+                agora = relogio()
+                tempos[PUBLICACAO] += agora - marca
+                marca = agora
+
+            # A estimativa fecha os lotes antes: o checkpoint grava os dois no mesmo ponto
+            encerrar = self.registrar_estimativa(lotes) or posicao_parada is not None
+            if not encerrar:
+                self.registrar_checkpoint()
+            if medir:
+                tempos[PARADA] += relogio() - marca
+                metricas.acumular(self.total_sorteios, tempos)
+            if encerrar:
+                break
+
+        self.registrar_estimativa()
+        self.ativo = False
+        self.publicar_progresso()
+        self.registrar_checkpoint(final=True)
+        return self.resultado()
+
+    def estado_gerador(self):
+        dados = super().estado_gerador() if self.sorteador == 'contador' else {'numpy': self.rng.bit_generator.state}
+        dados['bloco_atual'] = self.bloco_atual
+        return dados
+
+    def restaurar_gerador(self, dados):
+        if 'numpy' in dados:
+            self.rng.bit_generator.state = dados['numpy']
+        else:
+            super().restaurar_gerador(dados)
+        self.bloco_atual = dados['bloco_atual']
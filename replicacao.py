@@ -0,0 +1,405 @@
+"""Experimentos replicados: sorteios e gasto até o primeiro prêmio de cada faixa.
+
+Uma execução "até a SENA" dá uma única amostra, muito ruidosa. Aqui,
+cada faixa é repetida em milhares de experimentos independentes (réplicas)
+e a quantidade de sorteios até o primeiro prêmio de cada um vai para um
+histograma logarítmico, de memória limitada, do qual saem os quantis, a
+função de distribuição empírica (ECDF) e as classes do histograma. O
+gasto é a quantidade de sorteios vezes o custo da carteira por sorteio.
+
+A réplica i da faixa f depende só de (semente, f, i), não da ordem de
+execução nem da quantidade de processos. Há dois métodos:
+
+- 'exato' (padrão): a espera até o primeiro prêmio é geométrica, com a
+  probabilidade exata da faixa por sorteio (EventosCarteira, ou o
+  avaliador exato para carteiras cuja união passa de ~25 dezenas);
+  cada réplica custa uma conta.
+- 'motor': cada réplica é uma execução de um motor com parar_em=(f,) e
+  semente semente_replica(semente, f, i), que pode ser repetida sozinha.
+
+As faixas e os prêmios vêm da loteria (Mega-Sena por padrão). Fora da
+Mega-Sena, o método 'exato' usa sempre EventosCarteira: o avaliador
+exato só enumera os sorteios de 6 dezenas em 60.
+
+Exemplo:
+    python replicacao.py jogos.csv --replicas 100000 --faixas quadra quina sena --semente 42
+    python replicacao.py quina.csv --loteria quina --faixas terno quadra
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import random
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from amostrador_raro import EventosCarteira
+from loterias import LOTERIAS, MEGA_SENA
+from motor import criar_motor
+from simular_lote import carregar_jogos, faixa_por_nome
+from sorteador import GAMA, MASCARA_64, chave_contador, misturar
+
+# Classes do histograma por década (largura relativa de ~2,3%)
+RESOLUCAO_PADRAO = 100
+
+# Réplicas de cada lote (unidade de trabalho dos processos)
+REPLICAS_POR_LOTE = 1000
+
+# Maior união de dezenas para a qual EventosCarteira é imediato
+LIMITE_UNIAO_EVENTOS = 25
+
+# Quantis reportados em resultado()
+QUANTIS = (0.01, 0.05, 0.10, 0.25, 0.50, 0.75, 0.90, 0.95, 0.99)
+
+# Estado de cada processo trabalhador (definido por _inicializar_trabalhador)
+_estado = {}
+
+
+def semente_replica(semente, faixa, indice):
+    """Semente de 64 bits da réplica `indice` (0, 1, ...) da faixa"""
+    return misturar((chave_contador(semente) + ((faixa << 40) + indice + 1) * GAMA) & MASCARA_64)
+
+
+def probabilidades_primeiro_premio(jogos, processos=1, loteria=MEGA_SENA):
+    """{faixa: probabilidade exata de um sorteio ter ao menos um prêmio da faixa}"""
+    uniao = set()
+    for jogo in jogos:
+        uniao.update(jogo['dezenas'])
+    if len(uniao) <= LIMITE_UNIAO_EVENTOS or loteria is not MEGA_SENA:
+        return EventosCarteira(jogos, loteria).probabilidades_por_faixa()
+    # Carteiras espalhadas: enumeração completa dos sorteios (requer numpy)
+    from avaliador_exato import avaliar_carteira
+    return avaliar_carteira(jogos, processos)['probabilidades']
+
+
+class HistogramaLog:
+    """Contagens de inteiros positivos em classes logarítmicas.
+
+    A classe de v é floor(log10(v) * resolucao); classes com um único
+    inteiro (valores pequenos) são exatas. Guarda também a quantidade, a
+    soma, a soma dos quadrados, o mínimo e o máximo, e os valores
+    censurados (experimentos que terminaram sem o evento).
+    """
+
+    def __init__(self, resolucao=RESOLUCAO_PADRAO):
+        self.resolucao = resolucao
+        self.contagens = {}
+        self.quantidade = 0
+        self.soma = 0
+        self.soma_quadrados = 0
+        self.minimo = None
+        self.maximo = None
+        self.censurados = 0
+
+    def classe(self, valor):
+        return math.floor(math.log10(valor) * self.resolucao)
+
+    def inicio(self, classe):
+        """Menor inteiro da classe (ou da primeira classe seguinte não vazia)"""
+        valor = max(1, math.ceil(10 ** (classe / self.resolucao)))
+        # Corrige o arredondamento de ponto flutuante nas bordas
+        while valor > 1 and self.classe(valor - 1) >= classe:
+            valor -= 1
+        while self.classe(valor) < classe:
+            valor += 1
+        return valor
+
+    def adicionar(self, valor):
+        classe = self.classe(valor)
+        self.contagens[classe] = self.contagens.get(classe, 0) + 1
+        self.quantidade += 1
+        self.soma += valor
+        self.soma_quadrados += valor * valor
+        if self.minimo is None or valor < self.minimo:
+            self.minimo = valor
+        if self.maximo is None or valor > self.maximo:
+            self.maximo = valor
+
+    def mesclar(self, outro):
+        for classe, contagem in outro.contagens.items():
+            self.contagens[classe] = self.contagens.get(classe, 0) + contagem
+        self.quantidade += outro.quantidade
+        self.soma += outro.soma
+        self.soma_quadrados += outro.soma_quadrados
+        self.censurados += outro.censurados
+        if outro.minimo is not None:
+            self.minimo = outro.minimo if self.minimo is None else min(self.minimo, outro.minimo)
+            self.maximo = outro.maximo if self.maximo is None else max(self.maximo, outro.maximo)
+
+    @property
+    def total(self):
+        """Observações, incluindo as censuradas"""
+        return self.quantidade + self.censurados
+
+    def media(self):
+        return self.soma / self.quantidade if self.quantidade else None
+
+    def desvio(self):
+        if self.quantidade < 2:
+            return None
+        variancia = (self.soma_quadrados - self.soma * self.soma / self.quantidade) / (self.quantidade - 1)
+        return math.sqrt(max(variancia, 0.0))
+
+    def classes(self):
+        """[(menor valor, maior valor, contagem)] das classes não vazias, em ordem"""
+        return [(self.inicio(c), self.inicio(c + 1) - 1, self.contagens[c]) for c in sorted(self.contagens)]
+
+    def quantil(self, q):
+        """Valor com fração q das observações até ele (None se cair nas censuradas)"""
+        posicao = max(1, math.ceil(q * self.total))
+        if posicao > self.quantidade:
+            return None
+        acumulado = 0
+        for menor, maior, contagem in self.classes():
+            if acumulado + contagem >= posicao:
+                # Interpola linearmente entre os inteiros da classe
+                fracao = (posicao - acumulado - 0.5) / contagem
+                valor = menor + math.floor(fracao * (maior - menor + 1))
+                return min(max(valor, self.minimo), self.maximo)
+            acumulado += contagem
+        return self.maximo
+
+    def ecdf(self, valor):
+        """Fração das observações (incluindo as censuradas) menores ou iguais a valor"""
+        if not self.total:
+            return 0.0
+        acumulado = 0.0
+        for menor, maior, contagem in self.classes():
+            if maior <= valor:
+                acumulado += contagem
+            elif menor <= valor:
+                acumulado += contagem * (valor - menor + 1) / (maior - menor + 1)
+            else:
+                break
+        return acumulado / self.total
+
+    def pontos_ecdf(self):
+        """[(valor, fração até ele)] no fim de cada classe, para gráficos"""
+        pontos = []
+        acumulado = 0
+        for _, maior, contagem in self.classes():
+            acumulado += contagem
+            pontos.append((maior, acumulado / self.total))
+        return pontos
+
+    def estado(self):
+        """Contagens e momentos serializáveis em JSON"""
+        return {
+            'resolucao': self.resolucao,
+            'contagens': {str(c): n for c, n in self.contagens.items()},
+            'quantidade': self.quantidade,
+            'soma': self.soma,
+            'soma_quadrados': self.soma_quadrados,
+            'minimo': self.minimo,
+            'maximo': self.maximo,
+            'censurados': self.censurados
+        }
+
+    @classmethod
+    def de_estado(cls, dados):
+        histograma = cls(dados['resolucao'])
+        for nome, valor in dados.items():
+            setattr(histograma, nome, valor)
+        histograma.contagens = {int(c): n for c, n in dados['contagens'].items()}
+        return histograma
+
+
+def _inicializar_trabalhador(configuracao):
+    _estado.update(configuracao)
+
+
+def _replicar_lote(faixa, primeira, quantidade):
+    """Réplicas primeira..primeira+quantidade-1 da faixa, acumuladas em um histograma"""
+    histograma = HistogramaLog(_estado['resolucao'])
+    maximo = _estado['max_sorteios']
+    semente = _estado['semente']
+    for indice in range(primeira, primeira + quantidade):
+        chave = semente_replica(semente, faixa, indice)
+        if _estado['metodo'] == 'exato':
+            p = _estado['probabilidades'][faixa]
+            if p <= 0:
+                sorteios = None
+            elif p >= 1:
+                sorteios = 1
+            else:
+                # Uniforme em (0, 1] dos 53 bits altos da chave, invertida na geométrica
+                u = ((chave >> 11) + 1) / 2 ** 53
+                sorteios = 1 + math.floor(math.log(u) / math.log1p(-p))
+            if sorteios is not None and maximo and sorteios > maximo:
+                sorteios = None
+        else:
+            motor = criar_motor(_estado['motor'], _estado['jogos'], maximo, (faixa,), chave,
+                                sorteador=_estado['sorteador'], loteria=LOTERIAS[_estado['loteria']])
+            sorteios = motor.executar()['sorteio_parada']
+        if sorteios is None:
+            histograma.censurados += 1
+        else:
+            histograma.adicionar(sorteios)
+    return faixa, histograma
+
+
+class ReplicacaoExperimentos:
+    """Réplicas independentes de "sortear até o primeiro prêmio" em cada faixa.
+
+    max_sorteios (0 = ilimitado) limita cada réplica: as que terminam sem
+    o prêmio são contadas como censuradas. ao_lote, se informado, recebe
+    a replicação ao fim de cada lote. motor e sorteador só se aplicam ao
+    método 'motor'. Sem faixas, todas as da loteria são replicadas.
+    """
+
+    def __init__(self, jogos, replicas=10_000, faixas=None, semente=None, metodo='exato',
+                 max_sorteios=0, motor='raro', sorteador='amostra', processos=1,
+                 resolucao=RESOLUCAO_PADRAO, ao_lote=None, loteria=None):
+        if metodo not in ('exato', 'motor'):
+            raise ValueError(f"Método desconhecido: {metodo}")
+        if not jogos:
+            raise ValueError("Nenhum jogo informado")
+        self.loteria = loteria or MEGA_SENA
+        faixas = tuple(self.loteria.faixas) if faixas is None else tuple(faixas)
+        for faixa in faixas:
+            if faixa not in self.loteria.faixas:
+                raise ValueError(f"A {self.loteria.nome} não tem a faixa de {faixa} acertos")
+        if metodo == 'motor':
+            self.loteria.sorteador(sorteador)
+        self.jogos = list(jogos)
+        self.replicas = replicas
+        self.faixas = faixas
+        self.semente = random.getrandbits(64) if semente is None else semente
+        self.metodo = metodo
+        self.max_sorteios = max_sorteios
+        self.motor = motor
+        self.sorteador = sorteador
+        self.processos = processos
+        self.ao_lote = ao_lote
+        # Cada concurso é pago uma vez, mesmo com vários sorteios (Dupla Sena)
+        self.custo_por_sorteio = sum(jogo['preco'] for jogo in self.jogos) / self.loteria.sorteios_por_concurso
+        self.probabilidades = None
+        self.histogramas = {faixa: HistogramaLog(resolucao) for faixa in self.faixas}
+
+        self.ativo = False
+        self.interrompido = False
+
+    def parar(self):
+        """Solicita a interrupção (seguro entre threads); os lotes concluídos são mantidos"""
+        if self.ativo:
+            self.interrompido = True
+        self.ativo = False
+
+    def executar(self):
+        self.ativo = True
+        if self.probabilidades is None:
+            self.probabilidades = probabilidades_primeiro_premio(self.jogos, self.processos, self.loteria)
+        configuracao = {
+            'metodo': self.metodo,
+            'loteria': self.loteria.chave,
+            'semente': self.semente,
+            'max_sorteios': self.max_sorteios,
+            'resolucao': next(iter(self.histogramas.values())).resolucao,
+            'probabilidades': self.probabilidades,
+            'motor': self.motor,
+            'sorteador': self.sorteador,
+            # A chave, e não a loteria, vai para os processos trabalhadores
+            'loteria': self.loteria.chave,
+            'jogos': self.jogos if self.metodo == 'motor' else None
+        }
+        lotes = [(faixa, primeira, min(REPLICAS_POR_LOTE, self.replicas - primeira))
+                 for faixa in self.faixas for primeira in range(0, self.replicas, REPLICAS_POR_LOTE)]
+
+        if self.processos > 1:
+            contexto = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=self.processos, mp_context=contexto,
+                                     initializer=_inicializar_trabalhador,
+                                     initargs=(configuracao,)) as executor:
+                pendentes = set()
+                proximo = 0
+                while self.ativo and (pendentes or proximo < len(lotes)):
+                    # No máximo dois lotes em espera por processo: a memória não cresce com as réplicas
+                    while proximo < len(lotes) and len(pendentes) < 2 * self.processos:
+                        pendentes.add(executor.submit(_replicar_lote, *lotes[proximo]))
+                        proximo += 1
+                    concluidos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+                    for futuro in concluidos:
+                        self._mesclar(*futuro.result())
+                for futuro in pendentes:
+                    futuro.cancel()
+        else:
+            _inicializar_trabalhador(configuracao)
+            for lote in lotes:
+                if not self.ativo:
+                    break
+                self._mesclar(*_replicar_lote(*lote))
+
+        self.ativo = False
+        return self.resultado()
+
+    def _mesclar(self, faixa, histograma):
+        self.histogramas[faixa].mesclar(histograma)
+        if self.ao_lote is not None:
+            self.ao_lote(self)
+
+    def resultado(self, classes=False):
+        """Resumo por faixa: quantis, média e desvio dos sorteios e do gasto (e as classes, se pedidas)"""
+        custo = self.custo_por_sorteio
+        faixas = {}
+        for faixa, histograma in self.histogramas.items():
+            p = self.probabilidades.get(faixa) if self.probabilidades else None
+            media = histograma.media()
+            desvio = histograma.desvio()
+            quantis = {f"{q:.0%}": histograma.quantil(q) for q in QUANTIS}
+            nome = self.loteria.faixas[faixa].lower()
+            faixas[nome] = {
+                'probabilidade': p,
+                'sorteios_esperados': 1 / p if p else None,
+                'replicas': histograma.total,
+                'censuradas': histograma.censurados,
+                'media': media,
+                'desvio': desvio,
+                'minimo': histograma.minimo,
+                'maximo': histograma.maximo,
+                'quantis': quantis,
+                'gasto_medio': media * custo if media is not None else None,
+                'gasto_quantis': {q: v * custo if v is not None else None for q, v in quantis.items()}
+            }
+            if classes:
+                faixas[nome]['classes'] = histograma.classes()
+        return {
+            'metodo': self.metodo,
+            'loteria': self.loteria.chave,
+            'semente': self.semente,
+            'interrompido': self.interrompido,
+            'custo_por_sorteio': custo,
+            'max_sorteios': self.max_sorteios,
+            'faixas': faixas
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Distribuição dos sorteios e do gasto até o primeiro prêmio.")
+    parser.add_argument("bilhetes", help="arquivo de jogos: texto/CSV (um por linha) ou binário .msb")
+    parser.add_argument("--loteria", choices=list(LOTERIAS), default="megasena")
+    parser.add_argument("--replicas", type=int, default=10_000, help="experimentos por faixa")
+    parser.add_argument("--faixas", nargs="+", default=None,
+                        help="faixas (nome ou acertos) replicadas (padrão: todas as da loteria)")
+    parser.add_argument("--semente", type=int, default=None)
+    parser.add_argument("--metodo", choices=("exato", "motor"), default="exato")
+    parser.add_argument("--motor", default="raro", help="motor das réplicas no método 'motor'")
+    parser.add_argument("--sorteios", type=int, default=0,
+                        help="limite de sorteios por réplica (0 = ilimitado); as demais são censuradas")
+    parser.add_argument("--processos", type=int, default=1)
+    parser.add_argument("--classes", action="store_true", help="inclui as classes do histograma")
+    args = parser.parse_args(argv)
+    loteria = LOTERIAS[args.loteria]
+    try:
+        faixas = None if args.faixas is None else [faixa_por_nome(loteria, nome) for nome in args.faixas]
+    except ValueError as erro:
+        parser.error(str(erro))
+
+    replicacao = ReplicacaoExperimentos(carregar_jogos(args.bilhetes, loteria=loteria), args.replicas, faixas,
+                                        args.semente, args.metodo, args.sorteios, args.motor,
+                                        processos=args.processos, loteria=loteria)
+    replicacao.executar()
+    print(json.dumps(replicacao.resultado(args.classes), ensure_ascii=False, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
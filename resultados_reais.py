@@ -0,0 +1,302 @@
+"""Resultados reais da Mega-Sena: importação, consultas e backtest.
+
+Lê a planilha de resultados exportada pelo site da Caixa (CSV ou, com
+openpyxl instalado, XLSX) e guarda os concursos em arrays compactos
+(número, data e máscara de 60 bits das dezenas), indexados por concurso,
+por data e por dezena. O arquivo pode ser gravado em um binário próprio
+(.msr), aberto depois sem reprocessar a planilha. O backtest pontua uma
+carteira inteira contra todos os concursos de uma vez (requer numpy).
+"""
+import csv
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime
+
+from loterias import MEGA_SENA
+from motor import CHAVES_FAIXAS, contar_bits, dezenas_da_mascara, mascara
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+# Cabeçalho do arquivo binário: identificador, 4 bytes reservados e a
+# quantidade de concursos; em seguida, os arrays de concursos (uint32),
+# datas (uint32, ordinal do calendário) e máscaras (uint64), little-endian
+ASSINATURA = b"MSR1"
+CABECALHO = struct.Struct("<4s4xQ")
+
+FORMATOS_DATA = ("%d/%m/%Y", "%Y-%m-%d", "%d-%m-%Y", "%d/%m/%y")
+
+
+def ler_data(valor):
+    """Converte uma célula (texto ou data da planilha) em date"""
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, date):
+        return valor
+    texto = str(valor).strip()
+    for formato in FORMATOS_DATA:
+        try:
+            return datetime.strptime(texto, formato).date()
+        except ValueError:
+            pass
+    raise ValueError(f"Data inválida: {texto}")
+
+
+def ler_inteiro(valor):
+    """Converte uma célula (texto ou número da planilha) em int"""
+    if isinstance(valor, float) and valor.is_integer():
+        return int(valor)
+    return int(str(valor).strip())
+
+
+def _colunas(cabecalho):
+    """Posições de (concurso, data, dezenas) pelos nomes das colunas; None se não for cabeçalho"""
+    nomes = [str(nome or "").strip().lower() for nome in cabecalho]
+    concurso = next((i for i, nome in enumerate(nomes) if "concurso" in nome), None)
+    data = next((i for i, nome in enumerate(nomes) if "data" in nome), None)
+    dezenas = [i for i, nome in enumerate(nomes) if "bola" in nome or "dezena" in nome][:6]
+    if concurso is None or data is None or len(dezenas) != 6:
+        return None
+    return concurso, data, dezenas
+
+
+def ler_linhas(linhas, erros=None):
+    """Gera (concurso, data, dezenas) das linhas (listas de células) de uma planilha.
+
+    A primeira linha pode ser um cabeçalho (Concurso, Data do Sorteio,
+    Bola1..Bola6); sem ele, as colunas são concurso, data e as 6 dezenas.
+    Linhas vazias são ignoradas; se `erros` for uma lista, recebe
+    (número da linha, conteúdo, mensagem) de cada linha inválida.
+    """
+    posicoes = (0, 1, list(range(2, 8)))
+    for numero, celulas in enumerate(linhas, 1):
+        celulas = list(celulas)
+        if not any(str(celula or "").strip() for celula in celulas):
+            continue
+        if numero == 1:
+            encontradas = _colunas(celulas)
+            if encontradas is not None:
+                posicoes = encontradas
+                continue
+
+        coluna_concurso, coluna_data, colunas_dezenas = posicoes
+        try:
+            concurso = ler_inteiro(celulas[coluna_concurso])
+            data = ler_data(celulas[coluna_data])
+            dezenas = sorted(ler_inteiro(celulas[i]) for i in colunas_dezenas)
+            if any(d < 1 or d > 60 for d in dezenas) or contar_bits(mascara(dezenas)) != 6:
+                raise ValueError("Dezenas devem ser 6 números distintos entre 1 e 60!")
+        except (ValueError, IndexError, TypeError) as erro:
+            if erros is not None:
+                erros.append((numero, celulas, str(erro)))
+            continue
+        yield concurso, data, dezenas
+
+
+def ler_csv(caminho, erros=None):
+    """Concursos de um CSV (separado por ';', ',' ou tabulação; UTF-8 ou Latin-1)"""
+    try:
+        with open(caminho, encoding="utf-8-sig", newline="") as arquivo:
+            texto = arquivo.read()
+    except UnicodeDecodeError:
+        # Exportações antigas da Caixa vêm em Latin-1
+        with open(caminho, encoding="latin-1", newline="") as arquivo:
+            texto = arquivo.read()
+    try:
+        dialeto = csv.Sniffer().sniff(texto[:4096], delimiters=";,\t")
+    except csv.Error:
+        dialeto = csv.excel
+    return list(ler_linhas(csv.reader(texto.splitlines(), dialeto), erros))
+
+
+def ler_xlsx(caminho, erros=None):
+    """Concursos da primeira planilha de um XLSX (requer openpyxl)"""
+    if openpyxl is None:
+        raise ImportError("Instale openpyxl para ler arquivos .xlsx")
+    pasta = openpyxl.load_workbook(caminho, read_only=True, data_only=True)
+    try:
+        return list(ler_linhas(pasta.worksheets[0].iter_rows(values_only=True), erros))
+    finally:
+        pasta.close()
+
+
+def carregar_resultados(caminho, erros=None):
+    """ResultadosReais de um arquivo .msr, .xlsx ou CSV"""
+    extensao = caminho.lower().rsplit(".", 1)[-1]
+    if extensao == "msr":
+        return ResultadosReais.abrir(caminho)
+    if extensao in ("xlsx", "xlsm"):
+        return ResultadosReais(ler_xlsx(caminho, erros))
+    return ResultadosReais(ler_csv(caminho, erros))
+
+
+class ResultadosReais:
+    """Concursos em ordem de número, com índices por data e por dezena.
+
+    As consultas retornam tuplas (concurso, data, dezenas). Concursos
+    repetidos na entrada ficam com a última ocorrência.
+    """
+
+    # A planilha da Caixa e o formato .msr guardam concursos da Mega-Sena
+    loteria = MEGA_SENA
+
+    def __init__(self, concursos=()):
+        unicos = {concurso: (data, mascara(dezenas)) for concurso, data, dezenas in concursos}
+        self.concursos = array('I', sorted(unicos))
+        self.datas = array('I', (unicos[c][0].toordinal() for c in self.concursos))
+        self.mascaras = array('Q', (unicos[c][1] for c in self.concursos))
+        self._indexar()
+
+    def _indexar(self):
+        # Posições (em ordem) dos concursos que contêm cada dezena
+        self.por_dezena = [array('I') for _ in range(61)]
+        for posicao, valor in enumerate(self.mascaras):
+            for dezena in dezenas_da_mascara(valor):
+                self.por_dezena[dezena].append(posicao)
+        # Datas seguem a ordem dos concursos; se não seguirem, a busca por data usa um índice ordenado
+        self._ordem_datas = None
+        if any(a > b for a, b in zip(self.datas, self.datas[1:])):
+            self._ordem_datas = sorted(range(len(self.datas)), key=self.datas.__getitem__)
+
+    def __len__(self):
+        return len(self.concursos)
+
+    def __iter__(self):
+        return (self.sorteio(posicao) for posicao in range(len(self)))
+
+    def sorteio(self, posicao):
+        """(concurso, data, dezenas) da posição `posicao`"""
+        return (self.concursos[posicao], date.fromordinal(self.datas[posicao]),
+                dezenas_da_mascara(self.mascaras[posicao]))
+
+    def concurso(self, numero):
+        """Resultado do concurso `numero` (None se não estiver no arquivo)"""
+        posicao = bisect_left(self.concursos, numero)
+        if posicao < len(self.concursos) and self.concursos[posicao] == numero:
+            return self.sorteio(posicao)
+        return None
+
+    def entre_datas(self, inicio, fim):
+        """Concursos com data entre inicio e fim (inclusive)"""
+        if self._ordem_datas is None:
+            posicoes = range(bisect_left(self.datas, inicio.toordinal()),
+                             bisect_right(self.datas, fim.toordinal()))
+        else:
+            datas = [self.datas[p] for p in self._ordem_datas]
+            posicoes = sorted(self._ordem_datas[bisect_left(datas, inicio.toordinal()):
+                                                bisect_right(datas, fim.toordinal())])
+        return [self.sorteio(posicao) for posicao in posicoes]
+
+    def na_data(self, dia):
+        return self.entre_datas(dia, dia)
+
+    def com_dezenas(self, *dezenas):
+        """Concursos em que todas as dezenas informadas foram sorteadas"""
+        if not dezenas:
+            return list(self)
+        procurada = mascara(dezenas)
+        # Percorre só a lista da dezena mais rara, conferindo as demais pela máscara
+        candidatas = min((self.por_dezena[d] for d in dezenas), key=len)
+        return [self.sorteio(p) for p in candidatas if self.mascaras[p] & procurada == procurada]
+
+    def gravar(self, caminho):
+        """Grava os concursos no formato binário (.msr)"""
+        with open(caminho, "wb") as arquivo:
+            arquivo.write(CABECALHO.pack(ASSINATURA, len(self)))
+            for dados in (self.concursos, self.datas, self.mascaras):
+                dados = array(dados.typecode, dados)
+                if sys.byteorder == "big":
+                    dados.byteswap()
+                arquivo.write(dados.tobytes())
+
+    @classmethod
+    def abrir(cls, caminho):
+        """Lê um arquivo gravado por gravar"""
+        with open(caminho, "rb") as arquivo:
+            conteudo = arquivo.read()
+        assinatura, total = CABECALHO.unpack_from(conteudo)
+        if assinatura != ASSINATURA:
+            raise ValueError(f"Arquivo de resultados inválido: {caminho}")
+
+        resultados = cls()
+        posicao = CABECALHO.size
+        for nome, tipo in (('concursos', 'I'), ('datas', 'I'), ('mascaras', 'Q')):
+            dados = array(tipo)
+            dados.frombytes(conteudo[posicao:posicao + total * dados.itemsize])
+            if sys.byteorder == "big":
+                dados.byteswap()
+            setattr(resultados, nome, dados)
+            posicao += total * dados.itemsize
+        resultados._indexar()
+        return resultados
+
+    def backtest(self, jogos, primeiro=None, ultimo=None, loteria=None):
+        """Pontua os jogos (dicionários de criar_jogo) contra os concursos primeiro..ultimo.
+
+        Todos os concursos são pontuados em blocos da matriz de acertos
+        (concursos x jogos), como no motor vetorizado, e os prêmios vêm da
+        tabela da loteria: jogos com mais dezenas que a aposta simples contam
+        todos os seus prêmios, por faixa. Retorna os contadores no formato de
+        MotorSimulacao.resultado e a lista dos jogos premiados. Requer numpy.
+        """
+        # numpy só é necessário aqui: as consultas funcionam sem ele
+        import numpy as np
+        from motor_vetorizado import MAX_CELULAS_BLOCO, contar_premios, matriz_premios, pontuar_bloco, tabela_pertinencia
+
+        loteria = loteria or self.loteria
+        if loteria is not self.loteria:
+            raise ValueError(f"Os resultados são da {self.loteria.nome}, não da {loteria.nome}")
+        inicio = bisect_left(self.concursos, primeiro) if primeiro is not None else 0
+        fim = bisect_right(self.concursos, ultimo) if ultimo is not None else len(self)
+        sorteios = np.array([loteria.dezenas_da_mascara(valor) for valor in self.mascaras[inicio:fim]],
+                            dtype=np.uint8).reshape(-1, loteria.sorteados).T
+        pertinencia = tabela_pertinencia(jogos, loteria.universo)
+        premios_jogos = matriz_premios(jogos, loteria)
+        # Acertos que rendem algum prêmio a cada jogo (sorteados+1 x jogos)
+        premia = premios_jogos.sum(axis=1) > 0
+        colunas = np.arange(len(jogos))
+
+        premios = {faixa: 0 for faixa in loteria.faixas}
+        melhor = 0
+        premiados = []
+        passo = max(1, MAX_CELULAS_BLOCO // max(1, len(jogos)))
+        for deslocamento in range(0, sorteios.shape[1], passo):
+            acertos = pontuar_bloco(sorteios[:, deslocamento:deslocamento + passo], pertinencia)
+            for faixa, quantidade in contar_premios(acertos, premios_jogos, loteria).items():
+                premios[faixa] += quantidade
+            melhor = max(melhor, int(acertos.max()))
+            for linha, jogo in zip(*np.nonzero(premia[acertos, colunas])):
+                concurso, data, dezenas = self.sorteio(inicio + deslocamento + int(linha))
+                qtd_acertos = int(acertos[linha, jogo])
+                # Prêmios do jogo por faixa (vários, em jogos com mais dezenas que a aposta simples)
+                premios_jogo = {faixa: qtd for faixa, qtd in
+                                zip(loteria.faixas, premios_jogos[qtd_acertos, :, jogo].tolist()) if qtd}
+                premiados.append({'concurso': concurso, 'data': data.isoformat(), 'sorteio': dezenas,
+                                  'jogo': int(jogo), 'acertos': qtd_acertos,
+                                  'premio': loteria.nome_premio(max(premios_jogo)),
+                                  'premios': {loteria.faixas[f].lower(): qtd for f, qtd in premios_jogo.items()}})
+
+        # Cada concurso é pago uma vez, mesmo com vários sorteios (Dupla Sena)
+        custo_por_concurso = sum(jogo['preco'] for jogo in jogos)
+        concursos = -(-(fim - inicio) // loteria.sorteios_por_concurso)
+        resultado = {
+            'total_sorteios': fim - inicio,
+            'custo_por_sorteio': custo_por_concurso / loteria.sorteios_por_concurso,
+            'total_gasto': concursos * custo_por_concurso,
+            'melhor': melhor
+        }
+        # Contadores da Mega-Sena (também nas loterias com faixas de mesmo número de acertos)
+        for faixa, chave in CHAVES_FAIXAS.items():
+            if faixa in premios:
+                resultado[chave] = premios[faixa]
+        resultado.update({
+            'loteria': loteria.chave,
+            'concursos': concursos,
+            'premios': {loteria.faixas[faixa].lower(): qtd for faixa, qtd in premios.items()},
+            'premiados': premiados
+        })
+        return resultado
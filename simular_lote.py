@@ -0,0 +1,186 @@
+"""Execução de simulações em lote, pela linha de comando.
+
+Lê um arquivo de bilhetes (texto/CSV ou binário .msb), executa um motor
+e escreve linhas JSON (uma por evento) na saída padrão ou em um arquivo:
+bilhetes inválidos, progresso periódico e o resultado final. Não importa
+tkinter, e numpy só é carregado pelos motores que o usam.
+
+Exemplo:
+    python simular_lote.py jogos.csv --sorteios 0 --parar-em sena --semente 42 --motor paralelo --processos 8
+    python simular_lote.py quina.csv --loteria quina --parar-em quadra --motor vetorizado
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+
+from bilhetes import BilhetesMapeados, ler_bilhetes
+from catalogo import Catalogo
+from checkpoint import Checkpoint, nome_do_motor, retomar
+from estatisticas import EstatisticasSorteios
+from estimativa import EstimativaSequencial
+from metricas import Metricas
+from loterias import LOTERIAS, MEGA_SENA
+from motor import MOTORES, NOMES_FAIXAS, criar_motor
+from sorteador import SORTEADORES
+
+# Maior espera (s) da thread principal entre duas verificações do motor
+ESPERA_MAXIMA = 0.2
+
+# Nome da faixa na linha de comando -> acertos
+FAIXAS_POR_NOME = {nome.lower(): faixa for faixa, nome in NOMES_FAIXAS.items()}
+
+
+def faixa_por_nome(loteria, nome):
+    """Acertos de uma faixa, pelo nome ('quadra') ou pelo número de acertos ('11')"""
+    for faixa, nome_faixa in loteria.faixas.items():
+        if nome.lower() in (nome_faixa.lower(), str(faixa)):
+            return faixa
+    opcoes = ", ".join(nome_faixa.lower() for nome_faixa in loteria.faixas.values())
+    raise ValueError(f"Faixa '{nome}' inexistente na {loteria.nome} (use {opcoes} ou os acertos)")
+
+
+def carregar_jogos(caminho, ao_erro=None, loteria=MEGA_SENA):
+    """Jogos de um arquivo .msb ou de texto; ao_erro recebe (linha, texto, erro)"""
+    if caminho.lower().endswith(".msb"):
+        bilhetes = BilhetesMapeados(caminho)
+        try:
+            return list(bilhetes.jogos(loteria))
+        finally:
+            bilhetes.fechar()
+
+    erros = []
+    with open(caminho, encoding="utf-8") as arquivo:
+        jogos = [loteria.criar_jogo(loteria.dezenas_da_mascara(valor))
+                 for valor in ler_bilhetes(arquivo, erros, loteria)]
+    if ao_erro is not None:
+        for erro in erros:
+            ao_erro(*erro)
+    return jogos
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(description="Simulação de loterias em lote, com saída em JSON lines.")
+    parser.add_argument("bilhetes", help="arquivo de jogos: texto/CSV (um por linha) ou binário .msb")
+    parser.add_argument("--loteria", choices=list(LOTERIAS), default="megasena")
+    parser.add_argument("--sorteios", type=int, default=0, help="quantidade de sorteios (0 = ilimitado)")
+    parser.add_argument("--parar-em", nargs="*", default=None,
+                        help="faixas (nome ou acertos) que encerram a simulação (padrão: a maior; vazio = nunca)")
+    parser.add_argument("--semente", type=int, default=None, help="semente do gerador aleatório")
+    parser.add_argument("--motor", choices=list(MOTORES), default="serial")
+    parser.add_argument("--sorteador", choices=list(SORTEADORES), default="amostra")
+    parser.add_argument("--processos", type=int, default=None, help="processos do motor paralelo")
+    parser.add_argument("--saida", default="-", help="arquivo de saída (padrão: saída padrão)")
+    parser.add_argument("--intervalo", type=float, default=1.0,
+                        help="segundos entre duas linhas de progresso (0 = sem progresso)")
+    parser.add_argument("--metricas", action="store_true",
+                        help="inclui tempos por fase, vazão e memória no progresso e no resultado")
+    parser.add_argument("--estatisticas", action="store_true",
+                        help="acumula frequências, pares e atrasos das dezenas e os inclui no resultado")
+    parser.add_argument("--precisao", type=float, default=None,
+                        help="encerra quando as taxas de --estimar tiverem esta precisão relativa (em %%)")
+    parser.add_argument("--estimar", nargs="+", default=None,
+                        help="faixas cuja taxa é estimada com --precisao (padrão: quadra; a menor fora da Mega-Sena)")
+    parser.add_argument("--confianca", type=float, default=95.0, help="confiança dos intervalos (em %%)")
+    parser.add_argument("--checkpoint", default=None, help="grava checkpoints periódicos neste arquivo")
+    parser.add_argument("--retomar", default=None, help="retoma a execução gravada neste checkpoint")
+    parser.add_argument("--catalogo", default=None, help="registra a execução no catálogo deste diretório")
+    parser.add_argument("--rotulo", default=None, help="rótulo da execução no catálogo")
+    return parser
+
+
+def main(argv=None):
+    parser = criar_parser()
+    args = parser.parse_args(argv)
+    loteria = LOTERIAS[args.loteria]
+    # Padrões: parar na faixa principal e estimar a quadra (a menor faixa nas outras loterias)
+    if args.parar_em is None:
+        args.parar_em = [str(max(loteria.faixas))]
+    if args.estimar is None:
+        args.estimar = ["quadra" if loteria is MEGA_SENA else str(min(loteria.faixas))]
+    try:
+        parar_em = [faixa_por_nome(loteria, nome) for nome in args.parar_em]
+        estimar = [faixa_por_nome(loteria, nome) for nome in args.estimar]
+        loteria.sorteador(args.sorteador)
+    except ValueError as erro:
+        parser.error(str(erro))
+    saida = sys.stdout if args.saida == "-" else open(args.saida, "w", encoding="utf-8")
+
+    def emitir(tipo, **dados):
+        saida.write(json.dumps({'tipo': tipo, **dados}, ensure_ascii=False) + "\n")
+        saida.flush()
+
+    try:
+        jogos = carregar_jogos(args.bilhetes, lambda linha, texto, erro: emitir(
+            'bilhete_invalido', linha=linha, texto=texto, erro=erro), loteria)
+        if not jogos:
+            print("Nenhum jogo válido no arquivo de bilhetes.", file=sys.stderr)
+            return 2
+
+        extras = {'processos': args.processos} if args.motor == 'paralelo' else {}
+        if args.retomar:
+            motor = retomar(args.retomar, jogos, **extras)
+        else:
+            motor = criar_motor(args.motor, jogos, args.sorteios, parar_em, args.semente,
+                                sorteador=args.sorteador, loteria=loteria, **extras)
+            if args.checkpoint:
+                motor.checkpoint = Checkpoint(args.checkpoint)
+        if args.metricas:
+            motor.metricas = Metricas()
+        if args.estatisticas and motor.estatisticas is None:
+            motor.estatisticas = EstatisticasSorteios(motor.loteria.universo)
+        if args.precisao is not None and motor.estimativa is None:
+            motor.estimativa = EstimativaSequencial(args.precisao / 100, args.confianca / 100, estimar)
+
+        def medidas():
+            return {'metricas': motor.metricas.instantaneo()} if args.metricas else {}
+
+        emitir('inicio', motor=nome_do_motor(motor), loteria=motor.loteria.chave, jogos=len(jogos), max_sorteios=motor.max_sorteios,
+               parar_em=sorted(motor.parar_em),
+               semente=motor.semente, sorteador=motor.sorteador, sorteios_anteriores=motor.total_sorteios)
+
+        # O motor roda em uma thread; a principal só lê os contadores periodicamente.
+        # A espera é por um Event com prazo (um join interrompido por Ctrl+C
+        # deixaria a thread parecendo encerrada).
+        resultado = {}
+        terminou = threading.Event()
+
+        def executar():
+            resultado.update(motor.executar())
+            terminou.set()
+
+        inicio = ultimo_progresso = time.perf_counter()
+        threading.Thread(target=executar, daemon=True).start()
+        try:
+            while not terminou.wait(min(args.intervalo or ESPERA_MAXIMA, ESPERA_MAXIMA)):
+                agora = time.perf_counter()
+                if args.intervalo and agora - ultimo_progresso >= args.intervalo:
+                    ultimo_progresso = agora
+                    emitir('progresso', segundos=round(agora - inicio, 3), **motor.resultado(), **medidas())
+        except KeyboardInterrupt:
+            motor.parar()
+            terminou.wait()
+
+        if motor.estatisticas is not None:
+            resultado['estatisticas'] = motor.estatisticas.resumo()
+        if motor.estimativa is not None:
+            resultado['estimativa'] = {
+                'atingida': motor.estimativa.atingida,
+                'precisao': motor.estimativa.precisao,
+                'confianca': motor.estimativa.confianca,
+                'faixas': {motor.loteria.faixas[faixa].lower(): intervalo for faixa, intervalo in
+                           motor.estimativa.intervalos(motor.custo_por_sorteio).items()}
+            }
+        segundos = time.perf_counter() - inicio
+        if args.catalogo:
+            resultado['catalogo'] = Catalogo(args.catalogo).registrar(motor, segundos, args.rotulo)
+        emitir('resultado', segundos=round(segundos, 3), **resultado, **medidas())
+        return 0
+    finally:
+        if saida is not sys.stdout:
+            saida.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""Geradores de sorteios (6 dezenas distintas de 1 a 60).
+
+Além do sorteio padrão (random.sample + ordenação), um sorteio pode ser
+obtido a partir de um índice uniforme em [0, C(60,6)): o índice é
+decodificado pelo sistema combinatório de números, com uma tabela de
+binomiais pré-calculada, diretamente em dezenas ordenadas ou em máscara.
+
+No sorteador 'contador', o índice do sorteio n é uma função (splitmix64)
+apenas de (semente, n): qualquer sorteio de uma execução pode ser
+regenerado depois, sem histórico, em qualquer um dos motores.
+"""
+import random
+from bisect import bisect_right
+
+
+def _binomiais():
+    """Tabela C(n, k) pelo triângulo de Pascal (este módulo é importado por motor.py)"""
+    tabela = [[1] * 61] + [[0] * 61 for _ in range(6)]
+    for k in range(1, 7):
+        for n in range(1, 61):
+            tabela[k][n] = tabela[k][n - 1] + tabela[k - 1][n - 1]
+    return tabela
+
+
+# BINOMIAIS[k][n] = C(n, k), para n de 0 a 60 (listas não decrescentes)
+BINOMIAIS = _binomiais()
+
+TOTAL_COMBINACOES = BINOMIAIS[6][60]
+
+UNIVERSO = range(1, 61)
+
+
+def combinacao_do_indice(indice):
+    """Dezenas ordenadas da combinação de posição `indice` (ordem colexicográfica)"""
+    dezenas = [0] * 6
+    for k in range(6, 0, -1):
+        # Maior c com C(c, k) <= indice
+        c = bisect_right(BINOMIAIS[k], indice) - 1
+        indice -= BINOMIAIS[k][c]
+        dezenas[k - 1] = c + 1
+    return dezenas
+
+
+def mascara_do_indice(indice):
+    """Máscara de 60 bits da combinação de posição `indice`"""
+    valor = 0
+    for k in range(6, 0, -1):
+        c = bisect_right(BINOMIAIS[k], indice) - 1
+        indice -= BINOMIAIS[k][c]
+        valor |= 1 << c
+    return valor
+
+
+def indice_da_combinacao(dezenas):
+    """Inverso de combinacao_do_indice"""
+    return sum(BINOMIAIS[k][d - 1] for k, d in enumerate(sorted(dezenas), 1))
+
+
+MASCARA_64 = (1 << 64) - 1
+
+# Incremento do splitmix64 (parte fracionária da razão áurea, em 64 bits)
+GAMA = 0x9E3779B97F4A7C15
+
+
+def misturar(x):
+    """Função de mistura do splitmix64 (bijeção em 64 bits)"""
+    x = (x ^ (x >> 30)) * 0xBF58476D1CE4E5B9 & MASCARA_64
+    x = (x ^ (x >> 27)) * 0x94D049BB133111EB & MASCARA_64
+    return x ^ (x >> 31)
+
+
+def chave_contador(semente):
+    """Chave de 64 bits derivada da semente (sementes vizinhas não se correlacionam)"""
+    return misturar(semente & MASCARA_64)
+
+
+def indice_contador(semente, numero):
+    """Índice em [0, C(60,6)) do sorteio `numero` (1, 2, ...) da semente"""
+    x = misturar((chave_contador(semente) + numero * GAMA) & MASCARA_64)
+    # Parte alta de x * C(60,6): leva 64 bits uniformes ao intervalo
+    return (x * TOTAL_COMBINACOES) >> 64
+
+
+def sorteio_contador(semente, numero):
+    """Regenera as dezenas ordenadas do sorteio `numero` da semente"""
+    return combinacao_do_indice(indice_contador(semente, numero))
+
+
+def reproduzir(semente, inicio=1, fim=None):
+    """Gera (número, dezenas) dos sorteios inicio..fim (inclusive; sem fim = infinito)"""
+    numero = inicio
+    while fim is None or numero <= fim:
+        yield numero, sorteio_contador(semente, numero)
+        numero += 1
+
+
+class ContadorSorteios:
+    """Estado do sorteador 'contador': a semente e o último número sorteado.
+
+    Faz o papel do gerador aleatório nos motores; o sorteio seguinte é
+    sempre o de número `numero + 1`, não importa quem o gerou.
+    """
+
+    def __init__(self, semente, numero=0):
+        self.semente = semente
+        self.numero = numero
+
+
+def sortear_amostra(rng):
+    """Sorteio padrão: amostra sem reposição, ordenada"""
+    return sorted(rng.sample(UNIVERSO, 6))
+
+
+def sortear_por_indice(rng):
+    """Sorteio por um índice uniforme decodificado (uma única chamada ao gerador)"""
+    return combinacao_do_indice(rng.randrange(TOTAL_COMBINACOES))
+
+
+def sortear_contador(contador):
+    """Próximo sorteio de um ContadorSorteios"""
+    contador.numero += 1
+    return sorteio_contador(contador.semente, contador.numero)
+
+
+def criar_gerador(nome, semente=None):
+    """Gerador para o sorteador `nome`: ContadorSorteios no 'contador', random.Random nos demais"""
+    if nome == 'contador':
+        if semente is None:
+            # Sem a semente registrada, os sorteios não poderiam ser regenerados
+            semente = random.getrandbits(64)
+        return ContadorSorteios(semente)
+    return random.Random(semente)
+
+
+# Sorteadores disponíveis: nome -> função(gerador) -> dezenas ordenadas. O
+# gerador é um random.Random, exceto no 'contador' (ContadorSorteios).
+# As versões em bloco (numpy) ficam em motor_vetorizado.SORTEADORES_BLOCO.
+SORTEADORES = {
+    'amostra': sortear_amostra,
+    'indice': sortear_por_indice,
+    'contador': sortear_contador,
+}
@@ -0,0 +1,45 @@
+"""Avaliação exata da carteira: fórmulas fechadas e a cobertura de SENA.
+
+Executar com: python -m pytest -q test_avaliador_exato.py
+"""
+import pytest
+
+from loterias import QUINA
+from motor import TABELA_PREMIOS, CoberturaSena, combinar, criar_jogo
+
+pytest.importorskip("numpy")
+from avaliador_exato import TOTAL_COMBINACOES, avaliar_carteira  # noqa: E402
+
+
+def test_jogo_de_7_dezenas_segue_a_hipergeometrica():
+    avaliacao = avaliar_carteira([criar_jogo(range(1, 8))])
+
+    # Sorteios com h acertos: C(7,h)·C(53,6-h); cada um paga TABELA_PREMIOS[7, h]
+    sorteios = {h: combinar(7, h) * combinar(53, 6 - h) for h in range(7)}
+    assert avaliacao['melhor'] == sorteios
+    for faixa in (4, 5, 6):
+        esperada = {}
+        for h, qtd in sorteios.items():
+            premios = TABELA_PREMIOS[7, h][faixa]
+            esperada[premios] = esperada.get(premios, 0) + qtd
+        assert avaliacao['faixas'][faixa] == esperada
+
+
+def test_jogos_sobrepostos_nao_somam_a_sena():
+    # Os dois jogos cobrem o sorteio 1 a 6: 7 + 7 - 1 sorteios com SENA
+    jogos = [criar_jogo(range(1, 8)), criar_jogo([1, 2, 3, 4, 5, 6, 8])]
+    avaliacao = avaliar_carteira(jogos, processos=2)
+    assert sum(avaliacao['melhor'].values()) == TOTAL_COMBINACOES
+    assert avaliacao['melhor'][6] == 13
+    assert avaliacao['faixas'][6] == {0: TOTAL_COMBINACOES - 13, 1: 12, 2: 1}
+
+    cobertura = CoberturaSena()
+    for jogo in jogos:
+        cobertura.adicionar(jogo['dezenas'])
+    assert cobertura.cobertos == 13
+    assert avaliacao['probabilidades'][6] == pytest.approx(cobertura.probabilidade() / 100)
+
+
+def test_outras_loterias_sao_recusadas():
+    with pytest.raises(ValueError, match="Mega-Sena"):
+        avaliar_carteira([QUINA.criar_jogo([1, 2, 3, 4, 5])], loteria=QUINA)
@@ -0,0 +1,74 @@
+"""Retomada de checkpoint: o resultado e a estimativa são os de uma execução sem interrupção.
+
+Executar com: python -m pytest -q test_checkpoint.py
+"""
+import shutil
+
+import pytest
+
+from checkpoint import Checkpoint, retomar
+from estimativa import EstimativaSequencial
+from motor import criar_jogo, criar_motor
+
+JOGOS = [criar_jogo(range(1, 16)), criar_jogo(range(31, 46))]
+
+
+def executar(nome, caminho, copia=None, copiar_em=None, **extras):
+    """Execução completa com checkpoint a cada lote; copia o arquivo gravado ao passar por copiar_em"""
+    def copiar(*_):
+        if copia is not None and motor.total_sorteios >= copiar_em and caminho.exists() and not copiado:
+            shutil.copy(caminho, copia)
+            copiado.append(True)
+
+    copiado = []
+    if nome == 'vetorizado':
+        extras.update(ao_bloco=copiar, tamanho_bloco=2048)
+    else:
+        extras.update(ao_sortear=copiar)
+    motor = criar_motor(nome, JOGOS, 200_000, (), 7, **extras)
+    motor.estimativa = EstimativaSequencial(0.05, faixas=(4,))
+    motor.checkpoint = Checkpoint(caminho, intervalo=0)
+    resultado = motor.executar()
+    return motor, resultado
+
+
+@pytest.mark.parametrize("nome", ['serial', 'indexado', 'vetorizado'])
+def test_retomada_com_estimativa_reproduz_execucao_continua(nome, tmp_path):
+    if nome != 'serial':
+        pytest.importorskip("numpy")
+    # Cópia do checkpoint no meio da execução, como se o processo tivesse morrido ali
+    continuo, resultado = executar(nome, tmp_path / "a.json", tmp_path / "copia.json", copiar_em=1000)
+    assert continuo.estimativa.atingida
+
+    extras = {'tamanho_bloco': 2048} if nome == 'vetorizado' else {}
+    retomado = retomar(tmp_path / "copia.json", JOGOS, intervalo=0, **extras)
+    assert 0 < retomado.total_sorteios < continuo.total_sorteios
+    assert retomado.estimativa.lotes > 0
+
+    assert retomado.executar() == resultado
+    assert retomado.estimativa.estado() == continuo.estimativa.estado()
+
+
+@pytest.mark.parametrize("nome", ['serial', 'indexado', 'vetorizado', 'paralelo'])
+@pytest.mark.parametrize("sorteador", ['amostra', 'contador'])
+def test_retomada_apos_parar_reproduz_execucao_continua(nome, sorteador, tmp_path):
+    if nome != 'serial':
+        pytest.importorskip("numpy")
+    extras = {'vetorizado': {'tamanho_bloco': 4096},
+              'paralelo': {'processos': 2, 'tamanho_bloco': 4096}}.get(nome, {})
+    # O paralelo ainda mescla os blocos em andamento (até 2 por processo) depois de parar
+    maximo = 40_000 if nome == 'paralelo' else 20_000
+    continuo = criar_motor(nome, JOGOS, maximo, (), 11, sorteador=sorteador, **extras).executar()
+
+    def parar(*_):
+        if motor.total_sorteios >= 5_000:
+            motor.parar()
+
+    chave = 'ao_sortear' if nome in ('serial', 'indexado') else 'ao_bloco'
+    motor = criar_motor(nome, JOGOS, maximo, (), 11, sorteador=sorteador, **{chave: parar}, **extras)
+    motor.checkpoint = Checkpoint(tmp_path / "a.json")
+    assert motor.executar()['interrompido']
+
+    retomado = retomar(tmp_path / "a.json", JOGOS, **extras)
+    assert retomado.total_sorteios < maximo
+    assert retomado.executar() == continuo
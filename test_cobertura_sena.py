@@ -0,0 +1,55 @@
+"""CoberturaSena (mapa de bits dos sorteios com SENA) x conjunto explícito das combinações.
+
+Executar com: python -m pytest -q test_cobertura_sena.py
+"""
+import random
+from itertools import combinations
+
+import pytest
+
+import motor
+from motor import CoberturaSena, mascara
+from sorteador import TOTAL_COMBINACOES
+
+
+def carteira(semente, qtd=40):
+    rng = random.Random(semente)
+    return [rng.sample(range(1, 61), rng.randint(6, 10)) for _ in range(qtd)]
+
+
+def cobertos_por_conjunto(jogos):
+    return len({mascara(c) for dezenas in jogos for c in combinations(dezenas, 6)})
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def caminho(request, monkeypatch):
+    if request.param == 'numpy':
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(motor, "_numpy", lambda: None)
+    return request.param
+
+
+@pytest.mark.parametrize("semente", range(3))
+def test_jogo_a_jogo_e_em_bloco_contam_como_o_conjunto(caminho, semente):
+    jogos = carteira(semente)
+    esperado = cobertos_por_conjunto(jogos)
+
+    um_a_um = CoberturaSena()
+    for dezenas in jogos:
+        um_a_um.adicionar(dezenas)
+    assert um_a_um.cobertos == esperado
+
+    # Em bloco, com jogos repetidos e sobrepostos dentro do mesmo bloco
+    em_bloco = CoberturaSena()
+    em_bloco.adicionar_mascaras([mascara(d) for d in jogos[:10]])
+    em_bloco.adicionar_mascaras([mascara(d) for d in jogos[5:] + jogos[:3]])
+    assert em_bloco.cobertos == esperado
+    assert em_bloco.probabilidade() == pytest.approx(esperado / TOTAL_COMBINACOES * 100)
+
+
+def test_jogo_de_20_dezenas(caminho):
+    cobertura = CoberturaSena()
+    cobertura.adicionar(list(range(41, 61)))
+    cobertura.adicionar(list(range(41, 61)))
+    assert cobertura.cobertos == 38760
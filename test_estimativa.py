@@ -0,0 +1,49 @@
+"""Precisão declarada pela estimativa sequencial x dispersão real entre sementes.
+
+Executar com: python -m pytest -q test_estimativa.py
+"""
+import statistics
+
+import pytest
+
+from estimativa import EstimativaSequencial
+from motor import combinar, criar_jogo, criar_motor
+
+pytest.importorskip("numpy")
+
+PRECISAO = 0.10
+SEMENTES = 40
+
+# Taxa exata de quadras por sorteio de um jogo de 6 dezenas
+TAXA_QUADRA = combinar(6, 4) * combinar(54, 2) / combinar(60, 6)
+
+
+def estimar(nome, semente, **extras):
+    motor = criar_motor(nome, [criar_jogo([1, 2, 3, 4, 5, 6])], 0, (), semente, **extras)
+    motor.estimativa = EstimativaSequencial(PRECISAO, faixas=(4,))
+    motor.executar()
+    return motor, motor.estimativa.intervalos()[4]
+
+
+def test_precisao_declarada_do_motor_vetorizado():
+    intervalos = [estimar('vetorizado', semente)[1] for semente in range(SEMENTES)]
+    assert all(intervalo['erro_relativo'] <= PRECISAO for intervalo in intervalos)
+
+    # Com lotes de tamanhos parecidos, a parada ocorre perto de (1,96 / precisão)² quadras
+    esperadas = (1.96 / PRECISAO) ** 2
+    assert all(0.6 * esperadas <= i['premios'] <= 1.5 * esperadas for i in intervalos)
+
+    # Meia largura real (95%) das taxas estimadas, relativa à taxa exata
+    erro_real = 1.96 * statistics.pstdev(i['taxa'] for i in intervalos) / TAXA_QUADRA
+    assert erro_real <= 1.3 * PRECISAO
+
+    cobertura = sum(i['inferior'] <= TAXA_QUADRA <= i['superior'] for i in intervalos) / SEMENTES
+    assert cobertura >= 0.85
+
+
+def test_motor_paralelo_para_perto_dos_sorteios_necessarios():
+    motor, intervalo = estimar('paralelo', 1, processos=2)
+    assert intervalo['erro_relativo'] <= PRECISAO
+    # Cerca de (1,96 / 0,10)² / taxa ≈ 0,9 milhão de sorteios, mais no máximo um bloco de 1 milhão por processo
+    necessarios = (1.96 / PRECISAO) ** 2 / TAXA_QUADRA
+    assert motor.total_sorteios <= necessarios + 2 * motor.tamanho_bloco * motor.processos
@@ -0,0 +1,87 @@
+"""Tabelas de prêmios das loterias x enumeração das apostas simples contidas em cada jogo.
+
+Executar com: python -m pytest -q test_loterias.py
+"""
+from collections import Counter
+from itertools import combinations
+
+import pytest
+
+from loterias import DUPLA_SENA, LOTERIAS, LOTOFACIL, LOTOMANIA, MEGA_SENA, QUINA
+from motor import criar_motor
+
+
+def premios_enumerados(loteria, qtd, acertos):
+    """Prêmios por faixa de um jogo de `qtd` números com `acertos` acertos, aposta simples por aposta simples"""
+    jogo = range(qtd)
+    # Os `acertos` primeiros números do jogo foram sorteados
+    contagem = Counter(sum(1 for n in aposta if n < acertos)
+                       for aposta in combinations(jogo, loteria.aposta_simples))
+    return {faixa: contagem[faixa] for faixa in loteria.faixas}
+
+
+@pytest.mark.parametrize("loteria", list(LOTERIAS.values()), ids=list(LOTERIAS))
+def test_tabela_de_premios_confere_com_as_apostas_simples(loteria):
+    for qtd in loteria.precos:
+        for acertos in range(loteria.sorteados + 1):
+            # Só combinações possíveis: acertos <= qtd e os demais sorteados cabem fora do jogo
+            if acertos > qtd or loteria.sorteados - acertos > loteria.universo - qtd:
+                continue
+            assert loteria.tabela_premios[qtd, acertos] == premios_enumerados(loteria, qtd, acertos), \
+                (qtd, acertos)
+
+
+def test_valores_conhecidos():
+    assert MEGA_SENA.tabela_premios[7, 6] == {4: 0, 5: 6, 6: 1}
+    assert QUINA.tabela_premios[6, 5] == {2: 0, 3: 0, 4: 5, 5: 1}
+    assert LOTOFACIL.tabela_premios[16, 15] == {11: 0, 12: 0, 13: 0, 14: 15, 15: 1}
+    assert LOTOFACIL.tabela_premios[16, 14] == {11: 0, 12: 0, 13: 14, 14: 2, 15: 0}
+    assert LOTOMANIA.tabela_premios[50, 0][0] == 1
+    assert LOTOMANIA.acertos_minimo == 0
+    assert DUPLA_SENA.acertos_minimo == 3
+
+
+@pytest.mark.parametrize("loteria", list(LOTERIAS.values()), ids=list(LOTERIAS))
+def test_motor_serial_paga_pela_tabela(loteria):
+    jogos = [loteria.criar_jogo(range(1, loteria.aposta_simples + 1)),
+             loteria.criar_jogo(range(loteria.universo - max(loteria.precos) + 1, loteria.universo + 1))]
+    premios = Counter()
+
+    def conferir(info):
+        for jogo, acertos in zip(jogos, info['resultados']):
+            premios.update(loteria.tabela_premios[len(jogo['dezenas']), acertos])
+
+    motor = criar_motor('serial', jogos, 3000, (), 3, ao_sortear=conferir, loteria=loteria)
+    resultado = motor.executar()
+    assert motor.premios == {faixa: premios[faixa] for faixa in loteria.faixas}
+    # Cada concurso é pago uma vez, mesmo com dois sorteios (Dupla Sena)
+    assert resultado['concursos'] == -(-3000 // loteria.sorteios_por_concurso)
+    assert resultado['total_gasto'] == resultado['concursos'] * sum(j['preco'] for j in jogos)
+
+
+@pytest.mark.parametrize("loteria", list(LOTERIAS.values()), ids=list(LOTERIAS))
+def test_comparacao_reproduz_o_motor_vetorizado(loteria):
+    pytest.importorskip("numpy")
+    from comparacao import ComparacaoEstrategias
+
+    jogos = [loteria.criar_jogo(range(1, loteria.aposta_simples + 1)),
+             loteria.criar_jogo(range(loteria.universo - max(loteria.precos) + 1, loteria.universo + 1))]
+    esperado = criar_motor('vetorizado', jogos, 20_000, (), 5, loteria=loteria).executar()
+    comparacao = ComparacaoEstrategias(20_000, (), 5, loteria=loteria)
+    comparacao.adicionar('carteira', jogos)
+    resultado = comparacao.executar()['estrategias']['carteira']
+    for chave in ('premios', 'melhor', 'total_gasto', 'custo_por_sorteio'):
+        assert resultado[chave] == esperado[chave], chave
+
+
+def test_replicacao_usa_as_faixas_da_loteria():
+    from amostrador_raro import EventosCarteira
+    from replicacao import ReplicacaoExperimentos
+
+    jogos = [QUINA.criar_jogo([1, 2, 3, 4, 5, 6]), QUINA.criar_jogo([5, 6, 7, 8, 9])]
+    replicacao = ReplicacaoExperimentos(jogos, 2000, semente=1, loteria=QUINA)
+    resultado = replicacao.executar()
+    assert replicacao.probabilidades == EventosCarteira(jogos, QUINA).probabilidades_por_faixa()
+    assert list(resultado['faixas']) == [nome.lower() for nome in QUINA.faixas.values()]
+    with pytest.raises(ValueError):
+        ReplicacaoExperimentos(jogos, faixas=(6,), loteria=QUINA)
@@ -0,0 +1,47 @@
+"""Backtest com resultados reais: prêmios por faixa pela tabela da loteria.
+
+Executar com: python -m pytest -q test_resultados_reais.py
+"""
+from collections import Counter
+from datetime import date
+
+import pytest
+
+from loterias import MEGA_SENA, QUINA
+from resultados_reais import ResultadosReais
+
+pytest.importorskip("numpy")
+
+CONCURSOS = [(1, date(2020, 1, 1), [1, 2, 3, 4, 5, 6]),
+             (2, date(2020, 1, 4), [1, 2, 3, 4, 50, 51]),
+             (3, date(2020, 1, 8), [10, 20, 30, 40, 50, 60]),
+             (4, date(2020, 1, 11), [1, 2, 3, 30, 40, 59])]
+
+
+def test_jogos_de_7_ou_mais_dezenas_levam_todos_os_premios():
+    jogos = [MEGA_SENA.criar_jogo(range(1, 9)), MEGA_SENA.criar_jogo([1, 2, 3, 4, 5, 7])]
+    resultado = ResultadosReais(CONCURSOS).backtest(jogos)
+
+    esperados = Counter()
+    premiados = []
+    for concurso, _, dezenas in CONCURSOS:
+        for indice, jogo in enumerate(jogos):
+            acertos = len(set(dezenas) & set(jogo['dezenas']))
+            premios = MEGA_SENA.tabela_premios[len(jogo['dezenas']), acertos]
+            esperados.update(premios)
+            if any(premios.values()):
+                premiados.append((concurso, indice, {MEGA_SENA.faixas[f].lower(): n
+                                                     for f, n in premios.items() if n}))
+
+    assert [(p['concurso'], p['jogo'], p['premios']) for p in resultado['premiados']] == premiados
+    assert resultado['premios'] == {MEGA_SENA.faixas[f].lower(): esperados[f] for f in MEGA_SENA.faixas}
+    assert (resultado['quadras'], resultado['quinas'], resultado['senas']) == (22, 13, 1)
+    # O jogo de 8 dezenas com a SENA leva também 12 quinas e 15 quadras
+    assert resultado['premiados'][0]['premios'] == {'quadra': 15, 'quina': 12, 'sena': 1}
+    assert resultado['premiados'][0]['premio'] == MEGA_SENA.nome_premio(6)
+    assert resultado['total_gasto'] == len(CONCURSOS) * sum(jogo['preco'] for jogo in jogos)
+
+
+def test_outra_loteria_e_recusada():
+    with pytest.raises(ValueError, match="Mega-Sena"):
+        ResultadosReais(CONCURSOS).backtest([QUINA.criar_jogo([1, 2, 3, 4, 5])], loteria=QUINA)
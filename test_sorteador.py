@@ -0,0 +1,65 @@
+"""Sorteadores: decodificação de índices e o 'contador', que regenera qualquer sorteio.
+
+Executar com: python -m pytest -q test_sorteador.py
+"""
+import random
+
+import pytest
+
+from loterias import mascara
+from motor import TABELA_PREMIOS, criar_jogo, criar_motor, repontuar
+from sorteador import (TOTAL_COMBINACOES, ContadorSorteios, combinacao_do_indice, indice_da_combinacao,
+                       mascara_do_indice, reproduzir, sortear_contador, sorteio_contador)
+
+JOGOS = [criar_jogo(range(1, 9)), criar_jogo([5, 12, 23, 34, 45, 56]), criar_jogo(range(40, 50))]
+
+
+def test_indices_e_combinacoes_sao_inversos():
+    rng = random.Random(1)
+    for indice in [0, 1, TOTAL_COMBINACOES - 1] + [rng.randrange(TOTAL_COMBINACOES) for _ in range(1000)]:
+        dezenas = combinacao_do_indice(indice)
+        assert dezenas == sorted(set(dezenas)) and 1 <= dezenas[0] and dezenas[-1] <= 60
+        assert indice_da_combinacao(dezenas) == indice
+        assert mascara_do_indice(indice) == mascara(dezenas)
+    assert combinacao_do_indice(0) == [1, 2, 3, 4, 5, 6]
+    assert combinacao_do_indice(TOTAL_COMBINACOES - 1) == [55, 56, 57, 58, 59, 60]
+
+
+def test_contador_regenera_qualquer_sorteio():
+    contador = ContadorSorteios(2024)
+    sorteios = [sortear_contador(contador) for _ in range(500)]
+    assert contador.numero == 500
+    assert sorteios == [dezenas for _, dezenas in reproduzir(2024, 1, 500)]
+    assert sorteio_contador(2024, 321) == sorteios[320]
+    # Sementes vizinhas geram sequências diferentes
+    assert sorteios != [sorteio_contador(2025, n) for n in range(1, 501)]
+
+
+def test_contador_cobre_as_dezenas_uniformemente():
+    contagem = [0] * 61
+    for _, dezenas in reproduzir(7, 1, 20_000):
+        for dezena in dezenas:
+            contagem[dezena] += 1
+    esperado = 20_000 * 6 / 60
+    assert all(abs(qtd - esperado) < 5 * esperado ** 0.5 for qtd in contagem[1:])
+
+
+@pytest.mark.parametrize("nome", ['indexado', 'vetorizado', 'paralelo'])
+def test_motores_com_contador_reproduzem_o_serial(nome):
+    pytest.importorskip("numpy")
+    extras = {'processos': 2, 'tamanho_bloco': 5000} if nome == 'paralelo' else {}
+    serial = criar_motor('serial', JOGOS, 20_000, (), 99, sorteador='contador').executar()
+    outro = criar_motor(nome, JOGOS, 20_000, (), 99, sorteador='contador', **extras).executar()
+    assert outro == serial
+
+
+def test_repontuar_um_trecho():
+    acertos = {}
+    completo = criar_motor('serial', JOGOS, 3000, (), 5, sorteador='contador',
+                           ao_sortear=lambda info: acertos.__setitem__(info['numero'], info['resultados']))
+    completo.executar()
+
+    trecho = repontuar(JOGOS, 5, 1001, 2000)
+    assert trecho['total_sorteios'] == 1000
+    assert trecho['quadras'] == sum(TABELA_PREMIOS[len(jogo['dezenas']), acertos[n][i]][4]
+                                    for n in range(1001, 2001) for i, jogo in enumerate(JOGOS))
@@ -0,0 +1,35 @@
+"""Sorteio manual (aba "Sorteio") com cada um dos sorteadores.
+
+Executar com: python -m pytest -q test_sorteio_manual.py
+"""
+from types import SimpleNamespace
+
+import pytest
+
+from sorteador import SORTEADORES
+
+pytest.importorskip("tkinter")
+import SimLoterica  # noqa: E402
+
+
+class RaizFalsa:
+    """Substitui root.after executando o callback na hora"""
+
+    def after(self, atraso, funcao, *args):
+        funcao(*args)
+
+
+@pytest.mark.parametrize("nome", list(SORTEADORES))
+def test_sorteio_manual_com_cada_sorteador(nome, monkeypatch):
+    numeros = SimLoterica.sorteio_manual(nome)
+    assert len(set(numeros)) == 6 and all(1 <= n <= 60 for n in numeros)
+
+    # A thread de revelação termina e libera o botão de sortear
+    monkeypatch.setattr(SimLoterica.time, "sleep", lambda segundos: None)
+    revelados = []
+    interface = SimpleNamespace(sorteio_ativo=True, numeros_sorteados=[], root=RaizFalsa(),
+                                atualizar_sorteio=lambda i, n: revelados.append(n),
+                                verificar_acertos=lambda: None, exibir_resultado_final=lambda: None)
+    SimLoterica.MegaSenaSimulator.sortear_numeros(interface, numeros)
+    assert revelados == numeros
+    assert interface.sorteio_ativo is False